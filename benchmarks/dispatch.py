@@ -0,0 +1,380 @@
+"""Dispatch Benchmarks
+-------------------
+
+Measure the call overhead of `singledispatch_literal` and
+`singledispatchmethod_literal` against the usual alternatives:
+`functools.singledispatch` (looking values up in a dict inside each type's
+implementation), an if/elif chain, a dict of callables and, on Python 3.10+,
+a `match` statement.
+
+Each scenario is a table of literal values and types, each with a handler,
+and the arguments to call with. Every strategy is built from the same table,
+and checked to return the same results, before it's timed.
+
+Run across every Python version with `make bench`, or for one with:
+
+    python benchmarks/dispatch.py --json --output results.json
+"""
+import argparse
+import enum
+import functools
+import json
+import pathlib
+import platform
+import sys
+import timeit
+import types
+import typing
+
+from partialdispatch import (singledispatch_literal,
+                             singledispatchmethod_literal)
+
+Handler = typing.Callable[[typing.Any], typing.Any]
+Build = typing.Callable[["Scenario"], Handler]
+
+
+class Pet(enum.Enum):
+    CAT = "cat"
+    DOG = "dog"
+    SHARK = "shark"
+    HAMSTER = "hamster"
+
+
+class Scenario(typing.NamedTuple):
+    """A dispatch table, and the arguments to call it with."""
+
+    name: str
+    literals: typing.Dict[typing.Any, str]
+    types: typing.Dict[type, str]
+    args: typing.List[typing.Any]
+
+    def handler(self, result: str) -> Handler:
+        """A handler returning result."""
+
+        def handler(a):
+            return result
+
+        return handler
+
+
+def _scenarios() -> typing.List[Scenario]:
+    events = ["created", "updated", "deleted", "archived", "restored"]
+
+    return [
+        Scenario(
+            name="literal_hit",
+            literals={event: event for event in events},
+            types={int: "int"},
+            args=["deleted"],
+        ),
+        Scenario(
+            name="type_fallback",
+            literals={event: event for event in events},
+            types={int: "int"},
+            args=[42],
+        ),
+        Scenario(
+            name="default",
+            literals={event: event for event in events},
+            types={int: "int"},
+            args=["unknown"],
+        ),
+        Scenario(
+            name="unhashable",
+            literals={(1, 2): "pair"},
+            types={int: "int"},
+            args=[[1, 2]],
+        ),
+        Scenario(
+            name="enum",
+            literals={Pet.CAT: "meow", Pet.DOG: "woof"},
+            types={},
+            args=[Pet.DOG],
+        ),
+        Scenario(
+            name="large_registry",
+            literals={i: f"opcode {i}" for i in range(1000)},
+            types={str: "str"},
+            args=[737],
+        ),
+    ]
+
+
+def _default(a: typing.Any) -> str:
+    return "default"
+
+
+def build_singledispatch_literal(
+    scenario: Scenario, **kwargs: typing.Any
+) -> Handler:
+    func = singledispatch_literal(_default, **kwargs)
+    with func.transaction():
+        for value, result in scenario.literals.items():
+            func.register(value, scenario.handler(result), literal=True)
+        for cls, result in scenario.types.items():
+            func.register(cls, scenario.handler(result))
+
+    return func
+
+
+def build_singledispatchmethod_literal(scenario: Scenario) -> Handler:
+    class Handlers:
+        @singledispatchmethod_literal
+        def handle(self, a):
+            return "default"
+
+    for value, result in scenario.literals.items():
+        Handlers.handle.register(
+            value, staticmethod(scenario.handler(result)), literal=True
+        )
+    for cls, result in scenario.types.items():
+        Handlers.handle.register(cls, staticmethod(scenario.handler(result)))
+
+    return Handlers().handle
+
+
+def build_functools_singledispatch(scenario: Scenario) -> Handler:
+    """Dispatch on type, then look the value up in a dict for the type."""
+    by_type: typing.Dict[type, typing.Dict[typing.Any, Handler]] = {}
+    for value, result in scenario.literals.items():
+        by_type.setdefault(type(value), {})[value] = scenario.handler(result)
+
+    def by_value(fallback: Handler, values: dict) -> Handler:
+        def impl(a):
+            try:
+                handler = values.get(a)
+            except TypeError:
+                handler = None
+
+            return (fallback if handler is None else handler)(a)
+
+        return impl
+
+    func = functools.singledispatch(
+        by_value(_default, by_type.pop(object, {}))
+    )
+    for cls, result in scenario.types.items():
+        func.register(
+            cls, by_value(scenario.handler(result), by_type.pop(cls, {}))
+        )
+    for cls, values in by_type.items():
+        func.register(cls, by_value(_default, values))
+
+    return func
+
+
+def _generate(source: typing.List[str], namespace: dict) -> Handler:
+    """Define `handle` from generated source."""
+    exec("\n".join(source), namespace)  # nosec B102
+
+    return namespace["handle"]
+
+
+def build_if_elif(scenario: Scenario) -> Handler:
+    """A chain comparing the exact class and value, then the types."""
+    values = types.SimpleNamespace()
+    namespace: dict = {"V": values, "_default": _default}
+    source = ["def handle(a):", "    cls = a.__class__"]
+    keyword = "if"
+    for i, (value, result) in enumerate(scenario.literals.items()):
+        setattr(values, f"v{i}", value)
+        namespace[f"h{i}"] = scenario.handler(result)
+        source += [
+            f"    {keyword} cls is V.v{i}.__class__ and a == V.v{i}:",
+            f"        return h{i}(a)",
+        ]
+        keyword = "elif"
+    for i, (cls, result) in enumerate(scenario.types.items()):
+        namespace[f"t{i}"], namespace[f"th{i}"] = cls, scenario.handler(result)
+        source += [
+            f"    {keyword} isinstance(a, t{i}):",
+            f"        return th{i}(a)",
+        ]
+        keyword = "elif"
+    source += ["    return _default(a)"]
+
+    return _generate(source, namespace)
+
+
+def build_dict(scenario: Scenario) -> Handler:
+    """A dict of callables by value, then by type."""
+    values = {
+        (type(value), value): scenario.handler(result)
+        for value, result in scenario.literals.items()
+    }
+    by_type = {
+        cls: scenario.handler(result) for cls, result in scenario.types.items()
+    }
+
+    def handle(a):
+        cls = a.__class__
+        try:
+            handler = values.get((cls, a))
+        except TypeError:
+            handler = None
+        if handler is None:
+            handler = by_type.get(cls, _default)
+
+        return handler(a)
+
+    return handle
+
+
+def build_match(scenario: Scenario) -> Handler:
+    """A match statement, with a value pattern per literal (3.10+)."""
+    values = types.SimpleNamespace()
+    namespace: dict = {"V": values, "_default": _default}
+    source = ["def handle(a):", "    match a:"]
+    for i, (value, result) in enumerate(scenario.literals.items()):
+        setattr(values, f"v{i}", value)
+        namespace[f"h{i}"] = scenario.handler(result)
+        # value patterns compare with ==, so check the class as well
+        source += [
+            f"        case V.v{i} if a.__class__ is V.v{i}.__class__:",
+            f"            return h{i}(a)",
+        ]
+    for i, (cls, result) in enumerate(scenario.types.items()):
+        setattr(values, f"t{i}", cls)
+        namespace[f"th{i}"] = scenario.handler(result)
+        source += [f"        case V.t{i}():", f"            return th{i}(a)"]
+    source += ["        case _:", "            return _default(a)"]
+
+    return _generate(source, namespace)
+
+
+STRATEGIES: typing.Dict[str, Build] = {
+    "singledispatch_literal": build_singledispatch_literal,
+    "singledispatch_literal_compiled": functools.partial(
+        build_singledispatch_literal, compiled=True
+    ),
+    "singledispatch_literal_frozen": lambda scenario: (
+        build_singledispatch_literal(scenario).freeze()
+    ),
+    "singledispatchmethod_literal": build_singledispatchmethod_literal,
+    "functools_singledispatch": build_functools_singledispatch,
+    "if_elif": build_if_elif,
+    "dict": build_dict,
+}
+if sys.version_info >= (3, 10):
+    STRATEGIES["match"] = build_match
+
+
+def _expected(scenario: Scenario, arg: typing.Any) -> str:
+    """The result every strategy should return for arg."""
+    try:
+        if arg in scenario.literals:
+            return scenario.literals[arg]
+    except TypeError:
+        pass
+
+    for cls, result in scenario.types.items():
+        if isinstance(arg, cls):
+            return result
+
+    return "default"
+
+
+def measure(
+    handler: Handler, args: typing.List[typing.Any], repeat: int
+) -> typing.Tuple[float, int]:
+    """The fastest time per call, in ns, and the calls made per repeat."""
+    timer = timeit.Timer(
+        "for arg in args: handler(arg)",
+        globals={"handler": handler, "args": args},
+    )
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number))
+
+    return best / (number * len(args)) * 1e9, number * len(args)
+
+
+def run(
+    scenarios: typing.Optional[typing.Iterable[str]] = None,
+    strategies: typing.Optional[typing.Iterable[str]] = None,
+    repeat: int = 5,
+) -> typing.Dict[str, typing.Any]:
+    """Run the benchmarks.
+
+    Args:
+        scenarios: the names of the scenarios to run, or all of them.
+        strategies: the names of the strategies to run, or all of them.
+        repeat: how many times to time each, taking the fastest.
+
+    Returns:
+        the results, with the Python version they were measured on.
+    """
+    results = []
+    for scenario in _scenarios():
+        if scenarios is not None and scenario.name not in scenarios:
+            continue
+
+        expected = [_expected(scenario, arg) for arg in scenario.args]
+        for name, build in STRATEGIES.items():
+            if strategies is not None and name not in strategies:
+                continue
+
+            handler = build(scenario)
+            got = [handler(arg) for arg in scenario.args]
+            if got != expected:
+                raise AssertionError(
+                    f"{name} returned {got} for {scenario.name}, "
+                    f"not {expected}."
+                )
+
+            ns_per_call, calls = measure(handler, scenario.args, repeat)
+            results.append(
+                {
+                    "scenario": scenario.name,
+                    "strategy": name,
+                    "ns_per_call": round(ns_per_call, 2),
+                    "calls": calls,
+                }
+            )
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "results": results,
+    }
+
+
+def _table(report: typing.Dict[str, typing.Any]) -> str:
+    """The results as a plain text table."""
+    lines = [f"{report['implementation']} {report['python']}"]
+    for result in report["results"]:
+        lines.append(
+            f"{result['scenario']:<16}{result['strategy']:<34}"
+            f"{result['ns_per_call']:>10.1f} ns"
+        )
+
+    return "\n".join(lines)
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", action="append", dest="scenarios")
+    parser.add_argument("--strategy", action="append", dest="strategies")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--json", action="store_true", help="write the results as JSON"
+    )
+    parser.add_argument("--output", type=pathlib.Path)
+    args = parser.parse_args(argv)
+
+    report = run(
+        scenarios=args.scenarios,
+        strategies=args.strategies,
+        repeat=args.repeat,
+    )
+    output = json.dumps(report, indent=2) if args.json else _table(report)
+    if args.output is None:
+        print(output)
+    else:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(output + "\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
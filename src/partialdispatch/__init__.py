@@ -1,4 +1,16 @@
+from .coroutines import async_singledispatch_literal
+from .matchers import Interval, Prefix, Regex, Structural
+from .partial import partialdispatch
 from .singledispatch import (singledispatch_literal,
                              singledispatchmethod_literal)
 
-__all__ = ["singledispatch_literal", "singledispatchmethod_literal"]
+__all__ = [
+    "Interval",
+    "Prefix",
+    "Regex",
+    "Structural",
+    "async_singledispatch_literal",
+    "partialdispatch",
+    "singledispatch_literal",
+    "singledispatchmethod_literal",
+]
@@ -0,0 +1,159 @@
+"""Array Dispatch
+--------------
+
+Partition NumPy arrays by the literal values registered with
+`singledispatch_literal`, for `map_array`.
+
+Rather than dispatching element by element, the registered literals for the
+array's element type are sorted once, every element is located among them
+with a single `np.searchsorted`, and each element is given the code of the
+implementation it matched, or -1. A stable sort of the codes then yields the
+indexes for each implementation as contiguous runs, so each implementation
+is called once, with all of its elements.
+
+NumPy is an optional dependency, and this module is only imported when
+`map_array` is called.
+"""
+import typing
+
+import numpy as np
+
+# element types are matched to the literals registered for the Python type
+# their values correspond to, as literals are registered by exact type
+_PYTHON_TYPES: typing.Dict[str, type] = {
+    "b": bool,
+    "i": int,
+    "u": int,
+    "f": float,
+    "U": str,
+    "S": bytes,
+}
+
+Groups = typing.List[
+    typing.Tuple[typing.Optional[typing.Callable], np.ndarray]
+]
+
+
+def python_type(array: np.ndarray) -> type:
+    """The Python type of the values in array."""
+    try:
+        return _PYTHON_TYPES[array.dtype.kind]
+    except KeyError:
+        raise TypeError(
+            f"Arrays of {array.dtype} can't be partitioned by literal value; "
+            "use map_batched instead."
+        ) from None
+
+
+def _convert_keys(
+    values: typing.Dict[typing.Any, typing.Callable], dtype: np.dtype
+) -> typing.Tuple[typing.List[typing.Any], typing.List[typing.Callable]]:
+    """Literal values representable in dtype, and their implementations."""
+    keys, impls = [], []
+    for value, impl in values.items():
+        try:
+            key = dtype.type(value)
+        except (OverflowError, ValueError):
+            continue
+
+        # skip values which would be changed by conversion, e.g. wrapped
+        if key == value:
+            keys.append(key)
+            impls.append(impl)
+
+    return keys, impls
+
+
+def partition(
+    array: np.ndarray,
+    values: typing.Optional[typing.Dict[typing.Any, typing.Callable]],
+) -> Groups:
+    """Group the indexes of a 1-d array by the literal value they match.
+
+    Args:
+        array: the array to partition.
+        values: the literal values registered for the array's Python type,
+            and their implementations.
+
+    Returns:
+        (implementation, indexes) pairs, with None as the implementation for
+        the elements which matched no literal value.
+    """
+    if not len(array):
+        return []
+
+    keys, impls = _convert_keys(values or {}, array.dtype)
+    if not keys:
+        return [(None, np.arange(len(array)))]
+
+    # implementations, each given a code
+    unique_impls = list(dict.fromkeys(impls))
+    impl_codes = np.array([unique_impls.index(impl) for impl in impls])
+
+    order = np.argsort(np.array(keys))
+    sorted_keys = np.array(keys)[order]
+    sorted_codes = impl_codes[order]
+
+    # locate each element among the sorted keys, and check for a hit
+    found = np.searchsorted(sorted_keys, array)
+    found[found == len(sorted_keys)] = 0
+    hit = sorted_keys[found] == array
+    codes = np.where(hit, sorted_codes[found], -1)
+
+    # indexes, grouped by code, in order within each group
+    by_code = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(
+        codes[by_code], np.arange(-1, len(unique_impls) + 1)
+    )
+
+    groups: Groups = []
+    for code, start, end in zip(
+        range(-1, len(unique_impls)), bounds[:-1], bounds[1:]
+    ):
+        if start == end:
+            continue
+
+        impl = None if code == -1 else unique_impls[code]
+        groups.append((impl, by_code[start:end]))
+
+    return groups
+
+
+def map_array(
+    array: typing.Any,
+    values: typing.Optional[typing.Dict[typing.Any, typing.Callable]],
+    default: typing.Callable,
+    *extra: typing.Any,
+) -> np.ndarray:
+    """Call each implementation once, with the elements it's registered for.
+
+    Args:
+        array: the array to dispatch; arrays with more than one dimension
+            are flattened, and the result reshaped to match.
+        values: the literal values registered for the array's Python type,
+            and their implementations.
+        default: the implementation for elements matching no literal value.
+        extra: passed to every implementation, after the elements.
+
+    Returns:
+        an array of the results, in the same order as array.
+    """
+    array = np.asarray(array)
+    flat = array.ravel()
+
+    results = []
+    for impl, indexes in partition(flat, values):
+        impl = default if impl is None else impl
+        results.append((indexes, impl(flat[indexes], *extra)))
+
+    if not results:
+        return np.empty(array.shape)
+
+    out = np.empty(
+        len(flat),
+        dtype=np.result_type(*(np.asarray(r) for _, r in results)),
+    )
+    for indexes, result in results:
+        out[indexes] = result
+
+    return out.reshape(array.shape)
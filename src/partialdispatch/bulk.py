@@ -0,0 +1,129 @@
+"""Bulk Registration
+-----------------
+
+Tables of literal values, registered with `register_many`, or read from a
+file with `register_table`.
+
+Registering each value with `register` inspects and checks the handler's
+signature every time. `register_many` checks each handler once, then adds
+all its values to the literal registry in one pass, which is published once,
+as in a transaction.
+
+A table file maps each value to the name of its handler. JSON files hold an
+object, `{"GBP": "sterling"}`, or a list of pairs, `[[826, "sterling"]]`, for
+values which aren't strings. CSV files hold a row per value, of the value and
+the name, without a header, so their values are always strings.
+"""
+import csv
+import json
+import os
+import pathlib
+import typing
+
+Pairs = typing.List[typing.Tuple[typing.Any, str]]
+
+
+def read_table(path: typing.Union[str, os.PathLike]) -> Pairs:
+    """Read the values and handler names from a JSON or CSV file.
+
+    Raises:
+        ValueError: if the file isn't a table of values and names.
+    """
+    path = pathlib.Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".json":
+        return _read_json(path)
+
+    if suffix == ".csv":
+        return _read_csv(path)
+
+    raise ValueError(
+        f"Can't read a table of handlers from {path}: expected a .json or "
+        ".csv file."
+    )
+
+
+def _read_json(path: pathlib.Path) -> Pairs:
+    table = json.loads(path.read_text())
+    if isinstance(table, dict):
+        pairs = list(table.items())
+    elif isinstance(table, list) and all(
+        isinstance(pair, list) and len(pair) == 2 for pair in table
+    ):
+        pairs = [(value, name) for value, name in table]
+    else:
+        raise ValueError(
+            f"Invalid table in {path}: expected an object, or a list of "
+            "[value, handler] pairs."
+        )
+
+    _check_names(path, pairs)
+
+    return pairs
+
+
+def _read_csv(path: pathlib.Path) -> Pairs:
+    pairs = []
+    with path.open(newline="") as file:
+        for line, row in enumerate(csv.reader(file), start=1):
+            if not row:
+                continue
+
+            if len(row) != 2:
+                raise ValueError(
+                    f"Invalid table in {path}, line {line}: expected a value "
+                    f"and a handler, not {len(row)} columns."
+                )
+
+            pairs.append((row[0], row[1]))
+
+    _check_names(path, pairs)
+
+    return pairs
+
+
+def _check_names(path: pathlib.Path, pairs: Pairs):
+    """Raise a ValueError if a handler name isn't a string."""
+    for value, name in pairs:
+        if not isinstance(name, str) or not name:
+            raise ValueError(
+                f"Invalid table in {path}: the handler for {value!r} must "
+                f"be named, not {name!r}."
+            )
+
+
+def resolve(
+    pairs: Pairs,
+    handlers: typing.Optional[typing.Mapping[str, typing.Callable]],
+    load: typing.Callable[[str], typing.Callable],
+) -> typing.Dict[typing.Callable, typing.List[typing.Any]]:
+    """Group the values by handler, finding each handler by name once.
+
+    Args:
+        pairs: the values and handler names.
+        handlers: the handlers, by name, or None to load each name as a
+            reference, "package.module:handler".
+        load: loads a reference.
+
+    Raises:
+        ValueError: if a name isn't one of handlers.
+    """
+    found: typing.Dict[str, typing.Callable] = {}
+    groups: typing.Dict[typing.Callable, typing.List[typing.Any]] = {}
+    for value, name in pairs:
+        handler = found.get(name)
+        if handler is None:
+            if handlers is None:
+                handler = load(name)
+            elif name in handlers:
+                handler = handlers[name]
+            else:
+                raise ValueError(
+                    f"No handler named {name!r}, for {value!r}: expected "
+                    f"one of {', '.join(map(repr, handlers))}."
+                )
+            found[name] = handler
+
+        groups.setdefault(handler, []).append(value)
+
+    return groups
@@ -0,0 +1,561 @@
+"""Compiled Dispatch
+-----------------
+
+Code generation for `singledispatch_literal(compiled=True)`.
+
+The default `singledispatch_literal` wrapper checks the literal registry and
+then calls the standard library's wrapper, which resolves the type of the
+first argument a second time. When compiled, the wrapper is generated from
+source specialised to the current registrations: literal and type resolution
+are merged into a single per-class lookup, and branches for features that are
+not in use are left out entirely. The source is regenerated, and swapped into
+the existing wrapper function, every time the registry changes.
+"""
+
+import abc
+import enum
+import functools
+import itertools
+import sys
+import typing
+import weakref
+
+LiteralRegistry = typing.Dict[type, typing.Dict[typing.Any, typing.Callable]]
+Plan = typing.Tuple[typing.Optional[dict], typing.Callable]
+MatchPlan = typing.Tuple[
+    typing.Optional[dict], typing.Optional[typing.Callable], typing.Callable
+]
+TablePlan = typing.Tuple[typing.Optional[dict], bool, typing.Callable]
+
+# the most classes each lookup cache holds before it's emptied. The caches
+# are plain dicts, which are faster to probe than the stdlib's
+# WeakKeyDictionary, so they keep the classes in them alive: bounding them
+# stops classes created at runtime, and dispatched once, piling up.
+_CACHE_SIZE = 4096
+
+# int literals are also kept in a list, indexed by value, if there are at
+# least this many in a range at most twice as long as their number, and no
+# longer than the maximum
+_INT_TABLE_MIN = 8
+_INT_TABLE_MAX = 1 << 16
+
+# the wrapper returned to users is created once and never replaced, because
+# it carries the register/dispatch/registry attributes. Regenerated source is
+# compiled into the same namespace and its code object is swapped in.
+_SIGNATURE = """\
+def wrapper(*args, **kwargs):
+"""
+
+# each of these finds the dispatched argument, and binds it to `arg`
+_FIRST_ARG = """\
+    if not args:
+        _raise_no_args(kwargs)
+    arg = args[0]
+"""
+
+_POSITIONAL_OR_KEYWORD_ARG = """\
+    if len(args) > {position}:
+        arg = args[{position}]
+    else:
+        try:
+            arg = kwargs[{keyword!r}]
+        except KeyError:
+            {missing}
+"""
+
+_KEYWORD_ARG = """\
+    try:
+        arg = kwargs[{keyword!r}]
+    except KeyError:
+        {missing}
+"""
+
+# what happens when the dispatched argument isn't passed, by whether its
+# parameter has a default, which is then dispatched on
+_NO_ARG = "_raise_no_args(kwargs)"
+_DEFAULT_ARG = "arg = _default"
+
+# dispatching on a key extracted from the argument, such as a field: only
+# the lookups below see the key, and the handler gets the original arguments
+_KEYED = """\
+    arg = _key(arg)
+"""
+
+# counting or timing calls (see partialdispatch.stats): everything is
+# resolved by the hooked lookup, so none of the lookups below are generated
+_HOOKED = """\
+    return _hooked(arg)(*args, **kwargs)
+"""
+
+# a dense range of int literals registered: ints in the range are looked up
+# by index, before anything else, as literals always win. Other ints, and
+# those in gaps, carry on to the probes below, which include every literal.
+# Checking the exact class keeps bools and int subclasses out. The bounds
+# are published with the list, and read with it once, so a call running the
+# previous code never indexes a new list with the old bounds.
+_INT_TABLE = """\
+    ints = _int_table
+    if arg.__class__ is int and ints[0] <= arg < ints[1]:
+        impl = ints[2][arg - ints[0]]
+        if impl is not None:
+            return impl(*args, **kwargs)
+"""
+
+# no literals registered and no ABCs in the registry: the implementation is
+# a pure function of the class, so memoise it in a plain dict.
+_TYPE_CACHED = """\
+    cls = arg.__class__
+    try:
+        impl = _impls[cls]
+    except KeyError:
+        impl = _remember(_impls, cls, _resolve(cls))
+    return impl(*args, **kwargs)
+"""
+
+# no literals registered, but ABCs in the registry: _dispatch memoises, and
+# handles invalidation via abc.get_cache_token(), like the stdlib's cache.
+_TYPE_UNCACHED = """\
+    return _dispatch(arg.__class__)(*args, **kwargs)
+"""
+
+# literals registered: resolve the literal values for the class and the type
+# implementation in one lookup, then probe the values.
+_LITERAL_CACHED = """\
+    cls = arg.__class__
+    try:
+        values, impl = _plans[cls]
+    except KeyError:
+        values, impl = _remember(_plans, cls, _plan(cls))
+"""
+
+_LITERAL_UNCACHED = """\
+    values, impl = _plan(arg.__class__)
+"""
+
+_LITERAL_PROBE = """\
+    if values is not None:
+        try:
+            impl = values.get(arg, impl)
+        except TypeError:
+            pass
+    return impl(*args, **kwargs)
+"""
+
+# literals registered for an enum: the members' implementations are kept in
+# a table by name, as Enum.__hash__ is a Python-level method, whereas a str
+# caches its hash. The plan says whether to probe the table by name.
+_TABLE_CACHED = """\
+    cls = arg.__class__
+    try:
+        values, by_name, impl = _table_plans[cls]
+    except KeyError:
+        values, by_name, impl = _remember(
+            _table_plans, cls, _table_plan(cls)
+        )
+    if by_name:
+        return values.get(arg._name_, impl)(*args, **kwargs)
+"""
+
+_TABLE_UNCACHED = """\
+    values, by_name, impl = _table_plan(arg.__class__)
+    if by_name:
+        return values.get(arg._name_, impl)(*args, **kwargs)
+"""
+
+# matchers registered (see partialdispatch.matchers): the plan also holds the
+# match function for the class. A literal hit is called straight away, so
+# that an exact value always wins over a range containing it. The plans are
+# kept apart from the literal-only ones, as they have a different shape.
+_MATCHER_CACHED = """\
+    cls = arg.__class__
+    try:
+        values, match, impl = _match_plans[cls]
+    except KeyError:
+        values, match, impl = _remember(
+            _match_plans, cls, _match_plan(cls)
+        )
+"""
+
+_MATCHER_UNCACHED = """\
+    values, match, impl = _match_plan(arg.__class__)
+"""
+
+_MATCHER_PROBE = """\
+    if values is not None:
+        try:
+            found = values.get(arg)
+        except TypeError:
+            found = None
+        if found is not None:
+            return found(*args, **kwargs)
+    if match is not None:
+        found = match(arg)
+        if found is not None:
+            impl = found
+    return impl(*args, **kwargs)
+"""
+
+
+def _is_abc(cls: typing.Any) -> bool:
+    """Does registering this class make stdlib dispatch depend on ABCs?"""
+
+    return hasattr(cls, "__abstractmethods__")
+
+
+def _generate_arg(
+    position: int, keyword: typing.Optional[str], has_default: bool = False
+) -> str:
+    """Generate the source binding the dispatched argument to `arg`."""
+    if keyword is None:
+        return _FIRST_ARG
+
+    missing = _DEFAULT_ARG if has_default else _NO_ARG
+    # keyword-only parameters have a position of sys.maxsize
+    if position == sys.maxsize:
+        return _KEYWORD_ARG.format(keyword=str(keyword), missing=missing)
+
+    return _POSITIONAL_OR_KEYWORD_ARG.format(
+        position=int(position), keyword=str(keyword), missing=missing
+    )
+
+
+def generate_source(
+    has_literals: bool,
+    cacheable: bool,
+    position: int = 0,
+    keyword: typing.Optional[str] = None,
+    has_matchers: bool = False,
+    has_tables: bool = False,
+    has_int_table: bool = False,
+    hooked: bool = False,
+    keyed: bool = False,
+    has_default: bool = False,
+) -> str:
+    """Generate the source of a wrapper for the given registry state.
+
+    Args:
+        has_literals: whether any literal values are registered.
+        cacheable: whether type resolution may be memoised by class.
+        position: the index of the dispatched argument, if positional.
+        keyword: the name of the dispatched argument, if it may be passed
+            by keyword. When None, the first positional argument is used.
+        has_matchers: whether any matchers, such as intervals, are
+            registered.
+        has_tables: whether literals are registered for any enums. Unused
+            with matchers, which are probed after the literal values.
+        has_int_table: whether a dense range of int literals is also held
+            in a list, in `_int_table` with its bounds (see `int_table`).
+        hooked: whether calls are resolved by a lookup counting or timing
+            them.
+        keyed: whether calls are dispatched on a key extracted from the
+            argument, by `_key`.
+        has_default: whether the keyword parameter has a default, in
+            `_default`, dispatched on when the argument isn't passed.
+    """
+    source = _SIGNATURE + _generate_arg(
+        position=position, keyword=keyword, has_default=has_default
+    )
+    if keyed:
+        source += _KEYED
+    if hooked:
+        return source + _HOOKED
+
+    if has_int_table:
+        source += _INT_TABLE
+
+    if has_matchers:
+        return (
+            source
+            + (_MATCHER_CACHED if cacheable else _MATCHER_UNCACHED)
+            + _MATCHER_PROBE
+        )
+
+    if not has_literals:
+        return source + (_TYPE_CACHED if cacheable else _TYPE_UNCACHED)
+
+    if has_tables:
+        return (
+            source
+            + (_TABLE_CACHED if cacheable else _TABLE_UNCACHED)
+            + _LITERAL_PROBE
+        )
+
+    return (
+        source
+        + (_LITERAL_CACHED if cacheable else _LITERAL_UNCACHED)
+        + _LITERAL_PROBE
+    )
+
+
+def compile_wrapper(
+    namespace: typing.Dict[str, typing.Any],
+    literal_registry: LiteralRegistry,
+    registry: typing.Mapping[typing.Any, typing.Callable],
+    position: int = 0,
+    keyword: typing.Optional[str] = None,
+    wrapper: typing.Optional[typing.Callable] = None,
+    matchers: typing.Optional[
+        typing.Mapping[type, typing.Callable[[typing.Any], typing.Any]]
+    ] = None,
+    classes: typing.Iterable[type] = (),
+    tables: typing.Optional[LiteralRegistry] = None,
+    hooked: typing.Optional[
+        typing.Callable[[typing.Any], typing.Callable]
+    ] = None,
+    keyed: bool = False,
+    has_default: bool = False,
+) -> typing.Callable:
+    """Build, or rebuild, a compiled wrapper from the registry state.
+
+    The namespace must already contain `_raise_no_args` and `_dispatch`
+    (see `make_dispatch`), `_key` if keyed, to extract the key dispatched
+    on, and `_default` if has_default, the default of the keyword
+    parameter. If an existing wrapper is passed, the new code is swapped
+    into it, so that references held by callers see the new call path.
+    Lookups for classes are resolved up front, if they can be memoised.
+    Tables are the literal implementations for enums, by member name (see
+    `enum_table`). If hooked is given, it resolves every call, such as to
+    count or time them.
+    """
+    # matchers registered for an ABC are found for a class through its
+    # ABCs, which can change, as for types
+    cacheable = not any(
+        _is_abc(cls) for cls in itertools.chain(registry, matchers or ())
+    )
+
+    # types are resolved from a snapshot of the registry. With ABCs
+    # registered, results aren't memoised here, as _dispatch's memo is
+    # needed for its invalidation.
+    resolve = _make_resolver(registry) if cacheable else namespace["_dispatch"]
+
+    # publish the new lookups before replacing the caches, so that a call
+    # running concurrently can't fill a new cache from the old lookups
+    namespace["_resolve"] = resolve
+    namespace["_plan"] = _make_plan(
+        literal_registry=literal_registry, dispatch=resolve
+    )
+    namespace["_match_plan"] = _make_match_plan(
+        literal_registry=literal_registry,
+        matchers=matchers or {},
+        dispatch=resolve,
+    )
+    namespace["_table_plan"] = _make_table_plan(
+        literal_registry=literal_registry,
+        tables=tables or {},
+        dispatch=resolve,
+    )
+    lower, table = int_table(literal_registry.get(int, {}))
+    # an empty range when there's no list, for calls still running code
+    # generated with one
+    namespace["_int_table"] = (
+        (0, 0, ()) if table is None else (lower, lower + len(table), table)
+    )
+    # the last hook is left in place when there's none, for calls still
+    # running code generated with it
+    if hooked is not None:
+        namespace["_hooked"] = hooked
+    namespace["_remember"] = _remember
+    namespace["_impls"] = {}
+    namespace["_plans"] = {}
+    namespace["_match_plans"] = {}
+    namespace["_table_plans"] = {}
+
+    source = generate_source(
+        has_literals=bool(literal_registry),
+        cacheable=cacheable,
+        position=position,
+        keyword=keyword,
+        has_matchers=bool(matchers),
+        has_tables=bool(tables),
+        has_int_table=table is not None,
+        hooked=hooked is not None,
+        keyed=keyed,
+        has_default=has_default,
+    )
+    # source is built only from the fragments above, formatted with an int
+    # and the repr of a parameter name
+    code = compile(source, "<singledispatch_literal>", "exec")
+    exec(code, namespace)  # nosec B102
+
+    if cacheable and hooked is None:
+        if matchers:
+            cache, resolve_plan = "_match_plans", namespace["_match_plan"]
+        elif tables:
+            cache, resolve_plan = "_table_plans", namespace["_table_plan"]
+        elif literal_registry:
+            cache, resolve_plan = "_plans", namespace["_plan"]
+        else:
+            cache, resolve_plan = "_impls", resolve
+
+        namespace[cache].update((cls, resolve_plan(cls)) for cls in classes)
+
+    if wrapper is None:
+        return namespace["wrapper"]
+
+    wrapper.__code__ = namespace["wrapper"].__code__
+
+    return wrapper
+
+
+def _remember(cache: dict, cls: type, value: typing.Any) -> typing.Any:
+    """Cache the lookup for a class, emptying the cache first if full."""
+    if len(cache) >= _CACHE_SIZE:
+        cache.clear()
+    cache[cls] = value
+
+    return value
+
+
+def _make_resolver(
+    registry: typing.Mapping[typing.Any, typing.Callable],
+) -> typing.Callable[[type], typing.Callable]:
+    """Create a function resolving type implementations from a snapshot."""
+    # copied in one step, as dict() iterates a mappingproxy key by key
+    snapshot = registry.copy()  # type: ignore
+
+    def resolve(cls: type) -> typing.Callable:
+        """The implementation for cls, as registered at the snapshot."""
+
+        return functools._find_impl(cls, snapshot)
+
+    return resolve
+
+
+def make_dispatch(
+    registry: typing.Mapping[typing.Any, typing.Callable],
+    abcs: bool,
+) -> typing.Callable[[type], typing.Callable]:
+    """Create a function resolving type implementations, like the stdlib's
+    `dispatch`, from a snapshot of the registry.
+
+    Registering a type while the stdlib's `dispatch` walks the registry, in
+    another thread, can raise a RuntimeError, or leave its cache stale, so
+    a new function is created from each version of the registry. Like the
+    stdlib's, its results are memoised by weak reference, and, with ABCs
+    registered, forgotten whenever an ABC gains a virtual subclass.
+
+    Args:
+        registry: the stdlib's registry.
+        abcs: whether any ABCs are registered (see `_is_abc`).
+    """
+    resolve = _make_resolver(registry)
+    memo: typing.MutableMapping[
+        type, typing.Callable
+    ] = weakref.WeakKeyDictionary()
+    token = abc.get_cache_token() if abcs else None
+
+    def dispatch(cls: type) -> typing.Callable:
+        """The implementation for cls, as registered at the snapshot."""
+        nonlocal token
+
+        if token is not None:
+            current = abc.get_cache_token()
+            if token != current:
+                memo.clear()
+                token = current
+
+        try:
+            return memo[cls]
+        except KeyError:
+            impl = memo[cls] = resolve(cls)
+            return impl
+
+    return dispatch
+
+
+def _make_match_plan(
+    literal_registry: LiteralRegistry,
+    matchers: typing.Mapping[type, typing.Callable[[typing.Any], typing.Any]],
+    dispatch: typing.Callable[[type], typing.Callable],
+) -> typing.Callable[[type], MatchPlan]:
+    """Create the function resolving the lookup plan, with matchers."""
+
+    def match_plan(cls: type) -> MatchPlan:
+        """Literal values and matcher for cls, if any, and its impl."""
+
+        return literal_registry.get(cls), matchers.get(cls), dispatch(cls)
+
+    return match_plan
+
+
+def enum_table(
+    cls: type, values: typing.Dict[typing.Any, typing.Callable]
+) -> typing.Optional[typing.Dict[str, typing.Callable]]:
+    """The literal implementations for an enum's members, by name.
+
+    Returns None unless cls is an enum whose members each have a distinct
+    name, which excludes flags, as their combinations needn't have one.
+    """
+    if not isinstance(cls, enum.EnumMeta) or issubclass(cls, enum.Flag):
+        return None
+
+    return {member._name_: impl for member, impl in values.items()}
+
+
+def int_table(
+    values: typing.Dict[int, typing.Callable]
+) -> typing.Tuple[int, typing.Optional[typing.List[typing.Any]]]:
+    """The implementations for a dense range of int literals, by index.
+
+    Finds a range of the values at least half full, holding as many as
+    possible, scanning them in order.
+
+    Returns:
+        the lower bound of the range, and a list of the implementation for
+        each int from there, or None in gaps. The list is None if there's no
+        range holding enough values.
+    """
+    keys = sorted(values)
+    best, start = (0, 0), 0
+    for end, key in enumerate(keys):
+        # drop values from the start until the range is half full
+        while (key - keys[start] + 1) > 2 * (end - start + 1):
+            start += 1
+        if end - start > best[1] - best[0]:
+            best = (start, end)
+
+    start, end = best
+    if (
+        end - start + 1 < _INT_TABLE_MIN
+        or keys[end] - keys[start] >= _INT_TABLE_MAX
+    ):
+        return 0, None
+
+    lower = keys[start]
+    table = [None] * (keys[end] - lower + 1)
+    for key in keys[start : end + 1]:
+        table[key - lower] = values[key]
+
+    return lower, table
+
+
+def _make_table_plan(
+    literal_registry: LiteralRegistry,
+    tables: LiteralRegistry,
+    dispatch: typing.Callable[[type], typing.Callable],
+) -> typing.Callable[[type], TablePlan]:
+    """Create the function resolving the lookup plan, with enum tables."""
+
+    def table_plan(cls: type) -> TablePlan:
+        """The table or literal values for cls, if any, and its impl."""
+        table = tables.get(cls)
+        if table is not None:
+            return table, True, dispatch(cls)
+
+        return literal_registry.get(cls), False, dispatch(cls)
+
+    return table_plan
+
+
+def _make_plan(
+    literal_registry: LiteralRegistry,
+    dispatch: typing.Callable[[type], typing.Callable],
+) -> typing.Callable[[type], Plan]:
+    """Create the function which resolves the lookup plan for a class."""
+
+    def plan(cls: type) -> Plan:
+        """Literal values registered for cls, if any, and its type impl."""
+
+        return literal_registry.get(cls), dispatch(cls)
+
+    return plan
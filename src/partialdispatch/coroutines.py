@@ -0,0 +1,237 @@
+"""Coroutine Dispatch Functions
+----------------------------
+
+`singledispatch_literal` for coroutine functions.
+
+The implementation is resolved synchronously, exactly as for a synchronous
+dispatcher, and called directly: calling the dispatcher returns the
+implementation's coroutine, rather than a coroutine wrapping it, so there is
+no extra await per call. What's added is checking, when each implementation
+is registered, that it's a coroutine function like the default, and `gather`,
+to await the results for many values with bounded concurrency.
+"""
+import asyncio
+import collections.abc
+import functools
+import inspect
+import typing
+
+from .singledispatch import is_typey, singledispatch_literal
+
+T = typing.TypeVar("T")
+
+
+def _is_async(func: typing.Any) -> bool:
+    """Is func a coroutine function, or an object with an async __call__?"""
+    # unwrap staticmethod and classmethod
+    func = getattr(func, "__func__", func)
+
+    return inspect.iscoroutinefunction(func) or inspect.iscoroutinefunction(
+        getattr(func, "__call__", None)
+    )
+
+
+def _check_async(funcname: str, func: typing.Any, method: str = "register"):
+    """Raise an informative error if func isn't a coroutine function."""
+    if not _is_async(func):
+        name = getattr(func, "__name__", repr(func))
+        raise TypeError(
+            f"Invalid function passed to {funcname}.{method}: {name} is not "
+            f"a coroutine function, but {funcname} is. Define it with "
+            "`async def`, or use singledispatch_literal for synchronous "
+            "functions."
+        )
+
+
+def async_singledispatch_literal(
+    f: typing.Optional[typing.Callable[..., typing.Awaitable[T]]] = None,
+    *,
+    compiled: bool = False,
+    dispatch_on: typing.Optional[str] = None,
+    stats: bool = False,
+    deferred: typing.Optional[bool] = None,
+    key: typing.Union[
+        str, typing.Callable[[typing.Any], typing.Any], None
+    ] = None,
+) -> typing.Callable[..., typing.Awaitable[T]]:
+    """`singledispatch_literal` for coroutine functions.
+
+    The default implementation and every registered implementation must be
+    coroutine functions; a TypeError is raised when one isn't. Takes the
+    same arguments as `singledispatch_literal`, and adds `gather`.
+
+    >>> @async_singledispatch_literal
+    >>> async def handle(message):
+    >>>     ...
+
+    >>> @handle.register
+    >>> async def _(message: typing.Literal["ping"]):
+    >>>     return "pong"
+
+    >>> await handle.gather(messages, limit=100)
+    """
+    if f is None:
+        return functools.partial(
+            async_singledispatch_literal,
+            compiled=compiled,
+            dispatch_on=dispatch_on,
+            stats=stats,
+            deferred=deferred,
+            key=key,
+        )
+
+    funcname = getattr(f, "__name__", "async_singledispatch_literal function")
+    if not _is_async(f):
+        raise TypeError(
+            f"Invalid function passed to async_singledispatch_literal: "
+            f"{funcname} is not a coroutine function. Define it with "
+            "`async def`, or use singledispatch_literal instead."
+        )
+
+    wrapper = singledispatch_literal(
+        f,
+        compiled=compiled,
+        dispatch_on=dispatch_on,
+        stats=stats,
+        deferred=deferred,
+        key=key,
+    )
+    sync_register = wrapper.register
+    sync_register_many = wrapper.register_many
+
+    def register(
+        value: typing.Any = None,
+        func: typing.Optional[typing.Callable] = None,
+        *,
+        literal: bool = False,
+        **kwargs: typing.Any,
+    ):
+        """Register a coroutine function, see `singledispatch_literal`."""
+        if kwargs.get("batch"):
+            raise TypeError(
+                f"{funcname} is a coroutine function, so implementations "
+                "can't be registered with batch=True."
+            )
+
+        if func is None:
+            # called like @f.register(<SomeValueOrType>)?
+            if literal or not callable(value) or is_typey(value):
+                return lambda func: register(
+                    value, func, literal=literal, **kwargs
+                )
+
+            # no, called like @f.register
+            _check_async(funcname, value)
+
+            return sync_register(value, literal=literal, **kwargs)
+
+        _check_async(funcname, func)
+
+        return sync_register(value, func, literal=literal, **kwargs)
+
+    def register_many(
+        values: typing.Any,
+        handler: typing.Optional[typing.Callable] = None,
+    ):
+        """Register a table of coroutine functions, see `register_many`.
+
+        `register_table` registers through this, so its handlers are
+        checked too.
+        """
+        if handler is None:
+            if not isinstance(values, collections.abc.Mapping):
+                return lambda handler: register_many(values, handler)
+
+            for func in values.values():
+                _check_async(funcname, func, "register_many")
+        else:
+            _check_async(funcname, handler, "register_many")
+
+        return sync_register_many(values, handler)
+
+    def _make_gather(dispatcher: typing.Callable[..., typing.Awaitable[T]]):
+        """Build `gather` for dispatcher, which may have been frozen."""
+
+        async def gather(
+            values: typing.Iterable[typing.Any],
+            *extra: typing.Any,
+            limit: typing.Optional[int] = None,
+        ) -> typing.List[T]:
+            """Call the dispatcher for each value, concurrently.
+
+            Each value is passed as the dispatched argument (by keyword, if
+            dispatching on a named argument), with extra positional
+            arguments.
+
+            Args:
+                values: the values to dispatch.
+                extra: passed to every call.
+                limit: the most calls awaited at once. When given, only
+                    `limit` coroutines exist at a time, rather than one per
+                    value.
+
+            Returns:
+                the results, in the same order as values.
+            """
+            values = list(values)
+            if dispatch_on is None:
+
+                def call(value: typing.Any) -> typing.Awaitable[T]:
+                    return dispatcher(value, *extra)
+
+            else:
+
+                def call(value: typing.Any) -> typing.Awaitable[T]:
+                    return dispatcher(*extra, **{dispatch_on: value})
+
+            if limit is None:
+                return list(await asyncio.gather(*map(call, values)))
+
+            if limit < 1:
+                raise ValueError(
+                    f"gather limit must be at least 1, not {limit}."
+                )
+
+            results: typing.List[typing.Any] = [None] * len(values)
+            pending = enumerate(values)
+
+            async def worker():
+                # each worker calls for the next value until there are none
+                # left, so at most `limit` coroutines exist at once
+                for i, value in pending:
+                    results[i] = await call(value)
+
+            await asyncio.gather(
+                *(worker() for _ in range(min(limit, len(values))))
+            )
+
+            return results
+
+        return gather
+
+    def freeze() -> typing.Callable[..., typing.Awaitable[T]]:
+        """Make the dispatcher immutable, see `singledispatch_literal`.
+
+        The dispatcher returned keeps `gather`, and rejects synchronous
+        implementations, like this one.
+        """
+        frozen = sync_freeze()
+        if frozen is not wrapper:
+            _add_attributes(frozen)
+
+        return frozen
+
+    def _add_attributes(dispatcher: typing.Callable[..., typing.Awaitable[T]]):
+        """Add the attributes which differ from a synchronous dispatcher's."""
+        dispatcher.register = register
+        dispatcher.register_many = register_many
+        dispatcher.gather = _make_gather(dispatcher)
+        dispatcher.freeze = freeze
+
+    sync_freeze = wrapper.freeze
+    _add_attributes(wrapper)
+
+    return wrapper
+
+
+__all__ = ["async_singledispatch_literal"]
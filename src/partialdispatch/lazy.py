@@ -0,0 +1,82 @@
+"""Lazy Registration
+-----------------
+
+Handlers registered by reference, as "package.module:handler", with
+`register_lazy`.
+
+Registering a handler normally means importing its module, and inspecting its
+signature and annotations, when it's registered. A lazy handler is recorded
+with a placeholder, which costs neither: the first time it's dispatched to,
+the placeholder imports the handler and registers it in its place, validating
+it as `register` would, then calls it. After that, calls go straight to the
+handler.
+"""
+import importlib
+import threading
+import typing
+
+
+def parse_reference(reference: str) -> typing.Tuple[str, typing.List[str]]:
+    """Split "package.module:name.attr" into the module and the attributes."""
+    module, sep, name = reference.partition(":")
+    attrs = name.split(".")
+    if not sep or not module or not all(attrs):
+        raise ValueError(
+            f"Invalid handler reference {reference!r}: expected "
+            "'package.module:handler'."
+        )
+
+    return module, attrs
+
+
+def load(reference: str) -> typing.Callable:
+    """Import the handler a reference is to."""
+    module, attrs = parse_reference(reference)
+    obj = importlib.import_module(module)
+    for attr in attrs:
+        obj = getattr(obj, attr)
+
+    return obj
+
+
+class LazyHandler:
+    """Placeholder for a handler, imported when it's first called.
+
+    Args:
+        reference: where to find the handler, as "package.module:handler".
+        register: called with the handler once it's imported, to validate it
+            and register it in place of the placeholder.
+    """
+
+    __slots__ = ("reference", "_register", "_handler", "_lock")
+
+    def __init__(
+        self,
+        reference: str,
+        register: typing.Callable[[typing.Callable], typing.Any],
+    ):
+        parse_reference(reference)
+        self.reference = reference
+        self._register = register
+        self._handler: typing.Optional[typing.Callable] = None
+        self._lock = threading.Lock()
+
+    def resolve(self) -> typing.Callable:
+        """Import and register the handler, if not already done."""
+        handler = self._handler
+        if handler is not None:
+            return handler
+
+        with self._lock:
+            if self._handler is None:
+                handler = load(self.reference)
+                self._register(handler)
+                self._handler = handler
+
+        return self._handler
+
+    def __call__(self, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"LazyHandler({self.reference!r})"
@@ -0,0 +1,1058 @@
+"""Value Matchers
+--------------
+
+Dispatch on ranges of values, string prefixes, regular expressions or
+unhashable values such as lists and dicts, rather than single literal values.
+
+A matcher spec, such as `Interval(0, 100)`, is registered either directly,
+`@f.register(Interval(0, 100))`, or as metadata on the annotation of the
+first argument, `typing.Annotated[int, Interval(0, 100)]`. Specs are added
+to an index for each class they apply to, and each kind of spec has its own
+index type, built so that one lookup resolves a call however many specs are
+registered. Indexes are only changed before they're used for dispatch: to
+add a spec to one in use, `copy` it and add to the copy. Matchers are
+consulted after a literal value lookup misses, and
+before falling back to dispatch on type. Where specs of several kinds are
+registered for one class, structural values are checked first, then
+discriminators, then intervals, then prefixes, then regular expressions,
+then guards.
+
+Specs are matched against the exact class of the argument, like literal
+values, except those registered for an ABC, such as
+`collections.abc.Mapping`, which are matched against instances of every
+class it covers, after any registered for the class itself.
+"""
+import abc
+import bisect
+import functools
+import re
+import types
+import typing
+import warnings
+import weakref
+
+# `typing.Annotated` was new in 3.9
+_Annotated = getattr(typing, "Annotated", None)
+# `int | str` has a different origin to `typing.Union[int, str]` from 3.10
+UNION_ORIGINS = (typing.Union, getattr(types, "UnionType", typing.Union))
+
+Impl = typing.Callable[..., typing.Any]
+
+
+class IntervalIndex:
+    """Sorted index of non-overlapping intervals, for one class of value.
+
+    Lookups bisect a precomputed array of lower bounds, so cost O(log n)
+    comparisons however many intervals are registered.
+    """
+
+    # order in which indexes are consulted, lower first
+    priority = 20
+
+    def __init__(self):
+        # bounded-below intervals, sorted by lower bound, with a parallel
+        # array of the lower bounds for bisecting
+        self._lowers: typing.List[typing.Any] = []
+        self._intervals: typing.List[typing.Tuple["Interval", Impl]] = []
+        # the interval with no lower bound, if there is one
+        self._unbounded: typing.Optional[typing.Tuple["Interval", Impl]] = None
+
+    def __len__(self) -> int:
+        return len(self._intervals) + (self._unbounded is not None)
+
+    def __iter__(self) -> typing.Iterator[typing.Tuple["Interval", Impl]]:
+        if self._unbounded is not None:
+            yield self._unbounded
+
+        yield from self._intervals
+
+    def copy(self) -> "IntervalIndex":
+        """A copy, which can be added to without changing this index."""
+        index = IntervalIndex()
+        # add replaces, rather than changes, these
+        index._lowers = self._lowers
+        index._intervals = self._intervals
+        index._unbounded = self._unbounded
+
+        return index
+
+    def add(self, interval: "Interval", impl: Impl):
+        """Add an interval, replacing the impl if it's already registered.
+
+        Raises:
+            ValueError: if the interval overlaps one already registered.
+        """
+        entries = list(self)
+        for i, (existing, _) in enumerate(entries):
+            if existing == interval:
+                entries[i] = (interval, impl)
+                break
+
+            if existing.overlaps(interval):
+                raise ValueError(
+                    f"{interval} overlaps {existing}, which is already "
+                    "registered. Intervals registered for the same class "
+                    "must not overlap."
+                )
+        else:
+            entries.append((interval, impl))
+
+        self._unbounded = next(
+            (e for e in entries if e[0].lower is None), None
+        )
+        self._intervals = sorted(
+            (e for e in entries if e[0].lower is not None),
+            key=lambda e: e[0].lower,
+        )
+        self._lowers = [interval.lower for interval, _ in self._intervals]
+
+    def match(self, value: typing.Any) -> typing.Optional[Impl]:
+        """Find the implementation for the interval containing value."""
+        intervals = self._intervals
+        i = bisect.bisect_right(self._lowers, value) - 1
+        if i >= 0:
+            interval, impl = intervals[i]
+            if value in interval:
+                return impl
+
+            # an interval excluding its lower bound may follow one which
+            # includes the same value as its upper bound
+            if i > 0 and value == interval.lower:
+                interval, impl = intervals[i - 1]
+                if value in interval:
+                    return impl
+
+        if self._unbounded is not None:
+            interval, impl = self._unbounded
+            if value in interval:
+                return impl
+
+        return None
+
+
+class Interval:
+    """A range of values, between a lower and upper bound.
+
+    By default the lower bound is included, and the upper is not, so that
+    adjacent bands like `Interval(0, 100)` and `Interval(100, 200)` do not
+    overlap. Either bound can be None, for an unbounded interval.
+
+    Args:
+        lower: the lower bound, or None.
+        upper: the upper bound, or None.
+        closed: which bounds are included: "left", "right", "both" or
+            "neither".
+    """
+
+    __slots__ = ("lower", "upper", "closed", "_lower_open", "_upper_open")
+
+    def __init__(
+        self,
+        lower: typing.Any = None,
+        upper: typing.Any = None,
+        closed: str = "left",
+    ):
+        if closed not in ("left", "right", "both", "neither"):
+            raise ValueError(
+                "Interval closed must be one of 'left', 'right', 'both' or "
+                f"'neither', not {closed!r}."
+            )
+
+        if lower is None and upper is None:
+            raise ValueError("Interval needs at least one bound.")
+
+        if lower is not None and upper is not None and not lower <= upper:
+            raise ValueError(
+                f"Interval lower bound {lower!r} is greater than its upper "
+                f"bound {upper!r}."
+            )
+
+        self.lower = lower
+        self.upper = upper
+        self.closed = closed
+        self._lower_open = closed in ("right", "neither")
+        self._upper_open = closed in ("left", "neither")
+
+    # the type of index this spec is added to
+    index = IntervalIndex
+
+    def __repr__(self) -> str:
+        return f"Interval({self.lower!r}, {self.upper!r}, {self.closed!r})"
+
+    def __eq__(self, other: typing.Any) -> bool:
+        if not isinstance(other, Interval):
+            return NotImplemented
+
+        return (self.lower, self.upper, self.closed) == (
+            other.lower,
+            other.upper,
+            other.closed,
+        )
+
+    def __hash__(self) -> int:
+        return hash((Interval, self.lower, self.upper, self.closed))
+
+    def __contains__(self, value: typing.Any) -> bool:
+        lower, upper = self.lower, self.upper
+        if lower is not None and (
+            value < lower or (self._lower_open and value == lower)
+        ):
+            return False
+
+        if upper is not None and (
+            value > upper or (self._upper_open and value == upper)
+        ):
+            return False
+
+        return True
+
+    def default_classes(self) -> typing.Tuple[type, ...]:
+        """Classes of argument this applies to, if not annotated with one.
+
+        Literal values are matched within their exact type, so intervals are
+        too, except that int and float bounds match both ints and floats.
+        """
+        bound = self.lower if self.lower is not None else self.upper
+        cls = type(bound)
+        if cls in (int, float):
+            return (int, float)
+
+        return (cls,)
+
+    def overlaps(self, other: "Interval") -> bool:
+        """Do the two intervals have any values in common?"""
+
+        def below(a: Interval, b: Interval) -> bool:
+            # is all of a below all of b?
+            if a.upper is None or b.lower is None:
+                return False
+
+            return a.upper < b.lower or (
+                a.upper == b.lower and (a._upper_open or b._lower_open)
+            )
+
+        return not (below(self, other) or below(other, self))
+
+
+# marks the end of a prefix in PrefixIndex's trie
+_END = object()
+
+
+class PrefixIndex:
+    """Trie of registered prefixes, for one class of string.
+
+    A lookup walks the value once, remembering the last prefix it passed
+    through, so the longest registered prefix wins.
+    """
+
+    priority = 30
+
+    def __init__(self):
+        self._root: typing.Dict[typing.Any, typing.Any] = {}
+        self._prefixes: typing.Dict["Prefix", Impl] = {}
+
+    def __len__(self) -> int:
+        return len(self._prefixes)
+
+    def __iter__(self) -> typing.Iterator[typing.Tuple["Prefix", Impl]]:
+        yield from self._prefixes.items()
+
+    def copy(self) -> "PrefixIndex":
+        """A copy, which can be added to without changing this index."""
+        index = PrefixIndex()
+        for prefix, impl in self:
+            index.add(prefix, impl)
+
+        return index
+
+    def add(self, prefix: "Prefix", impl: Impl):
+        """Add a prefix, replacing the impl if it's already registered."""
+        self._prefixes[prefix] = impl
+        node = self._root
+        for char in prefix.prefix:
+            node = node.setdefault(char, {})
+
+        node[_END] = impl
+
+    def match(self, value: typing.Any) -> typing.Optional[Impl]:
+        """Find the implementation for the longest prefix of value."""
+        node = self._root
+        impl = node.get(_END)
+        for char in value:
+            node = node.get(char)
+            if node is None:
+                break
+
+            impl = node.get(_END, impl)
+
+        return impl
+
+
+class Prefix:
+    """Matches strings (or bytes) starting with prefix.
+
+    When several registered prefixes match, the longest wins.
+
+    Args:
+        prefix: the str or bytes prefix.
+    """
+
+    __slots__ = ("prefix",)
+
+    def __init__(self, prefix: typing.Union[str, bytes]):
+        if not isinstance(prefix, (str, bytes)):
+            raise TypeError(
+                f"Prefix must be a str or bytes, not {type(prefix)}."
+            )
+
+        self.prefix = prefix
+
+    index = PrefixIndex
+
+    def __repr__(self) -> str:
+        return f"Prefix({self.prefix!r})"
+
+    def __eq__(self, other: typing.Any) -> bool:
+        if not isinstance(other, Prefix):
+            return NotImplemented
+
+        return self.prefix == other.prefix
+
+    def __hash__(self) -> int:
+        return hash((Prefix, self.prefix))
+
+    def default_classes(self) -> typing.Tuple[type, ...]:
+        """Classes of argument this applies to, if not annotated with one."""
+
+        return (type(self.prefix),)
+
+
+class RegexIndex:
+    """Registered regular expressions, for one class of string.
+
+    Consecutive patterns are combined into a single alternation, with a named
+    group per pattern, so one scan finds which pattern matched. Patterns with
+    their own capturing groups, whose numbering an alternation would change,
+    or which can't be combined (for instance, because of inline flags), are
+    matched on their own, in their place in the registration order.
+    """
+
+    priority = 40
+
+    def __init__(self):
+        self._patterns: typing.Dict["Regex", Impl] = {}
+        # (compiled pattern, implementations by group name, impl): one of
+        # the last two is None, depending on whether patterns were combined
+        self._segments: typing.List[
+            typing.Tuple[
+                re.Pattern,
+                typing.Optional[typing.Dict[str, Impl]],
+                typing.Optional[Impl],
+            ]
+        ] = []
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def __iter__(self) -> typing.Iterator[typing.Tuple["Regex", Impl]]:
+        yield from self._patterns.items()
+
+    def copy(self) -> "RegexIndex":
+        """A copy, which can be added to without changing this index."""
+        index = RegexIndex()
+        index._patterns = dict(self._patterns)
+        # add replaces, rather than changes, the segments
+        index._segments = self._segments
+
+        return index
+
+    def add(self, regex: "Regex", impl: Impl):
+        """Add a pattern, replacing the impl if it's already registered."""
+        self._patterns[regex] = impl
+        self._segments = []
+        run: typing.List[typing.Tuple[Regex, Impl]] = []
+        for regex, impl in self._patterns.items():
+            compiled = regex.compiled
+            if compiled.groups:
+                self._flush(run)
+                run = []
+                self._segments.append((compiled, None, impl))
+            elif run and run[0][0].compiled.flags != compiled.flags:
+                self._flush(run)
+                run = [(regex, impl)]
+            else:
+                run.append((regex, impl))
+
+        self._flush(run)
+
+    def _flush(self, run: typing.List[typing.Tuple["Regex", Impl]]):
+        """Add a run of patterns as one alternation, if possible."""
+        if len(run) < 2:
+            self._segments.extend((r.compiled, None, impl) for r, impl in run)
+            return
+
+        first = run[0][0].compiled
+        # build the alternation from str or bytes, to match the patterns
+        text = type(first.pattern)
+        parts = [
+            _as(text, f"(?P<_{i}>") + regex.compiled.pattern + _as(text, ")")
+            for i, (regex, _) in enumerate(run)
+        ]
+        try:
+            with warnings.catch_warnings():
+                # e.g. inline global flags anywhere but the start
+                warnings.simplefilter("error")
+                combined = re.compile(_as(text, "|").join(parts), first.flags)
+        except (re.error, Warning):
+            self._segments.extend((r.compiled, None, impl) for r, impl in run)
+            return
+
+        impls = {f"_{i}": impl for i, (_, impl) in enumerate(run)}
+        self._segments.append((combined, impls, None))
+
+    def match(self, value: typing.Any) -> typing.Optional[Impl]:
+        """Find the implementation for the first pattern matching value."""
+        for pattern, impls, impl in self._segments:
+            found = pattern.match(value)
+            if found is not None:
+                return impl if impls is None else impls[found.lastgroup]
+
+        return None
+
+
+def _as(text: type, source: str) -> typing.Union[str, bytes]:
+    """Convert regex syntax to str or bytes, to join with a pattern."""
+
+    return source if text is str else source.encode()
+
+
+class Regex:
+    """Matches strings (or bytes) matching a regular expression.
+
+    As with `re.match`, patterns match at the start of the value; end them
+    with `$`, or use `\\Z`, to match the whole value. When several
+    registered patterns match, the one registered first wins.
+
+    Args:
+        pattern: the pattern, as a str, bytes or compiled pattern.
+        flags: flags to compile a str or bytes pattern with.
+    """
+
+    __slots__ = ("compiled",)
+
+    def __init__(
+        self,
+        pattern: typing.Union[str, bytes, re.Pattern],
+        flags: int = 0,
+    ):
+        self.compiled = re.compile(pattern, flags)
+
+    index = RegexIndex
+
+    def __repr__(self) -> str:
+        return f"Regex({self.compiled.pattern!r}, {self.compiled.flags!r})"
+
+    def __eq__(self, other: typing.Any) -> bool:
+        if not isinstance(other, Regex):
+            return NotImplemented
+
+        return self.compiled == other.compiled
+
+    def __hash__(self) -> int:
+        return hash((Regex, self.compiled))
+
+    def default_classes(self) -> typing.Tuple[type, ...]:
+        """Classes of argument this applies to, if not annotated with one."""
+
+        return (type(self.compiled.pattern),)
+
+
+# how the unhashable containers decoded from JSON, and sets, are converted to
+# a hashable key equal for equal values. Each key is tagged with its class,
+# as literals are, so that a list and a tuple of the same items differ.
+_STRUCTURAL_KEYS: typing.Dict[
+    type, typing.Callable[[typing.Any], typing.Any]
+] = {
+    list: lambda value: (list, tuple(map(structural_key, value))),
+    tuple: lambda value: tuple(map(structural_key, value)),
+    dict: lambda value: (
+        dict,
+        frozenset((k, structural_key(v)) for k, v in value.items()),
+    ),
+    set: lambda value: (set, frozenset(value)),
+    bytearray: lambda value: (bytearray, bytes(value)),
+}
+
+
+def structural_key(value: typing.Any) -> typing.Any:
+    """A hashable key for value, equal for equal lists, dicts and sets.
+
+    Other values are their own key, so the key is unhashable if value holds
+    anything unhashable besides these.
+    """
+    convert = _STRUCTURAL_KEYS.get(value.__class__)
+
+    return value if convert is None else convert(value)
+
+
+class StructuralIndex:
+    """Registered values, by structural key, for one class of container.
+
+    Checked before the other matchers, as each is a single value, like a
+    literal.
+    """
+
+    priority = 10
+
+    def __init__(self):
+        self._values: typing.Dict[typing.Any, Impl] = {}
+        self._specs: typing.Dict[
+            typing.Any, typing.Tuple["Structural", Impl]
+        ] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __iter__(self) -> typing.Iterator[typing.Tuple["Structural", Impl]]:
+        yield from self._specs.values()
+
+    def copy(self) -> "StructuralIndex":
+        """A copy, which can be added to without changing this index."""
+        index = StructuralIndex()
+        index._values = dict(self._values)
+        index._specs = dict(self._specs)
+
+        return index
+
+    def add(self, spec: "Structural", impl: Impl):
+        """Add a value, replacing the impl if it's already registered."""
+        self._values[spec.key] = impl
+        self._specs[spec.key] = (spec, impl)
+
+    def match(self, value: typing.Any) -> typing.Optional[Impl]:
+        """Find the implementation for a value equal to value."""
+        try:
+            return self._values.get(structural_key(value))
+        except TypeError:
+            # holds something else unhashable, so can't equal any value
+            return None
+
+
+class Structural:
+    """Matches values equal to value, a list, dict or set.
+
+    These can't be registered as literals, since they can't be hashed, so
+    they're matched by a hashable key built from their contents instead (see
+    `structural_key`). As with literals, the argument must be of the same
+    class as value.
+
+    Args:
+        value: the value, which may hold other lists, dicts and sets.
+    """
+
+    __slots__ = ("value", "key")
+
+    def __init__(self, value: typing.Any):
+        key = structural_key(value)
+        try:
+            hash(key)
+        except TypeError as e:
+            raise TypeError(
+                f"Structural value {value!r} holds an unhashable value "
+                "which isn't a list, dict or set."
+            ) from e
+
+        self.value = value
+        self.key = key
+
+    index = StructuralIndex
+
+    def __repr__(self) -> str:
+        return f"Structural({self.value!r})"
+
+    def __eq__(self, other: typing.Any) -> bool:
+        if not isinstance(other, Structural):
+            return NotImplemented
+
+        return self.key == other.key
+
+    def __hash__(self) -> int:
+        return hash((Structural, self.key))
+
+    def default_classes(self) -> typing.Tuple[type, ...]:
+        """Classes of argument this applies to, if not annotated with one."""
+
+        return (type(self.value),)
+
+
+class DiscriminatorIndex:
+    """Registered discriminator values, by field, for one class of mapping.
+
+    Each lookup reads the field, then finds its value by exact class, as
+    literals are, so it costs the same however many values are registered.
+    Usually there's a single field, as in a discriminated union.
+    """
+
+    priority = 15
+
+    def __init__(self):
+        # field -> class of value -> value -> impl
+        self._fields: typing.Dict[
+            typing.Any, typing.Dict[type, typing.Dict[typing.Any, Impl]]
+        ] = {}
+        self._specs: typing.Dict["Discriminator", Impl] = {}
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def __iter__(
+        self,
+    ) -> typing.Iterator[typing.Tuple["Discriminator", Impl]]:
+        yield from self._specs.items()
+
+    def fields(self) -> typing.Tuple[typing.Any, ...]:
+        """The fields values are registered for."""
+
+        return tuple(self._fields)
+
+    def copy(self) -> "DiscriminatorIndex":
+        """A copy, which can be added to without changing this index."""
+        index = DiscriminatorIndex()
+        index._fields = {
+            field: {cls: dict(values) for cls, values in by_class.items()}
+            for field, by_class in self._fields.items()
+        }
+        index._specs = dict(self._specs)
+
+        return index
+
+    def add(self, spec: "Discriminator", impl: Impl):
+        """Add the spec's values, replacing any impl already registered."""
+        self._specs[spec] = impl
+        by_class = self._fields.setdefault(spec.field, {})
+        for value in spec.values:
+            by_class.setdefault(type(value), {})[value] = impl
+
+    def match(self, value: typing.Any) -> typing.Optional[Impl]:
+        """Find the implementation for the value of a registered field."""
+        for field, by_class in self._fields.items():
+            found = value.get(field)
+            values = by_class.get(found.__class__)
+            if values is not None:
+                try:
+                    impl = values.get(found)
+                except TypeError:
+                    # e.g. a tuple holding a list
+                    continue
+
+                if impl is not None:
+                    return impl
+
+        return None
+
+
+class Discriminator:
+    """Matches mappings whose field holds one of values.
+
+    Registered for a `typing.TypedDict` annotation whose discriminator field
+    is a `typing.Literal`, as instances are plain dicts, which can't be told
+    apart by type.
+
+    Args:
+        field: the key of the discriminator field.
+        values: the literal values it may hold.
+    """
+
+    __slots__ = ("field", "values")
+
+    def __init__(self, field: typing.Any, values: typing.Iterable[typing.Any]):
+        self.field = field
+        self.values = frozenset(values)
+
+    index = DiscriminatorIndex
+
+    def __repr__(self) -> str:
+        return f"Discriminator({self.field!r}, {set(self.values)!r})"
+
+    def __eq__(self, other: typing.Any) -> bool:
+        if not isinstance(other, Discriminator):
+            return NotImplemented
+
+        return (self.field, self.values) == (other.field, other.values)
+
+    def __hash__(self) -> int:
+        return hash((Discriminator, self.field, self.values))
+
+    def default_classes(self) -> typing.Tuple[type, ...]:
+        """Classes of argument this applies to, if not annotated with one."""
+
+        return (dict,)
+
+
+def is_typed_dict(value: typing.Any) -> bool:
+    """Is value a `typing.TypedDict` (or typing_extensions) class?"""
+
+    return (
+        isinstance(value, type)
+        and issubclass(value, dict)
+        and hasattr(value, "__total__")
+        and hasattr(value, "__annotations__")
+    )
+
+
+# how many calls between GuardIndex reordering its guards by hit rate
+_REORDER_INTERVAL = 1024
+# the most values each guard's negative cache holds before being emptied
+_NEGATIVE_CACHE_SIZE = 4096
+
+
+class _GuardEntry:
+    """A registered guard, with what's been observed about it."""
+
+    __slots__ = ("predicate", "impl", "cost", "order", "hits", "misses")
+
+    def __init__(self, guard: "Guard", impl: Impl, order: int):
+        self.predicate = guard.predicate
+        self.impl = impl
+        self.cost = guard.cost
+        # registration order, to break ties
+        self.order = order
+        self.hits = 0
+        # values the predicate rejected, if caching
+        self.misses: typing.Optional[set] = set() if guard.cache else None
+
+    def accepts(self, value: typing.Any) -> bool:
+        """Does the predicate accept value? Uses the cache, if enabled."""
+        misses = self.misses
+        # a class setting __hash__ to None, like list or dict, is known to
+        # be unhashable without trying, and raising, for each value
+        if misses is None or value.__class__.__hash__ is None:
+            return bool(self.predicate(value))
+
+        try:
+            if value in misses:
+                return False
+        except TypeError:
+            # unhashable, so can't be cached
+            return bool(self.predicate(value))
+
+        if self.predicate(value):
+            return True
+
+        if len(misses) >= _NEGATIVE_CACHE_SIZE:
+            misses.clear()
+        misses.add(value)
+
+        return False
+
+
+class GuardIndex:
+    """Registered guards (predicates), for one class of value.
+
+    Guards are tried cheapest first, by their declared cost. As calls are
+    made, the order adapts to how often each guard accepts: every
+    `_REORDER_INTERVAL` calls guards are sorted by cost over hits, so that
+    cheap guards which often match are tried first, and counts are halved
+    to favour recent calls. Because the order changes, guards registered
+    for a class are expected to be mutually exclusive.
+    """
+
+    priority = 50
+
+    def __init__(self):
+        self._guards: typing.Dict["Guard", Impl] = {}
+        self._entries: typing.List[_GuardEntry] = []
+        self._calls = 0
+
+    def __len__(self) -> int:
+        return len(self._guards)
+
+    def __iter__(self) -> typing.Iterator[typing.Tuple["Guard", Impl]]:
+        yield from self._guards.items()
+
+    def copy(self) -> "GuardIndex":
+        """A copy, which can be added to without changing this index."""
+        index = GuardIndex()
+        index._guards = dict(self._guards)
+        # add replaces, rather than changes, the entries
+        index._entries = self._entries
+
+        return index
+
+    def add(self, guard: "Guard", impl: Impl):
+        """Add a guard, replacing it if its predicate is already registered.
+
+        This resets the observed hit rates.
+        """
+        self._guards.pop(guard, None)
+        self._guards[guard] = impl
+        self._entries = [
+            _GuardEntry(g, i, order)
+            for order, (g, i) in enumerate(self._guards.items())
+        ]
+        self._calls = 0
+        self._reorder()
+
+    def _reorder(self):
+        """Sort the guards by expected cost of finding a match."""
+        # replaced rather than sorted in place, as calls in other threads
+        # may be iterating over them
+        entries = sorted(
+            self._entries, key=lambda e: (e.cost / (e.hits + 1), e.order)
+        )
+        for entry in entries:
+            entry.hits //= 2
+
+        self._entries = entries
+
+        self._calls = 0
+
+    def match(self, value: typing.Any) -> typing.Optional[Impl]:
+        """Find the implementation for the first guard accepting value."""
+        self._calls += 1
+        if self._calls >= _REORDER_INTERVAL:
+            self._reorder()
+
+        for entry in self._entries:
+            if entry.accepts(value):
+                entry.hits += 1
+
+                return entry.impl
+
+        return None
+
+
+class Guard:
+    """Matches values for which predicate returns a truthy value.
+
+    Usually registered with `register(cls, when=predicate)`, or by
+    annotating the argument with a class and passing `when`. Unlike other
+    matchers, a guard has no class of its own, so one must be given.
+
+    Args:
+        predicate: called with the dispatched argument.
+        cost: the relative cost of calling predicate; cheaper guards are
+            tried first.
+        cache: when True, hashable values the predicate rejects are
+            remembered, and it isn't called for them again. Only use this
+            if predicate is pure.
+    """
+
+    __slots__ = ("predicate", "cost", "cache")
+
+    def __init__(
+        self,
+        predicate: typing.Callable[[typing.Any], typing.Any],
+        cost: float = 1.0,
+        cache: bool = False,
+    ):
+        if not callable(predicate):
+            raise TypeError(f"Guard predicate {predicate!r} is not callable.")
+
+        if not cost > 0:
+            raise ValueError(f"Guard cost must be positive, not {cost!r}.")
+
+        self.predicate = predicate
+        self.cost = cost
+        self.cache = cache
+
+    index = GuardIndex
+
+    def __repr__(self) -> str:
+        return f"Guard({self.predicate!r}, {self.cost!r}, {self.cache!r})"
+
+    def __eq__(self, other: typing.Any) -> bool:
+        if not isinstance(other, Guard):
+            return NotImplemented
+
+        return self.predicate == other.predicate
+
+    def __hash__(self) -> int:
+        return hash((Guard, self.predicate))
+
+    def default_classes(self) -> typing.Tuple[type, ...]:
+        raise TypeError(
+            f"{self} must be registered for a class, e.g. "
+            "register(int, when=predicate), or on a function whose "
+            "argument is annotated with one."
+        )
+
+
+# spec types which can be registered, see get_matcher
+MATCHER_SPECS = (Interval, Prefix, Regex, Structural, Discriminator, Guard)
+
+
+def get_matcher(
+    value: typing.Any,
+) -> typing.Optional[typing.Tuple[typing.Tuple[type, ...], typing.Any]]:
+    """Get the matcher spec registered by value, and the classes it covers.
+
+    Value is either a spec itself, or a `typing.Annotated` type with a spec
+    in its metadata. Returns None if it is neither.
+    """
+    if isinstance(value, MATCHER_SPECS):
+        return value.default_classes(), value
+
+    if _Annotated is None or typing.get_origin(value) is not _Annotated:
+        return None
+
+    specs = [m for m in value.__metadata__ if isinstance(m, MATCHER_SPECS)]
+    if not specs:
+        return None
+
+    if len(specs) > 1:
+        raise TypeError(
+            f"Invalid annotation {value}: only one matcher, such as an "
+            "Interval, can be given per annotation."
+        )
+
+    cls = value.__origin__
+    if not isinstance(cls, type):
+        raise TypeError(
+            f"Invalid annotation {value}: matchers must annotate a class, "
+            f"not {cls}."
+        )
+
+    return (cls,), specs[0]
+
+
+def classes_of(value: typing.Any) -> typing.Tuple[type, ...]:
+    """The classes named by a class, or a union of classes."""
+    value = strip_annotated(value)
+    classes = (
+        typing.get_args(value)
+        if typing.get_origin(value) in UNION_ORIGINS
+        else (value,)
+    )
+    if not all(isinstance(cls, type) for cls in classes):
+        raise TypeError(
+            f"Invalid value passed to register: {value} is not a class, or "
+            "a union of classes."
+        )
+
+    return classes
+
+
+def strip_annotated(value: typing.Any) -> typing.Any:
+    """Remove `typing.Annotated` metadata which isn't a matcher spec."""
+    if _Annotated is not None and typing.get_origin(value) is _Annotated:
+        return value.__origin__
+
+    return value
+
+
+def compose(
+    indexes: typing.Iterable[typing.Any],
+) -> typing.Callable[[typing.Any], typing.Optional[Impl]]:
+    """Combine the indexes for a class into a single match function."""
+    matches = tuple(
+        index.match
+        for index in sorted(indexes, key=lambda index: index.priority)
+        if len(index)
+    )
+    if len(matches) == 1:
+        return matches[0]
+
+    def match(value: typing.Any) -> typing.Optional[Impl]:
+        for index_match in matches:
+            impl = index_match(value)
+            if impl is not None:
+                return impl
+
+        return None
+
+    return match
+
+
+class ClassMatchers(dict):
+    """The match function for each class, as built by `compose`, also
+    finding those registered for the ABCs a class is a subclass of.
+
+    Used in place of a dict, with `get`, when matchers are registered for
+    an ABC (see `by_class`). Those for a class's ABCs are tried in the order
+    of its MRO, as composed by the stdlib for `functools.singledispatch`,
+    after the class's own. What's found for each class is remembered until
+    an ABC gains a virtual subclass.
+    """
+
+    def __init__(self, matchers: typing.Mapping[type, typing.Callable]):
+        super().__init__(matchers)
+        self._abcs = {cls for cls in self if _is_abc(cls)}
+        self._found: typing.MutableMapping[
+            type, typing.Optional[typing.Callable]
+        ] = weakref.WeakKeyDictionary()
+        self._token = abc.get_cache_token()
+
+    def get(  # type: ignore[override]
+        self, cls: type, default: typing.Any = None
+    ) -> typing.Optional[typing.Callable]:
+        """The match function for cls, or default if there isn't one."""
+        token = abc.get_cache_token()
+        if token != self._token:
+            self._found.clear()
+            self._token = token
+
+        try:
+            found = self._found[cls]
+        except KeyError:
+            found = self._found[cls] = self._find(cls)
+
+        return default if found is None else found
+
+    def _find(self, cls: type) -> typing.Optional[typing.Callable]:
+        own = super().get(cls)
+        abcs = [
+            base
+            for base in functools._compose_mro(  # type: ignore[attr-defined]
+                cls, list(self._abcs)
+            )
+            if base in self._abcs and base is not cls
+        ]
+        if not abcs:
+            return own
+
+        matches = tuple(self[base] for base in abcs)
+        if own is not None:
+            matches = (own, *matches)
+        if len(matches) == 1:
+            return matches[0]
+
+        def match(value: typing.Any) -> typing.Optional[Impl]:
+            for class_match in matches:
+                impl = class_match(value)
+                if impl is not None:
+                    return impl
+
+            return None
+
+        return match
+
+
+def by_class(
+    matchers: typing.Dict[type, typing.Callable],
+) -> typing.Dict[type, typing.Callable]:
+    """The match functions by class, to look up with `get`.
+
+    A `ClassMatchers` if any are registered for an ABC, otherwise the dict
+    itself, whose lookups are faster.
+    """
+    if any(_is_abc(cls) for cls in matchers):
+        return ClassMatchers(matchers)
+
+    return matchers
+
+
+def _is_abc(cls: type) -> bool:
+    """Is cls an ABC, whose instances are mostly of other classes?"""
+
+    return hasattr(cls, "__abstractmethods__")
+
+
+__all__ = [
+    "Discriminator",
+    "Guard",
+    "Interval",
+    "Prefix",
+    "Regex",
+    "Structural",
+]
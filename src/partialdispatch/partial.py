@@ -0,0 +1,344 @@
+"""Partial Dispatch Functions
+--------------------------
+
+Dispatch on a chosen subset of positional arguments at once, mixing literal
+values and types at each position.
+
+Rather than nesting single dispatchers, which repeat signature handling and
+cache lookups at every level, each call builds one key from the dispatched
+arguments (its class, or the class and value for registered literals) and
+looks the implementation up in a single tuple-keyed cache. The most specific
+registration for a key is worked out once, on the first call with that key.
+"""
+import abc
+import functools
+import itertools
+import operator
+import types
+import typing
+
+from .matchers import UNION_ORIGINS
+from .singledispatch import (_get_signature, _iter_literal_params,
+                             _warn_value_unlikely, is_literal_annotation,
+                             is_typey)
+
+T = typing.TypeVar("T")
+
+
+class _Value(typing.NamedTuple):
+    """A literal value registered at a position, as opposed to a type."""
+
+    cls: type
+    value: typing.Any
+
+
+def _expand_spec(
+    spec: typing.Any, literal: bool
+) -> typing.List[typing.Union[type, _Value]]:
+    """Turn the value registered at one position into a list of specs.
+
+    Literal annotations and unions (of types or literals) are expanded into
+    their members. Anything which is not a type is a literal value, as with
+    singledispatch_literal.
+    """
+    if literal or (not is_typey(spec) and not is_literal_annotation(spec)):
+        _warn_value_unlikely(spec)
+
+        return [_Value(type(spec), spec)]
+
+    if is_literal_annotation(spec):
+        return [_Value(type(v), v) for v in _iter_literal_params(spec)]
+
+    if typing.get_origin(spec) in UNION_ORIGINS:
+        return list(
+            itertools.chain.from_iterable(
+                _expand_spec(a, literal=False) for a in typing.get_args(spec)
+            )
+        )
+
+    if not isinstance(spec, type):
+        raise TypeError(
+            f"Invalid value passed to register: {spec} is not a class, a "
+            "literal value or a typing.Literal annotation."
+        )
+
+    return [spec]
+
+
+def _dominates(
+    ranks: typing.Tuple[int, ...], other: typing.Tuple[int, ...]
+) -> bool:
+    """Is every position of ranks at least as specific as other?"""
+
+    return all(r <= o for r, o in zip(ranks, other))
+
+
+def partialdispatch(
+    *positions: int,
+) -> typing.Callable[[typing.Callable[..., T]], typing.Callable[..., T]]:
+    """Dispatch on the arguments at the given positions.
+
+    >>> @partialdispatch(0, 2)
+    >>> def handle(kind, payload, version):
+    >>>     return "default"
+
+    >>> @handle.register(typing.Literal["user"], int)
+    >>> def _(kind, payload, version):
+    >>>     return "user, int version"
+
+    >>> @handle.register
+    >>> def _(kind: str, payload, version: typing.Literal[2]):
+    >>>     return "any string, version 2"
+
+    >>> handle("user", {}, 1)
+    "user, int version"
+
+    >>> handle("group", {}, 2)
+    "any string, version 2"
+
+    >>> handle("user", {}, 2)
+    TypeError: Ambiguous dispatch for handle: ...
+
+    At each position, a registered literal value is more specific than any
+    type, and types are ordered by the argument's MRO. When no registration
+    is at least as specific as all the others at every position, calling
+    raises a TypeError, rather than picking one arbitrarily.
+
+    Args:
+        positions: indexes of the positional arguments to dispatch on.
+    """
+    if not positions:
+        raise TypeError("partialdispatch requires at least one position.")
+
+    if any(not isinstance(p, int) or p < 0 for p in positions):
+        raise TypeError(
+            "partialdispatch positions must be non-negative integers, got "
+            f"{positions}."
+        )
+
+    if len(set(positions)) != len(positions):
+        raise TypeError(f"partialdispatch positions repeated: {positions}.")
+
+    return functools.partial(_partialdispatch, positions=positions)
+
+
+def _partialdispatch(
+    f: typing.Callable[..., T], positions: typing.Tuple[int, ...]
+) -> typing.Callable[..., T]:
+    """Build a dispatcher on positions, with f as the default."""
+    funcname = getattr(f, "__name__", "partialdispatch function")
+    min_args = max(positions) + 1
+
+    # C-level extraction of the dispatched arguments, always as a tuple
+    if len(positions) == 1:
+        (position,) = positions
+
+        def get_values(args: tuple) -> tuple:
+            return (args[position],)
+
+    else:
+        get_values = operator.itemgetter(*positions)
+
+    # (spec, ...) -> implementation, where each spec is a type or _Value
+    registry: typing.Dict[tuple, typing.Callable[..., T]] = {}
+    # for each position, the classes with literals registered -> the values
+    literal_values: typing.List[typing.Dict[type, set]] = [
+        {} for _ in positions
+    ]
+    # key built from the call's arguments -> resolved implementation
+    dispatch_cache: typing.Dict[tuple, typing.Callable[..., T]] = {}
+    cache_token = None
+
+    def _add(specs: tuple, func: typing.Callable[..., T]):
+        nonlocal cache_token
+
+        registry[specs] = func
+        for spec, values in zip(specs, literal_values):
+            if isinstance(spec, _Value):
+                values.setdefault(spec.cls, set()).add(spec.value)
+            elif cache_token is None and hasattr(spec, "__abstractmethods__"):
+                cache_token = abc.get_cache_token()
+
+        dispatch_cache.clear()
+
+    def _key(values: typing.Sequence[typing.Any]) -> tuple:
+        """Build the cache key for the values at the dispatched positions."""
+        key = []
+        for value, registered in zip(values, literal_values):
+            cls = value.__class__
+            literals = registered.get(cls)
+            if literals is not None:
+                try:
+                    if value in literals:
+                        key.append((cls, value))
+                        continue
+                except TypeError:
+                    pass
+
+            key.append(cls)
+
+        return tuple(key)
+
+    def _find_impl(key: tuple) -> typing.Callable[..., T]:
+        """Find the most specific registration matching a key."""
+        candidates = []
+        for index, part in enumerate(key):
+            cls = part[0] if isinstance(part, tuple) else part
+            classes = [
+                specs[index]
+                for specs in registry
+                if isinstance(specs[index], type)
+            ]
+            # as with the stdlib, includes any relevant ABCs
+            mro = functools._compose_mro(cls, classes)
+            candidates.append(
+                [_Value(*part)] + mro if isinstance(part, tuple) else mro
+            )
+
+        best: typing.List[typing.Tuple[typing.Tuple[int, ...], tuple]] = []
+        for specs in registry:
+            try:
+                ranks = tuple(
+                    ordered.index(spec)
+                    for spec, ordered in zip(specs, candidates)
+                )
+            except ValueError:
+                # doesn't match at one of the positions
+                continue
+
+            if any(_dominates(other, ranks) for other, _ in best):
+                continue
+
+            best = [(o, s) for o, s in best if not _dominates(ranks, o)]
+            best.append((ranks, specs))
+
+        if len(best) > 1:
+            raise TypeError(
+                f"Ambiguous dispatch for {funcname}: "
+                + ", ".join(str(s) for _, s in best)
+                + " all match, and none is more specific at every position."
+            )
+
+        return registry[best[0][1]]
+
+    def _lookup(values: typing.Sequence[typing.Any]) -> typing.Callable:
+        """Find the implementation for values, via the dispatch cache."""
+        nonlocal cache_token
+
+        if cache_token is not None:
+            current_token = abc.get_cache_token()
+            if cache_token != current_token:
+                dispatch_cache.clear()
+                cache_token = current_token
+
+        key = _key(values)
+        try:
+            return dispatch_cache[key]
+        except KeyError:
+            impl = dispatch_cache[key] = _find_impl(key)
+
+        return impl
+
+    def dispatch(*values: typing.Any) -> typing.Callable[..., T]:
+        """Return the implementation for the values at the positions."""
+        if len(values) != len(positions):
+            raise TypeError(
+                f"{funcname}.dispatch() takes one value per dispatched "
+                f"position {positions}, got {len(values)}."
+            )
+
+        return _lookup(values)
+
+    def register(
+        *specs: typing.Any,
+        literal: bool = False,
+    ) -> typing.Callable:
+        """Register an implementation for the given types or literal values.
+
+        Pass one type, literal value or `typing.Literal` annotation for each
+        dispatched position, or use it as a plain decorator on a function
+        whose parameters at those positions are annotated. Unannotated
+        parameters match anything.
+
+        Args:
+            specs: the types or values, one per dispatched position.
+            literal: when True, the values are registered as literal values,
+                even if they are types.
+        """
+        # Is the decorator being called like @f.register?
+        if (
+            len(specs) == 1
+            and not literal
+            and callable(specs[0])
+            and not is_typey(specs[0])
+        ):
+            return _register_annotated(specs[0])
+
+        if len(specs) != len(positions):
+            raise TypeError(
+                f"{funcname}.register() takes one value per dispatched "
+                f"position {positions}, got {len(specs)}."
+            )
+
+        expanded = [_expand_spec(spec, literal=literal) for spec in specs]
+
+        def decorator(
+            func: typing.Callable[..., T]
+        ) -> typing.Callable[..., T]:
+            for combination in itertools.product(*expanded):
+                _add(combination, func)
+
+            return func
+
+        return decorator
+
+    def _register_annotated(
+        func: typing.Callable[..., T],
+    ) -> typing.Callable[..., T]:
+        """Register a function using the annotations of its parameters."""
+        params = list(_get_signature(func).parameters.values())
+        hints = typing.get_type_hints(getattr(func, "__func__", func))
+
+        if len(params) < min_args or any(
+            p.kind not in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)
+            for p in params[:min_args]
+        ):
+            raise TypeError(
+                f"Invalid function passed to {funcname}.register: "
+                f"{getattr(func, '__name__', func)} must accept the "
+                f"dispatched positions {positions} positionally."
+            )
+
+        expanded = [
+            _expand_spec(hints.get(params[p].name, object), literal=False)
+            for p in positions
+        ]
+        for combination in itertools.product(*expanded):
+            _add(combination, func)
+
+        return func
+
+    def wrapper(*args, **kwargs):
+        """Function that actually gets called."""
+        if len(args) < min_args:
+            raise TypeError(
+                f"{funcname} dispatches on the positional arguments at "
+                f"{positions}, so requires at least {min_args} positional "
+                f"argument(s), got {len(args)}."
+            )
+
+        return _lookup(get_values(args))(*args, **kwargs)
+
+    _add(tuple(object for _ in positions), f)
+
+    wrapper.register = register
+    wrapper.dispatch = dispatch
+    wrapper.registry = types.MappingProxyType(registry)
+    wrapper.positions = positions
+    wrapper._clear_cache = dispatch_cache.clear
+    functools.update_wrapper(wrapper=wrapper, wrapped=f)
+
+    return wrapper
+
+
+__all__ = ["partialdispatch"]
@@ -0,0 +1,211 @@
+"""Plugin Discovery
+----------------
+
+Handlers registered by installed packages, as entry points, with
+`load_entry_points`.
+
+Each entry point in a group refers to a handler, whose dispatched argument
+is annotated with the types or literal values it handles, like a function
+passed to `register`:
+
+    [project.entry-points."myapp.commands"]
+    export = "myplugin.commands:export"
+
+Finding out what each handler is for means importing it, so this is done
+once, and the results saved to a manifest: the literal values or type for
+each entry point, and where to find its handler. What a handler is for
+depends on the parameter dispatched on, so manifests are kept for each
+group and `dispatch_on`. After that, handlers are
+registered lazily from the manifest (see `partialdispatch.lazy`), so only
+the plugins handling the values actually dispatched are imported.
+
+The manifest records a fingerprint of the installed distributions, their
+names and versions, and it's rebuilt when the fingerprint no longer
+matches, such as once a distribution is installed, upgraded or removed.
+"""
+import hashlib
+import importlib.metadata
+import json
+import os
+import pathlib
+import sys
+import typing
+
+from .matchers import strip_annotated
+from .singledispatch import (_get_first_type_hint, _get_signature,
+                             _iter_literal_params, _unalias,
+                             is_literal_annotation)
+
+MANIFEST_VERSION = 1
+
+# literal values which can be saved to a manifest, and read back the same
+_JSON_TYPES = (str, int, float, bool, type(None))
+
+Record = typing.Dict[str, typing.Any]
+
+
+def fingerprint() -> str:
+    """A digest of the names and versions of the installed distributions.
+
+    These only change when distributions do, not when other files are
+    written to the directories on sys.path, such as a log in the working
+    directory.
+    """
+    installed = []
+    for dist in importlib.metadata.distributions():
+        metadata = dist.metadata
+        # None for a distribution without metadata, in newer Pythons
+        if metadata is None:
+            continue
+        installed.append((metadata["Name"] or "", metadata["Version"] or ""))
+
+    return hashlib.sha256(repr(sorted(installed)).encode()).hexdigest()
+
+
+def default_manifest(
+    group: str, dispatch_on: typing.Optional[str] = None
+) -> pathlib.Path:
+    """Where the manifest for a group is cached, by default."""
+    cache = os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache"
+    key = f"{sys.prefix}:{group}:{dispatch_on}"
+    name = hashlib.sha256(key.encode()).hexdigest()[:16]
+
+    return pathlib.Path(cache) / "partialdispatch" / f"{name}.json"
+
+
+def entry_points(group: str) -> typing.List[importlib.metadata.EntryPoint]:
+    """The entry points in a group, from every installed distribution."""
+    found = importlib.metadata.entry_points()
+    # the selection API was added in 3.10, before which it's a dict
+    if hasattr(found, "select"):
+        selected = found.select(group=group)
+    else:
+        selected = found.get(group, ())
+
+    return list({(ep.name, ep.value): ep for ep in selected}.values())
+
+
+def reference_to(obj: typing.Any) -> typing.Optional[str]:
+    """The "module:name" reference to a class or function, if it has one."""
+    module = getattr(obj, "__module__", None)
+    name = getattr(obj, "__qualname__", None)
+    if module is None or name is None or "<locals>" in name:
+        return None
+
+    return f"{module}:{name}"
+
+
+def describe(
+    ep: importlib.metadata.EntryPoint, dispatch_on: typing.Optional[str]
+) -> Record:
+    """Import an entry point's handler, and record what it's for.
+
+    Args:
+        ep: the entry point.
+        dispatch_on: the name of the dispatched parameter, if not the first.
+
+    Returns:
+        a record of the entry point's reference, with the literal "values"
+        or the "type" it's for, or neither if they couldn't be saved, in
+        which case the handler is imported whenever it's loaded.
+    """
+    record: Record = {"name": ep.name, "reference": ep.value}
+    handler = ep.load()
+    try:
+        hint = _get_first_type_hint(
+            func=handler,
+            sig=_get_signature(handler),
+            is_method=False,
+            dispatch_on=dispatch_on,
+        )
+    except KeyError:
+        # not annotated, which `register` reports when it's loaded
+        return record
+    annotation = strip_annotated(_unalias(hint))
+
+    if is_literal_annotation(annotation):
+        values = list(_iter_literal_params(annotation))
+        if all(type(value) in _JSON_TYPES for value in values):
+            record["values"] = values
+    elif isinstance(annotation, type):
+        reference = reference_to(annotation)
+        if reference is not None:
+            record["type"] = reference
+
+    return record
+
+
+def read_manifest(
+    path: pathlib.Path,
+    group: str,
+    stamp: str,
+    dispatch_on: typing.Optional[str] = None,
+) -> typing.Optional[typing.List[Record]]:
+    """The records for a group, if the manifest is for the installed set,
+    and was made dispatching on the same parameter."""
+    try:
+        manifest = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+    if (
+        not isinstance(manifest, dict)
+        or manifest.get("version") != MANIFEST_VERSION
+        or manifest.get("group") != group
+        or manifest.get("dispatch_on") != dispatch_on
+        or manifest.get("fingerprint") != stamp
+    ):
+        return None
+
+    return manifest.get("records")
+
+
+def write_manifest(
+    path: pathlib.Path,
+    group: str,
+    stamp: str,
+    records: typing.List[Record],
+    dispatch_on: typing.Optional[str] = None,
+):
+    """Save the records for a group, ignoring a cache we can't write to."""
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "group": group,
+        "dispatch_on": dispatch_on,
+        "fingerprint": stamp,
+        "records": records,
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # written to a temporary file and renamed, so that processes
+        # starting at the same time never read half a manifest
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        temporary.write_text(json.dumps(manifest))
+        os.replace(temporary, path)
+    except OSError:
+        pass
+
+
+def records(
+    group: str,
+    dispatch_on: typing.Optional[str],
+    manifest: typing.Optional[pathlib.Path],
+) -> typing.List[Record]:
+    """The records for a group's entry points, from the manifest if valid.
+
+    Args:
+        group: the entry point group.
+        dispatch_on: see `describe`.
+        manifest: where the manifest is cached, or None to not cache it.
+    """
+    stamp = fingerprint()
+    if manifest is not None:
+        cached = read_manifest(manifest, group, stamp, dispatch_on)
+        if cached is not None:
+            return cached
+
+    found = [describe(ep, dispatch_on) for ep in entry_points(group)]
+    if manifest is not None:
+        write_manifest(manifest, group, stamp, found, dispatch_on)
+
+    return found
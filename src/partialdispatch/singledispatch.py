@@ -3,13 +3,27 @@
 
 This module 
 """
+import collections.abc
+import contextlib
+import enum
 import functools
 import inspect
 import itertools
+import operator
+import os
+import pathlib
 import sys
+import threading
 import types
 import typing
 import warnings
+import weakref
+
+from . import bulk as _bulk
+from . import compiled as _compiled
+from . import lazy as _lazy
+from . import matchers as _matchers
+from . import stats as _stats
 
 T = typing.TypeVar("T")
 
@@ -46,6 +60,18 @@ else:
         "partialdispatch does not support Python {major}.{minor}"
     )
 
+# checked by is_typey for every registration, so only built once
+_TYPEY = TYPES + GENERIC_TYPES + SPECIAL_FORMS
+
+# 3.12 added `type` statements, whose aliases are registered by their value
+_TYPE_ALIAS = getattr(typing, "TypeAliasType", None)
+
+# set to defer registration work, when not passed to singledispatch_literal
+DEFERRED_ENV_VAR = "PARTIALDISPATCH_DEFERRED"
+
+# marks an argument left to its default, where None has a meaning of its own
+_DEFAULT = object()
+
 # ParamSpec was new in 3.10
 if sys.version_info >= (3, 10):
     P = typing.ParamSpec("P")
@@ -76,7 +102,42 @@ def _get_signature(cble: typing.Callable) -> inspect.Signature:
 def is_typey(obj: typing.Any) -> bool:
     """Does this object appear to be a type or special form?"""
 
-    return isinstance(obj, TYPES + GENERIC_TYPES + SPECIAL_FORMS)
+    return isinstance(obj, _TYPEY)
+
+
+def _unalias(value: typing.Any) -> typing.Any:
+    """The value of a `type` statement's alias, or value if it isn't one."""
+    if _TYPE_ALIAS is not None and isinstance(value, _TYPE_ALIAS):
+        return value.__value__
+
+    return value
+
+
+def _deferred_from_env() -> bool:
+    """Should registration be deferred, by default?"""
+
+    return os.environ.get(DEFERRED_ENV_VAR, "").lower() in ("1", "true")
+
+
+def _is_registered_value(value: typing.Any, literal: bool) -> bool:
+    """Is the first argument to register the value, rather than the func?"""
+
+    return (
+        literal  # value, user told us
+        or is_literal_annotation(value)
+        or is_typey(value)
+        or _matchers.get_matcher(value) is not None
+        or (
+            not callable(value)
+            and not (
+                isinstance(value, classmethod)
+                or (
+                    sys.version_info < (3, 10)
+                    and isinstance(value, staticmethod)
+                )
+            )
+        )
+    )
 
 
 def is_literal_annotation(
@@ -101,23 +162,73 @@ def is_literal_annotation(
     return False
 
 
-def flatten_literal_params(annotation: typing._SpecialForm) -> set:
-    """Flatten an annotation into a set of values."""
+def _iter_literal_params(
+    annotation: typing._SpecialForm,
+) -> typing.Iterator[typing.Any]:
+    """Iterate over the values in an annotation, without de-duplicating.
+
+    Values like 1 and True are equal, so would be merged by a set, but are
+    registered separately in the literal registry.
+    """
     if annotation is type(None):
-        return {None}
+        return iter((None,))
 
     if annotation.__origin__ is typing.Union:
-        return set(
-            itertools.chain.from_iterable(
-                flatten_literal_params(a) for a in annotation.__args__
-            )
+        return itertools.chain.from_iterable(
+            _iter_literal_params(a) for a in annotation.__args__
         )
 
-    return set(
+    return (
         arg if arg is not type(None) else None for arg in annotation.__args__
     )
 
 
+def flatten_literal_params(annotation: typing._SpecialForm) -> set:
+    """Flatten an annotation into a set of values."""
+
+    return set(_iter_literal_params(annotation))
+
+
+def _discriminator_of(
+    cls: type, in_use: typing.Iterable[typing.Any] = ()
+) -> _matchers.Discriminator:
+    """The discriminator for a TypedDict: its field annotated with a Literal.
+
+    If it has several, the one already used to dispatch other TypedDicts is
+    taken, so they must be given consistently.
+
+    Args:
+        cls: the TypedDict.
+        in_use: the discriminator fields already registered.
+
+    Raises:
+        TypeError: if there isn't one field to use.
+    """
+    fields = {}
+    for name, hint in typing.get_type_hints(cls).items():
+        hint = _matchers.strip_annotated(_unalias(hint))
+        if is_literal_annotation(hint):
+            fields[name] = hint
+
+    candidates = [name for name in fields if name in in_use] or list(fields)
+    if len(candidates) != 1:
+        raise TypeError(
+            f"Can't dispatch on {cls.__name__}: a TypedDict needs exactly one "
+            "field annotated with a typing.Literal, to discriminate it, but "
+            + (
+                "it has none."
+                if not candidates
+                else f"it has {', '.join(map(repr, candidates))}."
+            )
+        )
+
+    (field,) = candidates
+
+    return _matchers.Discriminator(
+        field, flatten_literal_params(fields[field])
+    )
+
+
 def _get_first_param(
     func: typing.Callable,
     sig: inspect.Signature,
@@ -134,6 +245,47 @@ def _get_first_param(
     return next(params)
 
 
+def _get_dispatch_param(
+    func: typing.Callable,
+    sig: inspect.Signature,
+    is_method: bool,
+    dispatch_on: typing.Optional[str],
+) -> inspect.Parameter:
+    """Get the parameter dispatched on: the first, or the one named."""
+    if dispatch_on is None:
+        return _get_first_param(func, sig, is_method=is_method)
+
+    try:
+        return sig.parameters[dispatch_on]
+    except KeyError:
+        name = getattr(func, "__name__", "unknown function")
+
+        raise TypeError(
+            f"Invalid function passed to singledispatch_literal. Function "
+            f"{name} has no parameter named '{dispatch_on}', which is the "
+            "parameter being dispatched on."
+        ) from None
+
+
+def _get_dispatch_position(sig: inspect.Signature, dispatch_on: str) -> int:
+    """Precompute where to find the dispatched argument in a call.
+
+    Returns the index of the parameter in positional arguments, or
+    `sys.maxsize` if it is keyword-only (so is never found positionally).
+    """
+    param = sig.parameters[dispatch_on]
+    if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+        raise TypeError(
+            f"Cannot dispatch on '{param}': singledispatch_literal "
+            "dispatches on a single argument, not *args or **kwargs."
+        )
+
+    if param.kind is param.KEYWORD_ONLY:
+        return sys.maxsize
+
+    return list(sig.parameters).index(dispatch_on)
+
+
 def _check_has_pos_params(
     func: typing.Callable[P, T], sig: inspect.Signature, is_method: bool
 ):
@@ -282,13 +434,21 @@ def _check_passed_as_annotation(f: typing.Callable) -> bool:
 
 
 def _get_first_type_hint(
-    func: typing.Callable, sig: inspect.Signature, is_method: bool
+    func: typing.Callable,
+    sig: inspect.Signature,
+    is_method: bool,
+    dispatch_on: typing.Optional[str] = None,
 ):
-    first_param = _get_first_param(func=func, sig=sig, is_method=is_method)
+    first_param = _get_dispatch_param(
+        func=func, sig=sig, is_method=is_method, dispatch_on=dispatch_on
+    )
+    if isinstance(func, (classmethod, staticmethod)):
+        func = func.__func__
+    # keep typing.Annotated metadata, which may hold a matcher spec
     hints = (
-        typing.get_type_hints(func)
-        if not isinstance(func, (classmethod, staticmethod))
-        else typing.get_type_hints(func.__func__)
+        typing.get_type_hints(func, include_extras=True)
+        if sys.version_info >= (3, 9)
+        else typing.get_type_hints(func)
     )
 
     return hints[first_param.name]
@@ -299,36 +459,255 @@ def _check_first_pos_param_annotated(
     func: typing.Callable[P, T],
     sig: inspect.Signature,
     is_method: bool,
+    dispatch_on: typing.Optional[str] = None,
 ):
     """Check whether signature has enough args and annotations."""
-    first_param = _get_first_param(func=func, sig=sig, is_method=is_method)
+    first_param = _get_dispatch_param(
+        func=func, sig=sig, is_method=is_method, dispatch_on=dispatch_on
+    )
     if first_param.annotation is inspect._empty:
         name = (
             func.__name__ if hasattr(func, "__name__") else "unknown function"
         )
+        which = "first" if dispatch_on is None else "dispatched"
 
         raise TypeError(
-            "Invalid function passed to register. The first argument of "
+            f"Invalid function passed to register. The {which} argument of "
             f"{name}, {first_param.name}, must be annotated if no value/type "
             "was passed as the first argument to register. Annotate it, or "
             f"use @{funcname}.register(some_value) instead."
         )
 
 
-def singledispatch_literal(f: typing.Callable[P, T]) -> typing.Callable[P, T]:
-    """Wrapper around functools.stdlib supporting literal arguments."""
+def _no_positional_args_error(
+    funcname: str, first_param: str, kwargs: typing.Dict[str, typing.Any]
+) -> TypeError:
+    """Informative error for when a dispatcher is called without args."""
+    val = kwargs.get(first_param) or "123"
+
+    return TypeError(
+        "When used with singledispatch or singledispatch_literal, "
+        f"{funcname} requires at least 1 positional argument. "
+        "Try calling the function like "
+        f"{funcname}({val}, ...) instead of "
+        f"{funcname}({first_param}={val})."
+    )
+
+
+def _frozen_error(funcname: str) -> TypeError:
+    """Error for trying to change a frozen dispatcher."""
+
+    return TypeError(
+        f"{funcname} has been frozen, so no more implementations can be "
+        "registered."
+    )
+
+
+def _key_getter(
+    key: typing.Union[str, typing.Callable[[typing.Any], typing.Any]],
+) -> typing.Callable[[typing.Any], typing.Any]:
+    """The function extracting the key dispatched on from an argument.
+
+    A string is made into an `operator` getter, so that extracting the key
+    doesn't add a Python-level call: "[type]" for an item, and "kind" or
+    "header.kind" for an attribute.
+    """
+    if not isinstance(key, str):
+        if not callable(key):
+            raise TypeError(
+                f"Invalid key {key!r}: expected a callable, or a string "
+                "naming an item, like '[type]', or an attribute."
+            )
+
+        return key
+
+    if key.startswith("[") and key.endswith("]"):
+        item = key[1:-1]
+        return operator.itemgetter(
+            int(item) if item.lstrip("-").isdigit() else item
+        )
+
+    if not all(name.isidentifier() for name in key.split(".")):
+        raise ValueError(
+            f"Invalid key {key!r}: expected an item, like '[type]', or an "
+            "attribute, like 'kind' or 'header.kind'."
+        )
+
+    return operator.attrgetter(key)
+
+
+def _identity(func: typing.Callable[P, T]) -> typing.Callable[P, T]:
+    return func
+
+
+def _in_transaction(
+    transaction: typing.Callable[[], typing.ContextManager[None]],
+    func: typing.Callable[P, T],
+) -> typing.Callable[P, T]:
+    """Make every call to func in a transaction."""
+
+    @functools.wraps(func)
+    def transactional(*args, **kwargs):
+        with transaction():
+            return func(*args, **kwargs)
+
+    return transactional
+
+
+def _batch_adapter(handler: typing.Callable) -> typing.Callable:
+    """Call a batch implementation with a batch of one value."""
+
+    @functools.wraps(handler)
+    def single(value, *args, **kwargs):
+        return handler([value], *args, **kwargs)[0]
+
+    return single
+
+
+def singledispatch_literal(
+    f: typing.Optional[typing.Callable[P, T]] = None,
+    *,
+    compiled: bool = False,
+    dispatch_on: typing.Optional[str] = None,
+    stats: bool = False,
+    deferred: typing.Optional[bool] = None,
+    key: typing.Union[
+        str, typing.Callable[[typing.Any], typing.Any], None
+    ] = None,
+) -> typing.Callable[P, T]:
+    """Wrapper around functools.stdlib supporting literal arguments.
+
+    Can be used as a bare decorator, or called with keyword arguments first,
+    i.e. `@singledispatch_literal(compiled=True)`.
+
+    Args:
+        f: the default implementation.
+        compiled: when True, the wrapper's call path is generated from the
+            current registrations, merging literal and type resolution into
+            a single lookup. It is regenerated whenever `register` changes
+            the registry. See `partialdispatch.compiled`.
+        dispatch_on: the name of the parameter to dispatch on, instead of
+            the first positional argument. The argument can then be passed
+            either positionally or by keyword, and registered functions
+            are expected to have a parameter with the same name.
+        stats: when True, calls are counted by how they were resolved, and
+            the counts returned by `stats()`. Dispatchers created without it
+            have no counting code in their call path. See
+            `partialdispatch.stats`.
+        deferred: when True, `register` only records each registration,
+            and the signatures and annotations are inspected and checked
+            when the first call is dispatched, or `validate()` is called,
+            by when forward references can be resolved. Defaults to True if
+            the PARTIALDISPATCH_DEFERRED environment variable is "1".
+        key: dispatch on a key extracted from the dispatched argument,
+            rather than the argument itself, such as
+            `operator.itemgetter("type")`, or a string naming an item,
+            "[type]", or an attribute, "kind". Registered values are keys,
+            and implementations are passed the original arguments.
+    """
+    if f is None:
+        return functools.partial(
+            singledispatch_literal,
+            compiled=compiled,
+            dispatch_on=dispatch_on,
+            stats=stats,
+            deferred=deferred,
+            key=key,
+        )
+
+    if deferred is None:
+        deferred = _deferred_from_env()
+
     # start inspecting function
     sig = _get_signature(f)
 
     # determine that function is valid
     is_method: bool = False
-    _check_has_pos_params(func=f, sig=sig, is_method=is_method)
-    first_param = next(iter(sig.parameters))
+    if dispatch_on is None:
+        _check_has_pos_params(func=f, sig=sig, is_method=is_method)
+        first_param = next(iter(sig.parameters))
+    else:
+        first_param = _get_dispatch_param(
+            func=f, sig=sig, is_method=is_method, dispatch_on=dispatch_on
+        ).name
+    # where to find the dispatched argument, worked out once, not per call
+    position = (
+        0
+        if dispatch_on is None
+        else _get_dispatch_position(sig=sig, dispatch_on=dispatch_on)
+    )
+    # the default of the parameter dispatched on, if named, which is
+    # dispatched on when the argument isn't passed
+    default = (
+        inspect.Parameter.empty
+        if dispatch_on is None
+        else sig.parameters[dispatch_on].default
+    )
+    has_default = default is not inspect.Parameter.empty
     funcname = getattr(f, "__name__", "singledispatch_literal function")
+    if key is not None:
+        key = _key_getter(key)
 
     # wrap it for type-based use
     stdlib_wrapped = functools.singledispatch(f)
-    literal_registry = {}
+    # called whenever the registry changes, see singledispatchmethod_literal
+    listeners: typing.List[typing.Callable[[], None]] = []
+    # literal values are indexed by their exact type, then by value, so that
+    # arguments of a type with no literals registered are never hashed, and
+    # values which compare equal across types (1, True, 1.0) do not collide.
+    literal_registry: _compiled.LiteralRegistry = {}
+    # the literal implementations for enums, by member name, which hashes
+    # faster than the member itself (see compiled.enum_table)
+    tables: _compiled.LiteralRegistry = {}
+    # matcher specs (e.g. intervals) are indexed by class, then by the type
+    # of index, and the indexes for each class composed into one function
+    matcher_registry: typing.Dict[type, typing.Dict[type, typing.Any]] = {}
+    matchers: typing.Dict[type, typing.Callable] = {}
+    # resolves the implementation for a type from a snapshot of the stdlib
+    # registry, which other threads can change while it's walked. Whether
+    # any ABCs are registered is checked for the types added since the last
+    # snapshot, as the registry only grows, in order.
+    dispatch_type = _compiled.make_dispatch(stdlib_wrapped.registry, False)
+    abcs = False
+    checked_types = 0
+    # implementations registered with batch=True -> the batch handler
+    batch_handlers: typing.Dict[typing.Callable, typing.Callable] = {}
+
+    # registrations are made under a lock, to copies of the tables above,
+    # which replace them when the outermost register or transaction ends.
+    # Published tables are never changed, so dispatch never takes the lock.
+    lock = threading.RLock()
+    depth = 0
+    changed = False
+    # set by freeze, after which nothing can be registered
+    frozen = False
+    staged_literals: _compiled.LiteralRegistry = {}
+    staged_matchers: typing.Dict[type, typing.Dict[type, typing.Any]] = {}
+    # how calls were resolved, if counted
+    counters = _stats.Stats() if stats else None
+    # timing hooks, and how often each is called, see add_timer
+    timers: typing.Tuple[typing.Tuple[_stats.Hook, int], ...] = ()
+    # whether the wrapper is generated, see partialdispatch.compiled
+    generated = compiled or stats
+    # registrations recorded to be made by validate, if deferred: the
+    # function replaying each, e.g. register, and its arguments
+    pending: typing.Optional[
+        typing.List[
+            typing.Tuple[
+                typing.Callable,
+                typing.Any,
+                typing.Optional[typing.Callable[P, T]],
+                typing.Dict[str, typing.Any],
+            ]
+        ]
+    ] = (
+        [] if deferred else None
+    )
+    validating = False
+    # the namespace, function and classes resolved up front, once frozen
+    frozen_call: typing.Optional[
+        typing.Tuple[dict, typing.Callable[P, T], typing.Set[type]]
+    ] = None
 
     def _set_method(val: bool):
         """Used to set when used as a method"""
@@ -352,30 +731,52 @@ def singledispatch_literal(f: typing.Callable[P, T]) -> typing.Callable[P, T]:
     ) -> T:
         # are we allowing literal values?
         if literal:
-            # yes, can we hash it?
-            try:
-                hash(val)
-            except TypeError:
-                # no
-                pass
-            else:
-                # yes, is it in the registry?
-                if val in literal_registry:
+            # yes, are any literals of this exact type registered?
+            values = literal_registry.get(val.__class__)
+            if values is not None:
+                # yes, is it an enum member, looked up by name?
+                table = tables.get(val.__class__)
+                if table is not None:
+                    impl = table.get(val._name_)
+                else:
+                    # no, is it in the registry? (if we can hash it)
+                    try:
+                        impl = values.get(val)
+                    except TypeError:
+                        impl = None
+
+                if impl is not None:
                     # yes, return this callable
 
-                    return literal_registry[val]
+                    return impl
+
+            # no, does it fall within a registered range or pattern?
+            match = matchers.get(val.__class__)
+            if match is not None:
+                impl = match(val)
+                if impl is not None:
+                    return impl
 
             if not passthru:
                 return None
 
-        # no, revert to the standard library implementation
-        return stdlib_wrapped.dispatch(val)
+        # no, resolve its type, as the standard library would
+        return dispatch_type(val)
+
+    # the lookup made by the generic wrapper, replaced while calls are timed
+    lookup = dispatch
 
     def register(
-        value: typing.Any,
+        value: typing.Any = None,
         func: typing.Optional[typing.Callable[P, T]] = None,
         *,
         literal: bool = False,
+        when: typing.Optional[
+            typing.Callable[[typing.Any], typing.Any]
+        ] = None,
+        cost: float = 1.0,
+        cache: bool = False,
+        batch: bool = False,
     ) -> typing.Union[
         typing.Callable[P, T],
         typing.Callable[
@@ -421,9 +822,79 @@ def singledispatch_literal(f: typing.Callable[P, T]) -> typing.Callable[P, T]:
             func: the function to register the type or literal value to
             literal: when True, if a type is passed to `value`, the literal
                 value of the type will be registered (see notes).
+            when: a predicate; if given, func is called for arguments of the
+                class passed as `value` (or annotated) which it accepts. See
+                `partialdispatch.matchers.Guard`.
+            cost: the relative cost of calling `when`.
+            cache: whether to remember hashable values `when` rejects.
+            batch: when True, func takes a list of values in place of the
+                dispatched argument, and returns a list of results, so that
+                `map_batched` calls it once for all the values it handles.
+                Called directly, it's passed a list of one value.
         """
         nonlocal literal_registry
         sig: inspect.Signature
+
+        if frozen:
+            raise _frozen_error(funcname)
+
+        if pending is not None and not validating:
+            # deferred, so only record the registration
+            options = dict(
+                literal=literal, when=when, cost=cost, cache=cache, batch=batch
+            )
+            if func is None:
+                # called like @f.register(<SomeValueOrType>)?
+                if value is None or _is_registered_value(value, literal):
+                    return lambda func: register(value, func, **options)
+
+                # no, called like @f.register
+                value, func = None, value
+
+            _defer(register, value, func, options)
+
+            return func
+
+        if batch:
+            # called like @f.register(batch=True) or @f.register(x, batch=True)
+            if func is None and (
+                literal
+                or value is None
+                or is_typey(value)
+                or not callable(value)
+            ):
+                return lambda f: register(
+                    value,
+                    func=f,
+                    literal=literal,
+                    when=when,
+                    cost=cost,
+                    cache=cache,
+                    batch=True,
+                )
+
+            if func is None:
+                value, func = None, value
+
+            single = _batch_adapter(func)
+            batch_handlers[single] = func
+
+            return register(
+                value,
+                func=single,
+                literal=literal,
+                when=when,
+                cost=cost,
+                cache=cache,
+            )
+
+        if when is not None:
+            return _register_guard(
+                value=value,
+                func=func,
+                guard=_matchers.Guard(when, cost=cost, cache=cache),
+            )
+
         passed_as_annotation: bool = _check_passed_as_annotation(func)
 
         # Is the decorator being called like
@@ -431,6 +902,10 @@ def singledispatch_literal(f: typing.Callable[P, T]) -> typing.Callable[P, T]:
         # or
         # @f.register(cble)  # where cble is a callable
         if func is None:
+            # matchers, like Interval(0, 10), are always values
+            if not literal and _matchers.get_matcher(value) is not None:
+                return lambda f: register(value, func=f)
+
             # If the value passed to us is a generic, we check whether it's
             # definitely invalid at this stage, and raise an error matching
             # the standard library if it is.
@@ -447,21 +922,7 @@ def singledispatch_literal(f: typing.Callable[P, T]) -> typing.Callable[P, T]:
             passed_as_annotation = False
 
             # is value our value, or func?
-            if (
-                literal  # value, user told us
-                or is_literal_annotation(value)
-                or is_typey(value)
-                or (
-                    not callable(value)
-                    and not (
-                        isinstance(value, classmethod)
-                        or (
-                            sys.version_info < (3, 10)
-                            and isinstance(value, staticmethod)
-                        )
-                    )
-                )
-            ):
+            if _is_registered_value(value, literal):
                 # definitely our value, it was called like
                 # @f.register(<SomeValueOrType>)
                 return lambda f: register(
@@ -477,22 +938,59 @@ def singledispatch_literal(f: typing.Callable[P, T]) -> typing.Callable[P, T]:
         sig = _get_signature(func)
 
         # check we're valid to continue
-        _check_has_pos_params(func=func, sig=sig, is_method=is_method)
+        if dispatch_on is None:
+            _check_has_pos_params(func=func, sig=sig, is_method=is_method)
         if value is None and not literal:
             # get the annotation
             _check_first_pos_param_annotated(
-                funcname=funcname, func=func, sig=sig, is_method=is_method
+                funcname=funcname,
+                func=func,
+                sig=sig,
+                is_method=is_method,
+                dispatch_on=dispatch_on,
             )
             value = _get_first_type_hint(
-                func=func, sig=sig, is_method=is_method
+                func=func,
+                sig=sig,
+                is_method=is_method,
+                dispatch_on=dispatch_on,
             )
 
-        # is the value a literal?
-        if is_literal_annotation(value):
+        # type statements' aliases, e.g. `type Kind = Literal["a", "b"]`
+        value = _unalias(value)
+
+        # is the value a matcher, or annotated with one?
+        matcher = None if literal else _matchers.get_matcher(value)
+        if matcher is not None:
+            _add_matcher(*matcher, func=func)
+
+            return f
+
+        # any other annotated metadata is ignored
+        value = _matchers.strip_annotated(value)
+
+        # is it a TypedDict? Its instances are plain dicts, so dispatch them
+        # on the value of its discriminator field
+        if not literal and _matchers.is_typed_dict(value):
+            indexes = staged_matchers.get(dict, matcher_registry.get(dict, {}))
+            index = indexes.get(_matchers.DiscriminatorIndex)
+            _add_matcher(
+                (dict,),
+                _discriminator_of(
+                    value, () if index is None else index.fields()
+                ),
+                func=func,
+            )
+
+            return f
+
+        # is the value a literal? (None here was passed with literal=True)
+        if value is not None and is_literal_annotation(value):
             # check valid and put into the literal registry
-            for val in flatten_literal_params(value):
+            for val in _iter_literal_params(value):
                 _warn_value_unlikely(value)
-                literal_registry[val] = func
+                _stage_literal(val, func)
+            _registry_changed()
 
             return f
 
@@ -512,53 +1010,951 @@ def singledispatch_literal(f: typing.Callable[P, T]) -> typing.Callable[P, T]:
         if literal or not_typey:
             # either user says it is, or it's not a type
             _warn_value_unlikely(value)
-            literal_registry[value] = func
+            _stage_literal(value, func)
+            _registry_changed()
 
             return f
 
-        # no, pass it onto the stdlib
-        return stdlib_wrapped.register(value, func)
+        # no, pass it onto the stdlib, which clears its dispatch cache
+        registered = stdlib_wrapped.register(value, func)
+        if counters is not None:
+            counters.cache_clears += 1
+        _registry_changed()
+
+        return registered
+
+    def register_many(
+        values: typing.Union[
+            typing.Mapping[typing.Any, typing.Callable[P, T]],
+            typing.Iterable[typing.Any],
+        ],
+        handler: typing.Optional[typing.Callable[P, T]] = None,
+    ) -> typing.Any:
+        """Register many literal values at once.
+
+        Each handler's signature is checked once, rather than once per value,
+        and the values are all added before the registry is published. See
+        `partialdispatch.bulk`.
+
+        >>> handle.register_many(["GBP", "EUR", "USD"], convert)
+        >>> handle.register_many({"GBP": sterling, "EUR": euro})
+
+        >>> @handle.register_many(CURRENCIES)
+        >>> def _(code):
+        >>>     ...
+
+        Args:
+            values: the literal values, or a mapping of each value to its
+                handler.
+            handler: the handler for all the values, unless a mapping is
+                given without one.
+
+        Returns:
+            the handler, if given, or a decorator taking it.
+        """
+        if frozen:
+            raise _frozen_error(funcname)
+
+        if handler is None:
+            if not isinstance(values, collections.abc.Mapping):
+                return lambda handler: register_many(values, handler)
+
+            groups: typing.Dict[
+                typing.Callable[P, T], typing.List[typing.Any]
+            ] = {}
+            for value, func in values.items():
+                groups.setdefault(func, []).append(value)
+        else:
+            groups = {handler: list(values)}
+
+        if pending is not None and not validating:
+            # deferred, so only record the registrations
+            for func, group in groups.items():
+                _defer(register_many, group, func, {})
+
+            return handler
+
+        for func, group in groups.items():
+            if not callable(func):
+                raise TypeError(
+                    f"Invalid handler {func!r} for {group[0]!r}: expected a "
+                    "callable."
+                )
+
+            if dispatch_on is None:
+                _check_has_pos_params(
+                    func=func, sig=_get_signature(func), is_method=is_method
+                )
+            for value in group:
+                if is_typey(value):
+                    _check_value_valid(
+                        value=value,
+                        stdlib_wrapped=stdlib_wrapped,
+                        func=func,
+                        passed_as_annotation=False,
+                    )
+                _warn_value_unlikely(value)
+                _stage_literal(value, func)
+        _registry_changed()
+
+        return handler
+
+    def register_table(
+        path: typing.Union[str, os.PathLike],
+        handlers: typing.Optional[
+            typing.Mapping[str, typing.Callable[P, T]]
+        ] = None,
+    ) -> int:
+        """Register the literal values in a JSON or CSV file.
+
+        The file maps each value to the name of its handler, see
+        `partialdispatch.bulk`, and the values are registered as by
+        `register_many`.
+
+        >>> handle.register_table("currencies.csv", {"sterling": sterling})
+
+        Args:
+            path: the file, ending .json or .csv.
+            handlers: the handlers, by name, or None to import each name as
+                a reference, "package.module:handler".
+
+        Returns:
+            the number of values registered.
+        """
+        pairs = _bulk.read_table(path)
+        for func, group in _bulk.resolve(pairs, handlers, _lazy.load).items():
+            # the dispatcher's own, which async_singledispatch_literal
+            # replaces to check each handler
+            wrapper.register_many(group, func)
+
+        return len(pairs)
+
+    def register_lazy(
+        value: typing.Any, reference: str, *, literal: bool = False
+    ) -> _lazy.LazyHandler:
+        """Register a handler by reference, importing it when first used.
+
+        Only the value and the reference are recorded, so the handler's
+        module isn't imported, and its signature isn't checked, until a call
+        is first dispatched to it, when it's registered in the placeholder's
+        place, exactly as by `register`. See `partialdispatch.lazy`.
+
+        >>> handle.register_lazy("export", "myapp.commands.export:run")
+
+        Args:
+            value: the type or literal value to register, or a
+                `typing.Literal` of values.
+            reference: where to find the handler, as
+                "package.module:handler".
+            literal: when True, value is always a literal value.
+
+        Returns:
+            the placeholder registered.
+        """
+        if frozen:
+            raise _frozen_error(funcname)
+
+        if not literal and _matchers.get_matcher(value) is not None:
+            raise TypeError(
+                f"Matchers, like {value!r}, can't be registered lazily."
+            )
+
+        def replace(handler: typing.Callable[P, T]):
+            # once frozen, the placeholder carries on calling the handler.
+            # Registered with the dispatcher's own register, which
+            # async_singledispatch_literal replaces to check handlers.
+            with lock:
+                if not frozen:
+                    wrapper.register(value, handler, literal=literal)
+
+        placeholder = _lazy.LazyHandler(reference, replace)
+        if pending is not None and not validating:
+            # deferred, so only record the registration, to be made in order
+            _defer(
+                _register_placeholder, value, placeholder, {"literal": literal}
+            )
+        else:
+            _register_placeholder(value, placeholder, literal=literal)
+
+        return placeholder
+
+    def _register_placeholder(
+        value: typing.Any,
+        placeholder: _lazy.LazyHandler,
+        literal: bool = False,
+    ):
+        """Register a lazy handler's placeholder, without checking it."""
+        if not literal and value is not None and is_literal_annotation(value):
+            for val in _iter_literal_params(value):
+                _stage_literal(val, placeholder)
+        elif literal or not is_typey(value):
+            _stage_literal(value, placeholder)
+        else:
+            stdlib_wrapped.register(value, placeholder)
+            if counters is not None:
+                counters.cache_clears += 1
+        _registry_changed()
+
+    def map_batched(
+        values: typing.Iterable[typing.Any], *extra: typing.Any
+    ) -> typing.List[typing.Any]:
+        """Call the implementation for each value, in batches.
+
+        Values are grouped by their implementation. Implementations
+        registered with `batch=True` are called once, with the list of their
+        values, and the rest once per value. Extra positional arguments are
+        passed to every call, after the values.
+
+        Returns:
+            the results, in the same order as values.
+        """
+        if position != 0:
+            raise TypeError(
+                f"{funcname}.map_batched() passes values as the first "
+                f"argument, but {funcname} dispatches on '{dispatch_on}'."
+            )
+
+        values = list(values)
+        keys = values if key is None else list(map(key, values))
+        # implementation -> indexes of its values, in order of first use
+        groups: typing.Dict[typing.Callable, typing.List[int]] = {}
+        for i, value in enumerate(keys):
+            impl = dispatch(value, literal=True, passthru=False)
+            if impl is None:
+                impl = dispatch_type(value.__class__)
+            groups.setdefault(impl, []).append(i)
+
+        results: typing.List[typing.Any] = [None] * len(values)
+        for impl, indexes in groups.items():
+            handler = batch_handlers.get(impl)
+            if handler is None:
+                for i in indexes:
+                    results[i] = impl(values[i], *extra)
+                continue
+
+            batch_results = handler([values[i] for i in indexes], *extra)
+            if len(batch_results) != len(indexes):
+                raise ValueError(
+                    f"Batch implementation {handler!r} of {funcname} "
+                    f"returned {len(batch_results)} results for "
+                    f"{len(indexes)} values."
+                )
+            for i, result in zip(indexes, batch_results):
+                results[i] = result
+
+        return results
+
+    def map_array(array: typing.Any, *extra: typing.Any) -> typing.Any:
+        """Call the implementation for each element of a NumPy array.
+
+        The array is partitioned by the literal values registered for the
+        Python type of its elements (e.g. int for an array of int64), using
+        vectorised operations, and each implementation is called once, with
+        an array of its elements. Elements matching no literal value are
+        passed, together, to the implementation for the Python type.
+        Implementations should return an array of results, or a scalar.
 
-    def wrapper(*args, **kwargs):
-        """Function that actually gets called."""
-        # check that positional arguments were provided
-        if not args:
-            val = kwargs.get(first_param) or "123"
+        Requires NumPy.
 
+        Returns:
+            an array of the results, in the same order as array.
+        """
+        if key is not None:
             raise TypeError(
-                "When used with singledispatch or singledispatch_literal, "
-                f"{funcname} requires at least 1 positional argument. "
-                "Try calling the function like "
-                f"{funcname}({val}, ...) instead of "
-                f"{funcname}({first_param}={val})."
+                f"{funcname}.map_array() dispatches on the elements "
+                f"themselves, but {funcname} dispatches on a key."
+            )
+
+        # numpy is optional, so only imported when needed
+        from . import arrays as _arrays
+
+        array = _arrays.np.asarray(array)
+        cls = _arrays.python_type(array)
+        values = {
+            value: batch_handlers.get(impl, impl)
+            for value, impl in literal_registry.get(cls, {}).items()
+        }
+        default = dispatch_type(cls)
+
+        return _arrays.map_array(
+            array, values, batch_handlers.get(default, default), *extra
+        )
+
+    def load_entry_points(
+        group: str,
+        *,
+        manifest: typing.Any = _DEFAULT,
+    ) -> int:
+        """Register the handlers installed as entry points in a group.
+
+        The first time a group is loaded, each handler is imported to find
+        the types or literal values it's for, and these are saved to a
+        manifest. Until the installed distributions change, handlers are
+        then registered lazily from the manifest, and only imported when
+        they're dispatched to. See `partialdispatch.plugins`.
+
+        >>> handle.load_entry_points("myapp.commands")
+
+        Args:
+            group: the entry point group.
+            manifest: where to cache the manifest, by default in the user's
+                cache directory, or None to import every handler each time.
+
+        Returns:
+            the number of entry points registered.
+        """
+        # only imported when needed, as it imports importlib.metadata
+        from . import plugins as _plugins
+
+        if manifest is _DEFAULT:
+            manifest = _plugins.default_manifest(group, dispatch_on)
+        found = _plugins.records(
+            group,
+            dispatch_on,
+            None if manifest is None else pathlib.Path(manifest),
+        )
+        for record in found:
+            reference = record["reference"]
+            if "values" in record:
+                for value in record["values"]:
+                    register_lazy(value, reference, literal=True)
+            elif "type" in record:
+                register_lazy(_lazy.load(record["type"]), reference)
+            else:
+                wrapper.register(_lazy.load(reference))
+
+        return len(found)
+
+    def _register_guard(
+        value: typing.Any,
+        func: typing.Optional[typing.Callable[P, T]],
+        guard: _matchers.Guard,
+    ):
+        """Register func for values of a class which guard accepts."""
+        # called like @f.register(when=...) or @f.register(int, when=...)
+        if func is None:
+            if value is None or is_typey(value) or not callable(value):
+                return lambda f: _register_guard(
+                    value=value, func=f, guard=guard
+                )
+
+            value, func = None, value
+
+        if value is None:
+            sig = _get_signature(func)
+            _check_first_pos_param_annotated(
+                funcname=funcname,
+                func=func,
+                sig=sig,
+                is_method=is_method,
+                dispatch_on=dispatch_on,
+            )
+            value = _get_first_type_hint(
+                func=func,
+                sig=sig,
+                is_method=is_method,
+                dispatch_on=dispatch_on,
+            )
+
+        _add_matcher(_matchers.classes_of(value), guard, func=func)
+
+        return f
+
+    def _add_matcher(
+        classes: typing.Iterable[type],
+        spec: typing.Any,
+        func: typing.Callable[P, T],
+    ):
+        """Add a matcher spec to the index for each class."""
+        for cls in classes:
+            indexes = staged_matchers.get(cls)
+            if indexes is None:
+                indexes = staged_matchers[cls] = {
+                    kind: index.copy()
+                    for kind, index in matcher_registry.get(cls, {}).items()
+                }
+            index = indexes.get(spec.index)
+            if index is None:
+                index = indexes[spec.index] = spec.index()
+            index.add(spec, func)
+
+        _registry_changed()
+
+    def _defer(
+        replay: typing.Callable,
+        value: typing.Any,
+        func: typing.Optional[typing.Callable[P, T]],
+        options: typing.Dict[str, typing.Any],
+    ):
+        """Record a registration, to be replayed by validate."""
+        pending.append((replay, value, func, options))
+        if len(pending) == 1:
+            _reroute()
+
+    def _stage_literal(val: typing.Any, func: typing.Callable[P, T]):
+        """Add a literal value to a copy of the values for its type."""
+        cls = type(val)
+        values = staged_literals.get(cls)
+        if values is None:
+            values = staged_literals[cls] = dict(literal_registry.get(cls, {}))
+        values[val] = func
+
+    @contextlib.contextmanager
+    def transaction() -> typing.Iterator[None]:
+        """Make several registrations, published together at the end.
+
+        Literal values and matchers registered in the transaction aren't
+        used for dispatch until it ends, when the lookups are rebuilt once,
+        rather than once per registration. Types are registered with
+        `functools.singledispatch` straight away, though they're only
+        dispatched to once the transaction ends. Registrations from
+        other threads wait for it to end, and registrations made before an
+        exception are kept.
+        """
+        nonlocal depth
+
+        with lock:
+            if frozen:
+                raise _frozen_error(funcname)
+
+            depth += 1
+            try:
+                yield
+            finally:
+                depth -= 1
+                if not depth and changed:
+                    _publish()
+
+    def _registry_changed():
+        """Publish the registry, unless in a transaction."""
+        nonlocal changed
+
+        changed = True
+        if not depth:
+            _publish()
+
+    def _publish():
+        """Replace the tables used for dispatch with the staged copies.
+
+        Also resolves types from a new snapshot of the registry, and
+        regenerates the compiled call path, if there is one.
+        """
+        nonlocal changed, literal_registry, tables, matcher_registry, matchers
+        nonlocal dispatch_type, abcs, checked_types
+
+        registry = stdlib_wrapped.registry
+        abcs = abcs or any(
+            map(
+                _compiled._is_abc,
+                itertools.islice(registry, checked_types, None),
+            )
+        )
+        checked_types = len(registry)
+        dispatch_type = _compiled.make_dispatch(registry, abcs)
+
+        if staged_literals:
+            literal_registry = {**literal_registry, **staged_literals}
+            staged_tables = {
+                cls: _compiled.enum_table(cls, values)
+                for cls, values in staged_literals.items()
+            }
+            tables = {
+                **tables,
+                **{
+                    cls: table
+                    for cls, table in staged_tables.items()
+                    if table is not None
+                },
+            }
+            wrapper.literal_registry = literal_registry
+            staged_literals.clear()
+
+        if staged_matchers:
+            matchers = _matchers.by_class(
+                {
+                    **matchers,
+                    **{
+                        cls: _matchers.compose(indexes.values())
+                        for cls, indexes in staged_matchers.items()
+                    },
+                }
             )
+            matcher_registry = {**matcher_registry, **staged_matchers}
+            wrapper.matcher_registry = matcher_registry
+            staged_matchers.clear()
+
+        changed = False
+        if compiled:
+            _build(namespace, wrapper)
+
+        for listener in listeners:
+            listener()
 
-        cble = dispatch(args[0], literal=True, passthru=False)
+    def validate():
+        """Make the registrations recorded while deferred, checking them.
 
-        if cble is not None:
-            return cble(*args, **kwargs)
+        Called when the first call is dispatched, and by `freeze`, so only
+        needed to check registrations up front, e.g. in a test. Calls from
+        other threads meanwhile wait until the registrations are published.
+        Raises the same errors as `register`; registrations after an invalid
+        one are kept, to be made by the next call to validate.
+        """
+        nonlocal validating
+
+        # checked under the lock, so a call arriving while another replays
+        # the registrations waits until they're published
+        with lock:
+            if not pending:
+                return
 
-        return stdlib_wrapped(*args, **kwargs)
+            try:
+                with transaction():
+                    validating = True
+                    try:
+                        while pending:
+                            replay, value, func, options = pending.pop(0)
+                            replay(value, func, **options)
+                    finally:
+                        validating = False
+            finally:
+                _reroute()
+
+    def _validate_first(arg: typing.Any) -> typing.Callable[P, T]:
+        """Validate pending registrations, then resolve arg's impl."""
+        validate()
+        if timers:
+            return _stats.timed(wrapper, _traced, timers)(arg)
+
+        return _traced(arg)[0]
+
+    def freeze() -> typing.Callable[P, T]:
+        """Make the dispatcher immutable, and rebuild it for fast lookups.
+
+        Afterwards, `register` raises a TypeError. The call path is compiled
+        (see `partialdispatch.compiled`), with the implementations for every
+        class registered resolved up front, alongside their literal values,
+        and resolutions for other classes memoised as they're first seen.
+        Frozen dispatchers can be called from many threads without any
+        locking. Dispatchers created with stats=True carry on counting their
+        calls.
+
+        If the dispatcher was compiled, its call path is replaced in place.
+        Otherwise, the fast dispatcher is a new function, so use the
+        dispatcher returned, like `handle = handle.freeze()`.
+
+        Returns:
+            the frozen dispatcher.
+        """
+        nonlocal frozen, frozen_call
 
-    # add new attributes to wrapper function
-    wrapper.literal_registry = literal_registry
-    wrapper.register = register
-    wrapper.dispatch = dispatch
-    wrapper.registry = stdlib_wrapped.registry
-    wrapper._clear_cache = stdlib_wrapped._clear_cache
-    wrapper._set_method = _set_method
+        validate()
+        with lock:
+            if depth:
+                raise TypeError(
+                    f"{funcname} can't be frozen during a transaction."
+                )
 
-    # update signature and wrapper
-    functools.update_wrapper(wrapper=wrapper, wrapped=f)
+            frozen = True
+
+            classes = {
+                *literal_registry,
+                *matchers,
+                *(c for c in stdlib_wrapped.registry if isinstance(c, type)),
+            }
+            frozen_namespace = (
+                namespace
+                if compiled
+                else {
+                    "_raise_no_args": _raise_no_args,
+                    "_key": key,
+                }
+            )
+            frozen_wrapper = _build(
+                frozen_namespace, wrapper if compiled else None, classes
+            )
+            frozen_call = (frozen_namespace, frozen_wrapper, classes)
+
+        if frozen_wrapper is not wrapper:
+            _add_attributes(frozen_wrapper)
+
+        return frozen_wrapper
+
+    def _build(
+        namespace: dict,
+        target: typing.Optional[typing.Callable[P, T]] = None,
+        classes: typing.Iterable[type] = (),
+    ) -> typing.Callable[P, T]:
+        """Generate the call path from the current registrations.
+
+        Args:
+            namespace: where the wrapper's source is executed.
+            target: the wrapper to swap the new code into, if any.
+            classes: the classes to resolve up front.
+
+        Returns:
+            the wrapper.
+        """
+        namespace["_dispatch"] = dispatch_type
+        namespace["_default"] = default
+        if pending:
+            hooked = _validate_first
+        elif timers:
+            hooked = _stats.timed(wrapper, _traced, timers)
+        else:
+            hooked = _counted if stats else None
+
+        return _compiled.compile_wrapper(
+            namespace=namespace,
+            literal_registry=literal_registry,
+            registry=stdlib_wrapped.registry,
+            position=position,
+            keyword=dispatch_on,
+            wrapper=target,
+            matchers=matchers,
+            classes=classes,
+            tables=tables,
+            hooked=hooked,
+            keyed=key is not None,
+            has_default=has_default,
+        )
+
+    def add_timer(hook: _stats.Hook, every: int = 1):
+        """Time calls, passing each time to a hook.
+
+        While any hooks are added, the call path is replaced with one timing
+        the implementation called, and the hook is called with the
+        dispatcher, the implementation, how it was resolved (see
+        `partialdispatch.stats.PATHS`) and the time taken, in nanoseconds.
+        For coroutine functions, that's the time taken to create the
+        coroutine.
+
+        Args:
+            hook: the function to call.
+            every: the hook is called for one in every this many calls.
+        """
+        nonlocal timers
+
+        if every < 1:
+            raise ValueError(f"every must be at least 1, not {every}.")
+
+        with lock:
+            timers = (*timers, (hook, every))
+            _reroute()
+
+    def remove_timer(hook: _stats.Hook):
+        """Stop passing call times to a hook, added with `add_timer`.
+
+        Once the last hook is removed, the call path is restored, so it no
+        longer times calls at all.
+        """
+        nonlocal timers
+
+        with lock:
+            remaining = tuple(timer for timer in timers if timer[0] != hook)
+            if len(remaining) == len(timers):
+                raise ValueError(f"{hook!r} isn't a timer of {funcname}.")
+
+            timers = remaining
+            _reroute()
+
+    def _reroute():
+        """Replace the call path after timers are added or removed."""
+        nonlocal lookup
+
+        if frozen_call is not None:
+            _build(*frozen_call)
+            if frozen_call[1] is wrapper:
+                return
+
+        if generated:
+            _build(namespace, wrapper)
+        elif pending:
+            lookup = lambda arg, literal, passthru: (  # noqa: E731
+                _validate_first(arg)
+            )
+        elif timers:
+            timed = _stats.timed(wrapper, _traced, timers)
+            lookup = lambda arg, literal, passthru: timed(arg)  # noqa: E731
+        else:
+            lookup = dispatch
+
+    def check_exhaustive(*enums: typing.Type[enum.Enum]):
+        """Check every member of the enums has a literal implementation.
+
+        Useful for state machines, to catch a member added to an enum but
+        not to the dispatcher, for example:
+
+        >>> handle_state.check_exhaustive(State)
+
+        Raises:
+            ValueError: listing the members with no implementation.
+        """
+        missing = [
+            member
+            for cls in enums
+            for member in cls
+            if member not in literal_registry.get(cls, {})
+        ]
+        if missing:
+            raise ValueError(
+                f"{funcname} has no implementation registered for "
+                + ", ".join(map(str, missing))
+                + "."
+            )
+
+    def _traced(
+        arg: typing.Any,
+    ) -> typing.Tuple[typing.Callable[P, T], str]:
+        """Resolve the implementation for arg, and how, counting it."""
+        cls = arg.__class__
+        values = literal_registry.get(cls)
+        if values is not None:
+            try:
+                impl = values.get(arg)
+            except TypeError:
+                if counters is not None:
+                    counters.unhashable[cls] += 1
+                impl = None
+
+            if impl is not None:
+                if counters is not None:
+                    counters.literal[cls][arg] += 1
+
+                return impl, "literal"
+
+        match = matchers.get(cls)
+        if match is not None:
+            impl = match(arg)
+            if impl is not None:
+                if counters is not None:
+                    counters.matched[cls] += 1
+
+                return impl, "matched"
+
+        impl = dispatch_type(cls)
+        path = "default" if impl is f else "type"
+        if counters is not None:
+            getattr(counters, path)[cls] += 1
+
+        return impl, path
+
+    def _counted(arg: typing.Any) -> typing.Callable[P, T]:
+        """Resolve the implementation for arg, counting how."""
+
+        return _traced(arg)[0]
+
+    def get_stats(reset: bool = False) -> typing.Dict[str, typing.Any]:
+        """How calls have been resolved, for a dispatcher with stats=True.
+
+        Args:
+            reset: when True, the counts are set back to zero afterwards.
+
+        Returns:
+            the counts: "literal" hits by class and value, "matched" hits
+            for matchers by class, "type" hits for registered types and
+            "default" calls to the default implementation, by class,
+            "unhashable" arguments by class, and "cache_clears", the number
+            of types registered, each of which cleared the stdlib's cache.
+        """
+        if counters is None:
+            raise TypeError(
+                f"{funcname} was created without stats=True, so its calls "
+                "aren't counted."
+            )
+
+        snapshot = counters.snapshot()
+        if reset:
+            counters.reset()
+
+        return snapshot
+
+    def _clear_cache():
+        """Clear the stdlib dispatch cache and any compiled lookups."""
+        stdlib_wrapped._clear_cache()
+        _registry_changed()
+
+    def _raise_no_args(kwargs: typing.Dict[str, typing.Any]):
+        if dispatch_on is None:
+            raise _no_positional_args_error(funcname, first_param, kwargs)
+
+        raise TypeError(
+            f"{funcname} dispatches on its '{dispatch_on}' argument, which "
+            "has no default, so it must be passed, either positionally or by "
+            "keyword."
+        )
+
+    if key is not None:
+
+        def wrapper(*args, **kwargs):
+            """Function that actually gets called."""
+            if len(args) > position:
+                arg = key(args[position])
+            elif dispatch_on is not None and dispatch_on in kwargs:
+                arg = key(kwargs[dispatch_on])
+            elif has_default:
+                arg = key(default)
+            else:
+                _raise_no_args(kwargs)
+
+            cble = lookup(arg, literal=True, passthru=False)
+
+            if cble is not None:
+                return cble(*args, **kwargs)
+
+            return dispatch_type(arg.__class__)(*args, **kwargs)
+
+    elif dispatch_on is None:
+
+        def wrapper(*args, **kwargs):
+            """Function that actually gets called."""
+            # check that positional arguments were provided
+            if not args:
+                _raise_no_args(kwargs)
+
+            cble = lookup(args[0], literal=True, passthru=False)
+
+            if cble is not None:
+                return cble(*args, **kwargs)
+
+            return dispatch_type(args[0].__class__)(*args, **kwargs)
+
+    else:
+
+        def wrapper(*args, **kwargs):
+            """Function that actually gets called."""
+            # was the argument passed positionally, or by keyword?
+            if len(args) > position:
+                arg = args[position]
+            else:
+                try:
+                    arg = kwargs[dispatch_on]
+                except KeyError:
+                    if not has_default:
+                        _raise_no_args(kwargs)
+                    arg = default
+
+            cble = lookup(arg, literal=True, passthru=False)
+
+            if cble is not None:
+                return cble(*args, **kwargs)
+
+            return dispatch_type(arg.__class__)(*args, **kwargs)
+
+    if generated:
+        # replace the generic wrapper with one generated for the registry,
+        # or which counts calls
+        namespace = {
+            "_raise_no_args": _raise_no_args,
+            "_key": key,
+        }
+        wrapper = _build(namespace)
+
+    def _validated(func: typing.Callable) -> typing.Callable:
+        """Wrap func to validate pending registrations before it's called."""
+
+        @functools.wraps(func)
+        def validated(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+            validate()
+
+            return func(*args, **kwargs)
+
+        return validated
+
+    # every register call is a transaction, so nested registrations (such
+    # as for batch implementations) are published together
+    register = _in_transaction(transaction, register)
+    register_many = _in_transaction(transaction, register_many)
+    register_table = _in_transaction(transaction, register_table)
+    register_lazy = _in_transaction(transaction, register_lazy)
+    load_entry_points = _in_transaction(transaction, load_entry_points)
+    _clear_cache = _in_transaction(transaction, _clear_cache)
+
+    def _add_attributes(dispatcher: typing.Callable[P, T]):
+        """Add the dispatcher's attributes to the function called."""
+        # the call path validates deferred registrations on the first call,
+        # and these validate them first
+        checked = _validated if deferred else _identity
+        dispatcher.literal_registry = literal_registry
+        dispatcher.matcher_registry = matcher_registry
+        dispatcher.register = register
+        dispatcher.register_many = register_many
+        dispatcher.register_table = register_table
+        dispatcher.register_lazy = register_lazy
+        dispatcher.load_entry_points = load_entry_points
+        dispatcher.transaction = transaction
+        dispatcher.freeze = freeze
+        dispatcher.validate = validate
+        dispatcher.check_exhaustive = checked(check_exhaustive)
+        dispatcher.stats = get_stats
+        dispatcher.add_timer = add_timer
+        dispatcher.remove_timer = remove_timer
+        dispatcher.dispatch = checked(dispatch)
+        dispatcher.map_batched = checked(map_batched)
+        dispatcher.map_array = checked(map_array)
+        dispatcher.registry = stdlib_wrapped.registry
+        dispatcher._clear_cache = _clear_cache
+        dispatcher._set_method = _set_method
+        dispatcher._add_listener = listeners.append
+
+        # update signature and wrapper
+        functools.update_wrapper(wrapper=dispatcher, wrapped=f)
+
+    _add_attributes(wrapper)
 
     return wrapper
 
 
+# How a registered implementation is bound when called as a method. Each
+# implementation is classified once, so that plain functions, classmethods and
+# staticmethods are called directly, without creating a bound method per call.
+_BIND_INSTANCE, _BIND_CLASS, _BIND_STATIC, _BIND_DESCRIPTOR = range(4)
+
+
+class _BoundMethod(functools.partial):
+    """A dispatcher bound to an instance, as returned by __get__.
+
+    Created as cheaply as a bound method, but, like the stdlib's
+    per-access functions, accepts attribute assignment, which doesn't affect
+    other accesses. Other attributes are read from the dispatcher.
+    """
+
+    __doc__ = property(lambda self: self.func.__doc__)  # type: ignore
+    __func__ = property(lambda self: self.func)
+    __self__ = property(lambda self: self.args[0])
+
+    def __getattr__(self, name: str) -> typing.Any:
+        return getattr(self.func, name)
+
+
+def _classify_method(
+    method: typing.Any,
+) -> typing.Tuple[int, typing.Callable]:
+    """Determine how to call a method implementation, without binding it."""
+    if isinstance(method, types.FunctionType):
+        return _BIND_INSTANCE, method
+
+    if isinstance(method, staticmethod):
+        return _BIND_STATIC, method.__func__
+
+    if isinstance(method, classmethod) and isinstance(
+        method.__func__, types.FunctionType
+    ):
+        return _BIND_CLASS, method.__func__
+
+    # anything else goes through the descriptor protocol on every call
+    return _BIND_DESCRIPTOR, method
+
+
 class singledispatchmethod_literal:
     """Single-dispatch generic with literal support, method descriptor.
 
     Supports wrapping existing descriptors and handles non-descriptor
     callables as instance methods.
+
+    The dispatching functions returned by `__get__` are built once and
+    cached (for access on a class, weakly keyed by the class), so accessing
+    the method on an instance only creates a bound method object. They are
+    rebuilt after a new implementation is registered.
     """
 
     def __init__(self, func: typing.Callable[P, T]):
@@ -574,11 +1970,24 @@ class singledispatchmethod_literal:
         ) and sys.version_info < (3, 10):
             self._wrapped_func = func.__func__
 
+        # the function bound to instances, and the functions returned when
+        # accessed on a class, by class. Both are built on first access.
+        self._bound_method = None
+        self._methods = weakref.WeakKeyDictionary()
+        # implementation -> how to call it, see _classify_method
+        self._bindings = {}
+        self.dispatcher._add_listener(self._clear_dispatchers)
+
     def register(
         self,
-        value: typing.Any,
+        value: typing.Any = None,
         method=None,
         literal: bool = False,
+        when: typing.Optional[
+            typing.Callable[[typing.Any], typing.Any]
+        ] = None,
+        cost: float = 1.0,
+        cache: bool = False,
     ) -> typing.Union[
         typing.Callable[P, T],
         typing.Callable[
@@ -594,51 +2003,134 @@ class singledispatchmethod_literal:
         """Register the implementation for the given value or type."""
         self.dispatcher._set_method(True)
 
-        return self.dispatcher.register(value, func=method, literal=literal)
+        return self.dispatcher.register(
+            value,
+            func=method,
+            literal=literal,
+            when=when,
+            cost=cost,
+            cache=cache,
+        )
 
-    def __get__(self, obj, cls=None):
-        """Descriptor wrapper around wrapper function."""
+    def _clear_dispatchers(self):
+        """Forget cached dispatchers after the registry has changed."""
+        self._bound_method = None
+        self._methods.clear()
+        self._bindings.clear()
+
+    def _raise_no_args(self, kwargs: typing.Dict[str, typing.Any]):
+        """Provide informative exception if no args were provided."""
+        funcname = getattr(self.func, "__name__", f"{self.func}")
+        try:
+            first_param = _get_first_param(
+                func=self.func,
+                sig=_get_signature(self.func),
+                is_method=True,
+            ).name
+        except (TypeError, ValueError, StopIteration):
+            first_param = "unknown"
+
+        val = kwargs.get(first_param) or "123"
+
+        raise TypeError(
+            "When used with singledispatchmethod or "
+            f"singledispatchmethod_literal, {funcname} requires at "
+            f"least 1 positional argument. "
+            "Try calling the function like "
+            f"{funcname}({val}, ...) instead of "
+            f"{funcname}({first_param}={val})."
+        )
+
+    def _resolve(self, arg: typing.Any) -> typing.Tuple[int, typing.Callable]:
+        """Find the implementation for arg, and how to call it."""
+        # try to dispatch literally, then by class
+        method = self.dispatcher.dispatch(arg, literal=True, passthru=False)
+        if method is None:
+            method = self.dispatcher.dispatch(arg.__class__)
+
+        try:
+            return self._bindings[method]
+        except KeyError:
+            binding = self._bindings[method] = _classify_method(method)
+        except TypeError:
+            # unhashable implementation, classify it each time
+            binding = _classify_method(method)
+
+        return binding
+
+    def _finish_dispatcher(self, dispatcher: typing.Callable):
+        """Add attributes to a function returned by __get__."""
+        dispatcher.__isabstractmethod__ = self.__isabstractmethod__
+        dispatcher.register = self.register
+        dispatcher.registry = self.dispatcher.registry
+        dispatcher.literal_registry = self.dispatcher.literal_registry
+        dispatcher.matcher_registry = self.dispatcher.matcher_registry
+        functools.update_wrapper(dispatcher, self._wrapped_func)
+
+    def _make_method(self, cls: type) -> typing.Callable:
+        """Build the function returned by __get__ when accessed on cls."""
+        resolve = self._resolve
+        raise_no_args = self._raise_no_args
+        # don't keep (possibly dynamically created) classes alive
+        cls_ref = weakref.ref(cls)
 
         def _method(*args, **kwargs):
-            """Method equivalent of wrapper."""
-            # check that args were provided
+            """Method equivalent of wrapper, accessed on the class."""
             if not args:
-                # provide informative exception if not
-                funcname = getattr(self.func, "__name__", f"{self.func}")
-                try:
-                    first_param = _get_signature(self.func).parameters[0].name
-                except TypeError:
-                    first_param = "unknown"
+                raise_no_args(kwargs)
 
-                val = kwargs.get(first_param) or "123"
+            binding, method = resolve(args[0])
+            if binding is _BIND_CLASS:
+                return method(cls_ref(), *args, **kwargs)
+            if binding is _BIND_DESCRIPTOR:
+                return method.__get__(None, cls_ref())(*args, **kwargs)
 
-                raise TypeError(
-                    "When used with singledispatchmethod or "
-                    f"singledispatchmethod_literal, {funcname} requires at "
-                    f"least 1 positional argument. "
-                    "Try calling the function like "
-                    f"{funcname}({val}, ...) instead of "
-                    f"{funcname}({first_param}={val})."
-                )
+            # functions accessed on the class are unbound
+            return method(*args, **kwargs)
 
-            # try to dispatch literally
-            method = self.dispatcher.dispatch(
-                args[0], literal=True, passthru=False
-            )
-            if method is not None:
-                return method.__get__(obj, cls)(*args, **kwargs)
+        self._finish_dispatcher(_method)
 
-            # dispatch by class
-            method = self.dispatcher.dispatch(args[0].__class__)
-            return method.__get__(obj, cls)(*args, **kwargs)
+        return _method
 
-        _method.__isabstractmethod__ = self.__isabstractmethod__
-        _method.register = self.register
-        _method.registry = self.dispatcher.registry
-        _method.literal_registry = self.dispatcher.literal_registry
-        functools.update_wrapper(_method, self._wrapped_func)
+    def _make_bound_method(self) -> typing.Callable:
+        """Build the function bound to instances by __get__."""
+        resolve = self._resolve
+        raise_no_args = self._raise_no_args
 
-        return _method
+        def _bound_method(obj, *args, **kwargs):
+            """Method equivalent of wrapper, bound to an instance."""
+            if not args:
+                raise_no_args(kwargs)
+
+            binding, method = resolve(args[0])
+            if binding is _BIND_INSTANCE:
+                return method(obj, *args, **kwargs)
+            if binding is _BIND_CLASS:
+                return method(type(obj), *args, **kwargs)
+            if binding is _BIND_STATIC:
+                return method(*args, **kwargs)
+
+            return method.__get__(obj, type(obj))(*args, **kwargs)
+
+        self._finish_dispatcher(_bound_method)
+
+        return _bound_method
+
+    def __get__(self, obj, cls=None):
+        """Descriptor wrapper around wrapper function."""
+        if obj is not None:
+            bound_method = self._bound_method
+            if bound_method is None:
+                bound_method = self._bound_method = self._make_bound_method()
+
+            return _BoundMethod(bound_method, obj)
+
+        try:
+            return self._methods[cls]
+        except KeyError:
+            method = self._methods[cls] = self._make_method(cls)
+
+        return method
 
     @property
     def __isabstractmethod__(self):
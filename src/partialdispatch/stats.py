@@ -0,0 +1,115 @@
+"""Dispatch Statistics
+-------------------
+
+Counters for `singledispatch_literal(stats=True)`, and timing hooks.
+
+Counting is part of the call path only for dispatchers created with
+`stats=True`: their wrapper resolves each call through a counting lookup,
+while other dispatchers have no counting code at all, rather than checking a
+flag on every call. Counts are kept per dispatcher, and increments aren't
+locked, so under heavy contention from many threads they are approximate.
+
+Likewise, the call path is only replaced with a timed one while a timing
+hook is added, with `add_timer`, and restored when the last is removed.
+Each hook is called with the dispatcher, the implementation, how it was
+resolved (one of `PATHS`), and the time the call took in nanoseconds, for one
+in every `every` calls.
+"""
+import collections
+import itertools
+import time
+import typing
+
+# how a call was resolved: to a literal value, a matcher (e.g. an interval),
+# a registered type, or the default implementation
+PATHS = ("literal", "matched", "type", "default")
+
+Hook = typing.Callable[[typing.Callable, typing.Callable, str, int], None]
+
+
+class Stats:
+    """Counts of how a dispatcher's calls were resolved."""
+
+    __slots__ = (
+        "literal",
+        "matched",
+        "type",
+        "default",
+        "unhashable",
+        "cache_clears",
+    )
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Set every count back to zero."""
+        # literal hits are kept by exact class, then by value, like the
+        # literal registry, so that 1 and True are counted apart
+        self.literal: typing.DefaultDict[
+            type, typing.Counter[typing.Any]
+        ] = collections.defaultdict(collections.Counter)
+        # hits for matchers, e.g. intervals, by class
+        self.matched: typing.Counter[type] = collections.Counter()
+        # calls resolved to a registered type implementation, by class
+        self.type: typing.Counter[type] = collections.Counter()
+        # calls falling back to the default implementation, by class
+        self.default: typing.Counter[type] = collections.Counter()
+        # arguments which couldn't be hashed to probe the literals, by class
+        self.unhashable: typing.Counter[type] = collections.Counter()
+        # types registered, each clearing the stdlib's dispatch cache
+        self.cache_clears = 0
+
+    def snapshot(self) -> typing.Dict[str, typing.Any]:
+        """The counts, as plain dictionaries, which won't change."""
+
+        return {
+            "literal": {
+                cls: dict(values) for cls, values in self.literal.items()
+            },
+            "matched": dict(self.matched),
+            "type": dict(self.type),
+            "default": dict(self.default),
+            "unhashable": dict(self.unhashable),
+            "cache_clears": self.cache_clears,
+        }
+
+
+def timed(
+    dispatcher: typing.Callable,
+    resolve: typing.Callable[[typing.Any], typing.Tuple[typing.Callable, str]],
+    timers: typing.Sequence[typing.Tuple[Hook, int]],
+) -> typing.Callable[[typing.Any], typing.Callable]:
+    """Create a lookup timing the calls it resolves.
+
+    Args:
+        dispatcher: passed to each hook.
+        resolve: returns the implementation for an argument, and its path.
+        timers: each hook, and the interval between the calls timed for it.
+
+    Returns:
+        a function returning the implementation for an argument, wrapped to
+        time it if any hook is due to be called.
+    """
+    calls = itertools.count()
+
+    def lookup(arg: typing.Any) -> typing.Callable:
+        """The implementation for arg, timed if sampled."""
+        impl, path = resolve(arg)
+        n = next(calls)
+        due = [hook for hook, every in timers if not n % every]
+        if not due:
+            return impl
+
+        def call(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+            start = time.perf_counter_ns()
+            try:
+                return impl(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter_ns() - start
+                for hook in due:
+                    hook(dispatcher, impl, path, elapsed)
+
+        return call
+
+    return lookup
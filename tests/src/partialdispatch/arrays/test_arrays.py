@@ -0,0 +1,86 @@
+import typing
+
+import pytest
+
+from partialdispatch import singledispatch_literal
+
+np = pytest.importorskip("numpy")
+mod = pytest.importorskip("partialdispatch.arrays")
+
+
+def test__partition__groups_by_implementation():
+    """Check indexes are grouped by impl, with unmatched elements first."""
+    # arrange
+    array = np.array([3, 1, 2, 1, 5, 3, 2**40])
+    values = {1: "one", 3: "odd", 5: "odd", 2**70: "huge"}
+
+    # act
+    groups = mod.partition(array, values)
+
+    # assert
+    assert [(impl, list(indexes)) for impl, indexes in groups] == [
+        (None, [2, 6]),
+        ("one", [1, 3]),
+        ("odd", [0, 4, 5]),
+    ]
+
+
+def test__partition__empty():
+    """Check nothing is called for an empty array."""
+    # act / assert
+    assert mod.partition(np.array([], dtype=int), {1: "one"}) == []
+
+
+def test__python_type__unsupported():
+    """Check arrays of objects can't be partitioned."""
+    # act / assert
+    with pytest.raises(TypeError, match="use map_batched"):
+        mod.python_type(np.array([None, 1]))
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__map_array(compiled):
+    """Check each implementation is called once, with its elements."""
+    # arrange
+    calls = []
+
+    @singledispatch_literal(compiled=compiled)
+    def price(codes, rate):
+        calls.append(("default", list(codes)))
+        return np.zeros(len(codes))
+
+    def price_ints(codes: int, rate):
+        calls.append(("int", list(codes)))
+        return codes * rate
+
+    def price_premium(codes: typing.Literal[10, 20], rate):
+        calls.append(("premium", list(codes)))
+        return codes * rate * 2
+
+    price.register(price_ints)
+    price.register(price_premium)
+
+    # act
+    result = price.map_array(np.array([[1, 10], [20, 2]]), 0.5)
+
+    # assert
+    assert result.tolist() == [[0.5, 10.0], [20.0, 1.0]]
+    assert calls == [("int", [1, 2]), ("premium", [10, 20])]
+
+
+def test__singledispatch_literal__map_array_strings():
+    """Check string arrays are matched to str literals, and scalars work."""
+
+    # arrange
+    @singledispatch_literal
+    def kind(values):
+        return "other"
+
+    kind.register("cat", lambda values: "pet", literal=True)
+    kind.register("dog", lambda values: "pet", literal=True)
+
+    # act
+    result = kind.map_array(np.array(["cat", "cow", "dog"]))
+
+    # assert
+    assert result.tolist() == ["pet", "other", "pet"]
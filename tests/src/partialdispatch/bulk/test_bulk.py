@@ -0,0 +1,134 @@
+import json
+
+import pytest
+
+import partialdispatch.bulk as mod
+from partialdispatch import singledispatch_literal
+
+
+def sterling(a):
+    return f"£{a}"
+
+
+def euro(a):
+    return f"€{a}"
+
+
+@pytest.mark.parametrize(
+    ("name", "content", "expected"),
+    [
+        (
+            "table.json",
+            json.dumps({"GBP": "sterling", "EUR": "euro"}),
+            [("GBP", "sterling"), ("EUR", "euro")],
+        ),
+        (
+            "table.json",
+            json.dumps([[826, "sterling"], [978, "euro"]]),
+            [(826, "sterling"), (978, "euro")],
+        ),
+        (
+            "table.CSV",
+            "GBP,sterling\n\nEUR,euro\n",
+            [("GBP", "sterling"), ("EUR", "euro")],
+        ),
+    ],
+)
+def test__read_table(tmp_path, name, content, expected):
+    """Check JSON objects and pairs, and CSV rows, are read."""
+    # arrange
+    path = tmp_path / name
+    path.write_text(content)
+
+    # act
+    pairs = mod.read_table(path)
+
+    # assert
+    assert pairs == expected
+
+
+@pytest.mark.parametrize(
+    ("name", "content", "match"),
+    [
+        ("table.txt", "GBP,sterling", "expected a .json or .csv file"),
+        ("table.json", "[1, 2]", "expected an object"),
+        ("table.json", '{"GBP": 1}', "must be named"),
+        ("table.csv", "GBP,sterling\nEUR\n", "line 2"),
+    ],
+)
+def test__read_table__invalid(tmp_path, name, content, match):
+    """Check invalid tables raise a ValueError."""
+    # arrange
+    path = tmp_path / name
+    path.write_text(content)
+
+    # act / assert
+    with pytest.raises(ValueError, match=match):
+        mod.read_table(path)
+
+
+def test__resolve__groups_by_handler():
+    """Check each name is found once, and values grouped by handler."""
+    # arrange
+    loaded = []
+
+    def load(reference):
+        loaded.append(reference)
+        return euro
+
+    pairs = [("GBP", "a:sterling"), ("EUR", "a:euro"), ("DEM", "a:euro")]
+
+    # act
+    by_name = mod.resolve(
+        pairs, {"a:sterling": sterling, "a:euro": euro}, load
+    )
+    by_reference = mod.resolve(pairs, None, load)
+
+    # assert
+    assert by_name == {sterling: ["GBP"], euro: ["EUR", "DEM"]}
+    assert by_reference == {euro: ["GBP", "EUR", "DEM"]}
+    assert loaded == ["a:sterling", "a:euro"]
+    with pytest.raises(ValueError, match="No handler named 'a:euro'"):
+        mod.resolve(pairs, {"a:sterling": sterling}, load)
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__register_table(tmp_path, compiled):
+    """Check the values in a table are registered to their handlers."""
+    # arrange
+    path = tmp_path / "currencies.csv"
+    path.write_text("GBP,sterling\nEUR,euro\n")
+
+    @singledispatch_literal(compiled=compiled)
+    def func(a):
+        return "default"
+
+    # act
+    registered = func.register_table(
+        path, {"sterling": sterling, "euro": euro}
+    )
+
+    # assert
+    assert registered == 2
+    assert [func("GBP"), func("EUR"), func("USD")] == [
+        "£GBP",
+        "€EUR",
+        "default",
+    ]
+
+
+def test__register_table__references(tmp_path):
+    """Check handler names are imported as references by default."""
+    # arrange
+    path = tmp_path / "currencies.json"
+    path.write_text(json.dumps({"GBP": f"{__name__}:sterling"}))
+
+    @singledispatch_literal
+    def func(a):
+        return "default"
+
+    # act
+    func.register_table(path)
+
+    # assert
+    assert func("GBP") == "£GBP"
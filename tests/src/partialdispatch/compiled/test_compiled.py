@@ -0,0 +1,344 @@
+import abc
+import enum
+import gc
+import sys
+import typing
+import weakref
+from unittest import mock
+
+import pytest
+
+import partialdispatch.compiled as mod
+from partialdispatch import singledispatch_literal
+
+
+@pytest.mark.parametrize(
+    ("has_literals", "cacheable", "present", "absent"),
+    [
+        (False, True, "_impls[cls]", "values"),
+        (False, False, "_dispatch(arg.__class__)", "_impls"),
+        (True, True, "_plans[cls]", "_impls"),
+        (True, False, "_plan(arg.__class__)", "_plans"),
+    ],
+)
+def test__generate_source__omits_unused_branches(
+    has_literals, cacheable, present, absent
+):
+    """Check only the branches needed for the registry are generated."""
+    # act
+    source = mod.generate_source(
+        has_literals=has_literals, cacheable=cacheable
+    )
+
+    # assert
+    assert present in source
+    assert absent not in source
+    compile(source, "<test>", "exec")
+
+
+@pytest.mark.parametrize(
+    ("position", "keyword", "present", "absent"),
+    [
+        (0, None, "arg = args[0]", "kwargs["),
+        (2, "kind", "arg = args[2]", "if not args"),
+        (2, "kind", "arg = kwargs['kind']", "if not args"),
+        (sys.maxsize, "kind", "arg = kwargs['kind']", "len(args)"),
+    ],
+)
+def test__generate_source__finds_dispatched_arg(
+    position, keyword, present, absent
+):
+    """Check the dispatched argument is found by position or keyword."""
+    # act
+    source = mod.generate_source(
+        has_literals=True, cacheable=True, position=position, keyword=keyword
+    )
+
+    # assert
+    assert present in source
+    assert absent not in source
+    compile(source, "<test>", "exec")
+
+
+def test__singledispatch_literal__compiled_dispatches_calls():
+    """Check the compiled wrapper resolves literals, types and defaults."""
+
+    # arrange
+    @singledispatch_literal(compiled=True)
+    def func(a, b):
+        return "default"
+
+    @func.register
+    def _(a: int, b):
+        return "int"
+
+    @func.register
+    def _(a: typing.Literal["abc", 49], b):
+        return "literal"
+
+    @func.register(str, literal=True)
+    def _(a, b):
+        return "str type"
+
+    # act
+    results = [func(v, None) for v in (1, "x", "abc", 49, str, [1], None)]
+
+    # assert
+    assert results == [
+        "int",
+        "default",
+        "literal",
+        "literal",
+        "str type",
+        "default",
+        "default",
+    ]
+
+
+def test__singledispatch_literal__compiled_rebuilt_on_register():
+    """Check the same wrapper object picks up later registrations."""
+
+    # arrange
+    @singledispatch_literal(compiled=True)
+    def func(a):
+        return "default"
+
+    wrapper = func
+    code_before = func.__code__
+    before = func(1)
+
+    # act
+    @func.register(1)
+    def _(a):
+        return "one"
+
+    # assert
+    assert before == "default"
+    assert wrapper(1) == "one"
+    assert wrapper(2) == "default"
+    assert func.__code__ is not code_before
+
+
+def test__singledispatch_literal__compiled_respects_abc_registration():
+    """Check virtual subclasses registered later are still dispatched."""
+
+    # arrange
+    class Base(abc.ABC):
+        pass
+
+    class Thing:
+        pass
+
+    @singledispatch_literal(compiled=True)
+    def func(a):
+        return "default"
+
+    @func.register
+    def _(a: Base):
+        return "base"
+
+    before = func(Thing())
+
+    # act
+    Base.register(Thing)
+
+    # assert
+    assert before == "default"
+    assert func(Thing()) == "base"
+
+
+def test__singledispatch_literal__compiled_error_when_called_kwargs_only():
+    """Check the compiled wrapper gives the same error without args."""
+    # arrange
+    func = singledispatch_literal(compiled=True)(lambda x, y: (x, y))
+
+    # act
+    with pytest.raises(TypeError) as e:
+        func(x=1, y=2)
+
+    # assert
+    assert "<lambda> requires at least 1 positional argument" in str(e)
+
+
+def test__singledispatch_literal__compiled_resolves_type_once():
+    """Check the type implementation is memoised per class."""
+    # arrange
+    func = singledispatch_literal(compiled=True)(lambda a: a)
+    resolve = mock.Mock(wraps=func.__globals__["_resolve"])
+
+    # act
+    with mock.patch.dict(func.__globals__, {"_resolve": resolve}):
+        func.__globals__["_impls"].clear()
+        for _ in range(3):
+            func(1)
+
+    # assert
+    resolve.assert_called_once_with(int)
+
+
+@pytest.mark.parametrize(
+    ("cls", "is_table"),
+    [
+        (enum.Enum("Pet", "CAT DOG"), True),
+        (enum.IntEnum("Code", "OK ERROR"), True),
+        (enum.Flag("Perm", "R W"), False),
+        (int, False),
+    ],
+)
+def test__enum_table__only_for_enums(cls, is_table):
+    """Check tables are only made for enums whose members have names."""
+    # arrange
+    values = {member: str for member in list(cls)[:1]} if is_table else {}
+
+    # act
+    table = mod.enum_table(cls, values)
+
+    # assert
+    if is_table:
+        assert table == {list(cls)[0].name: str}
+    else:
+        assert table is None
+
+
+def test__singledispatch_literal__compiled_enum_table():
+    """Check enum members are looked up by name, not hashed."""
+
+    # arrange
+    hashed = []
+
+    class Pet(enum.Enum):
+        CAT = 1
+        DOG = 2
+
+        def __hash__(self):
+            hashed.append(self)
+            return hash(self._name_)
+
+    @singledispatch_literal(compiled=True)
+    def func(a):
+        return "default"
+
+    def cat(a: typing.Literal[Pet.CAT]):
+        return "meow"
+
+    func.register(cat)
+    func.register(1, lambda a: "one")
+    hashed.clear()
+
+    # act
+    results = [func(v) for v in (Pet.CAT, Pet.DOG, 1, 2)]
+
+    # assert
+    assert hashed == []
+    assert results == ["meow", "default", "one", "default"]
+
+
+@pytest.mark.parametrize(
+    ("keys", "lower", "length"),
+    [
+        (range(256), 0, 256),
+        (range(-10, 10), -10, 20),
+        ([*range(100, 120, 2), 5000], 100, 19),
+        (range(0, 100, 3), None, None),
+        (range(4), None, None),
+    ],
+)
+def test__int_table__finds_dense_range(keys, lower, length):
+    """Check a list is only made for a range at least half full."""
+    # act
+    found, table = mod.int_table({key: str for key in keys})
+
+    # assert
+    if lower is None:
+        assert table is None
+    else:
+        assert found == lower
+        assert len(table) == length
+        assert all(table[key - lower] is str for key in keys if key < 5000)
+
+
+def test__singledispatch_literal__compiled_int_table():
+    """Check dense ints are indexed, keeping bools, floats and gaps apart."""
+
+    # arrange
+    @singledispatch_literal(compiled=True)
+    def func(a):
+        return "default"
+
+    with func.transaction():
+        for i in [*range(0, 20, 2), 1000]:
+            func.register(i, lambda a, i=i: f"int {i}")
+        func.register(True, lambda a: "true")
+        func.register(4.0, lambda a: "float")
+
+    # act
+    results = [func(v) for v in (4, 1000, 3, -1, True, False, 4.0, 2.0)]
+
+    # assert
+    assert func.__globals__["_int_table"][:2] == (0, 19)
+    assert results == [
+        "int 4",
+        "int 1000",
+        "default",
+        "default",
+        "true",
+        "default",
+        "float",
+        "default",
+    ]
+
+
+def test__singledispatch_literal__compiled_int_table_moved():
+    """Check code running when the int range moves indexes it correctly."""
+
+    # arrange
+    @singledispatch_literal(compiled=True)
+    def func(a):
+        return "default"
+
+    with func.transaction():
+        for i in range(10, 18):
+            func.register(i, lambda a, i=i: f"int {i}")
+
+    old = func.__code__
+
+    # act
+    with func.transaction():
+        for i in (4, 6, 8):
+            func.register(i, lambda a, i=i: f"int {i}")
+
+    func.__code__ = old
+    results = [func(v) for v in (4, 12, 17)]
+
+    # assert
+    assert func.__globals__["_int_table"][:2] == (4, 18)
+    assert results == ["int 4", "int 12", "int 17"]
+
+
+@pytest.mark.parametrize(("literals",), [(False,), (True,)])
+def test__singledispatch_literal__compiled_cache_bounded(
+    monkeypatch, literals
+):
+    """Check classes created at runtime aren't kept alive by the caches."""
+    # arrange
+    monkeypatch.setattr(mod, "_CACHE_SIZE", 4)
+
+    @singledispatch_literal(compiled=True)
+    def func(a):
+        return "default"
+
+    if literals:
+        func.register("a", lambda a: "a", literal=True)
+
+    refs = []
+    for _ in range(10):
+        cls = type("Dynamic", (), {})
+        refs.append(weakref.ref(cls))
+        func(cls())
+    del cls
+
+    # act
+    gc.collect()
+
+    # assert
+    assert sum(ref() is not None for ref in refs) <= 4
@@ -0,0 +1,243 @@
+import asyncio
+import typing
+
+import pytest
+
+import partialdispatch.coroutines as mod
+
+
+def _make_dispatcher(**kwargs):
+    @mod.async_singledispatch_literal(**kwargs)
+    async def handle(message, suffix=""):
+        return f"default {message}{suffix}"
+
+    async def ping(message: typing.Literal["ping"], suffix=""):
+        return f"pong{suffix}"
+
+    async def number(message: int, suffix=""):
+        return f"number {message}{suffix}"
+
+    handle.register(ping)
+    handle.register(number)
+
+    return handle
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__async_singledispatch_literal__dispatches(compiled):
+    """Check calling returns the implementation's own coroutine."""
+    # arrange
+    handle = _make_dispatcher(compiled=compiled)
+
+    # act
+    coro = handle("ping")
+    result = asyncio.run(coro)
+
+    # assert
+    assert coro.cr_code.co_name == "ping"
+    assert result == "pong"
+    assert asyncio.run(handle(1)) == "number 1"
+    assert asyncio.run(handle("pong")) == "default pong"
+
+
+def test__async_singledispatch_literal__stats_and_deferred(monkeypatch):
+    """Check stats and deferred are passed on to singledispatch_literal."""
+    # arrange
+    handle = _make_dispatcher(stats=True, deferred=True)
+
+    async def later(message: "_Later", suffix=""):  # noqa: F821
+        return "later"
+
+    handle.register(later)
+    monkeypatch.setitem(globals(), "_Later", typing.Literal["later"])
+
+    # act
+    results = [asyncio.run(handle(v)) for v in ["later", "ping", 1]]
+
+    # assert
+    assert results == ["later", "pong", "number 1"]
+    assert handle.stats()["literal"] == {str: {"later": 1, "ping": 1}}
+    assert handle.stats()["type"] == {int: 1}
+
+
+def test__async_singledispatch_literal__sync_default():
+    """Check a synchronous default is rejected."""
+    # act / assert
+    with pytest.raises(TypeError, match="not a coroutine function"):
+
+        @mod.async_singledispatch_literal
+        def func(a):
+            pass
+
+
+@pytest.mark.parametrize(
+    ("args", "kwargs"),
+    [
+        ((), {}),
+        ((str,), {}),
+        ((None,), {"literal": True}),
+    ],
+)
+def test__async_singledispatch_literal__sync_impl(args, kwargs):
+    """Check synchronous implementations are rejected however registered."""
+    # arrange
+    handle = _make_dispatcher()
+    registry = dict(handle.registry)
+
+    def sync(message: typing.Literal["sync"]):
+        return "sync"
+
+    # act / assert
+    with pytest.raises(TypeError, match="sync is not a coroutine function"):
+        if args or kwargs:
+            handle.register(*args, **kwargs)(sync)
+        else:
+            handle.register(sync)
+
+    assert dict(handle.registry) == registry
+    assert None not in handle.literal_registry.get(type(None), {})
+
+
+@pytest.mark.parametrize(
+    "register",
+    [
+        lambda handle, sync: handle.register_many(["a", "b"], sync),
+        lambda handle, sync: handle.register_many(["a", "b"])(sync),
+        lambda handle, sync: handle.register_many({"a": sync}),
+    ],
+)
+def test__async_singledispatch_literal__sync_register_many(register):
+    """Check synchronous implementations are rejected in bulk."""
+    # arrange
+    handle = _make_dispatcher()
+
+    def sync(message):
+        return "sync"
+
+    # act / assert
+    with pytest.raises(TypeError, match="sync is not a coroutine function"):
+        register(handle, sync)
+
+    assert "a" not in handle.literal_registry[str]
+
+
+def test__async_singledispatch_literal__register_table(tmp_path):
+    """Check handlers in a table are checked, and registered if async."""
+    # arrange
+    handle = _make_dispatcher()
+    table = tmp_path / "table.json"
+    table.write_text('{"a": "first", "b": "second"}')
+
+    async def first(message, suffix=""):
+        return "first"
+
+    def second(message):
+        return "second"
+
+    # act
+    with pytest.raises(TypeError, match="second is not a coroutine function"):
+        handle.register_table(table, {"first": first, "second": second})
+
+    handle.register_table(table, {"first": first, "second": first})
+
+    # assert
+    assert asyncio.run(handle("b")) == "first"
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__async_singledispatch_literal__sync_lazy(compiled):
+    """Check lazy handlers are checked when they're imported."""
+    # arrange
+    handle = _make_dispatcher(compiled=compiled)
+    placeholder = handle.register_lazy("sync", "os.path:basename")
+
+    # act / assert
+    with pytest.raises(TypeError, match="basename is not a coroutine"):
+        handle("sync")
+
+    assert handle.literal_registry[str]["sync"] is placeholder
+
+
+def test__async_singledispatch_literal__no_batch():
+    """Check batch implementations are rejected."""
+    # arrange
+    handle = _make_dispatcher()
+
+    async def batch(messages: str):
+        return messages
+
+    # act / assert
+    with pytest.raises(TypeError, match="batch=True"):
+        handle.register(batch, batch=True)
+
+
+@pytest.mark.parametrize("limit", [None, 1, 2, 100])
+def test__async_singledispatch_literal__gather(limit):
+    """Check gather returns results in order, with bounded concurrency."""
+    # arrange
+    running, most_running = 0, 0
+
+    @mod.async_singledispatch_literal
+    async def handle(message, suffix):
+        nonlocal running, most_running
+        running += 1
+        most_running = max(running, most_running)
+        # finish out of order
+        await asyncio.sleep(0.001 * (message % 3))
+        running -= 1
+
+        return f"{message}{suffix}"
+
+    # act
+    results = asyncio.run(handle.gather(range(10), "!", limit=limit))
+
+    # assert
+    assert results == [f"{i}!" for i in range(10)]
+    assert most_running == (10 if limit is None else min(limit, 10))
+
+
+def test__async_singledispatch_literal__gather_dispatch_on():
+    """Check gather passes values by keyword when dispatching on one."""
+
+    # arrange
+    @mod.async_singledispatch_literal(dispatch_on="message")
+    async def handle(prefix, message):
+        return f"{prefix} {message}"
+
+    @handle.register
+    async def _(prefix, message: typing.Literal[2]):
+        return "two"
+
+    # act
+    results = asyncio.run(handle.gather([1, 2], "got", limit=1))
+
+    # assert
+    assert results == ["got 1", "two"]
+
+
+def test__async_singledispatch_literal__gather_invalid_limit():
+    """Check the limit must be positive."""
+    # arrange
+    handle = _make_dispatcher()
+
+    # act / assert
+    with pytest.raises(ValueError, match="at least 1"):
+        asyncio.run(handle.gather([1], limit=0))
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__async_singledispatch_literal__freeze(compiled):
+    """Check a frozen dispatcher keeps gather and the async register."""
+    # arrange
+    handle = _make_dispatcher(compiled=compiled)
+
+    # act
+    frozen = handle.freeze()
+    results = asyncio.run(frozen.gather(["ping", 1], limit=1))
+
+    # assert
+    assert results == ["pong", "number 1"]
+    assert frozen.register is handle.register
+    assert frozen.freeze is handle.freeze
+    with pytest.raises(TypeError, match="not a coroutine function"):
+        frozen.register("sync", lambda message: "sync")
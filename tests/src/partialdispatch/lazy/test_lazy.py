@@ -0,0 +1,154 @@
+import sys
+import textwrap
+import typing
+
+import pytest
+
+import partialdispatch.lazy as mod
+from partialdispatch import singledispatch_literal
+
+
+@pytest.fixture
+def handlers(tmp_path, monkeypatch):
+    """A module of handlers, which hasn't been imported."""
+    name = f"lazy_handlers_{abs(hash(tmp_path))}"
+    (tmp_path / f"{name}.py").write_text(
+        textwrap.dedent(
+            """
+            import typing
+
+            def export(a):
+                return f"export {a}"
+
+            def number(a: int):
+                return f"number {a}"
+
+            class Commands:
+                @staticmethod
+                def undo(a):
+                    return "undo"
+
+            def invalid(*, a):
+                return "keyword only"
+            """
+        )
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield name
+    sys.modules.pop(name, None)
+
+
+def _make_dispatcher(**kwargs):
+    @singledispatch_literal(**kwargs)
+    def func(a):
+        return "default"
+
+    return func
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__register_lazy__imports_on_first_dispatch(handlers, compiled):
+    """Check the module is only imported once a call is dispatched to it."""
+    # arrange
+    func = _make_dispatcher(compiled=compiled)
+    placeholder = func.register_lazy("export", f"{handlers}:export")
+    func.register_lazy(int, f"{handlers}:number")
+
+    # act
+    imported_before = handlers in sys.modules
+    unrelated = func("other")
+    imported_unrelated = handlers in sys.modules
+    results = [func("export"), func(2), func("export")]
+
+    # assert
+    assert not imported_before
+    assert unrelated == "default"
+    assert not imported_unrelated
+    assert results == ["export export", "number 2", "export export"]
+    handler = func.literal_registry[str]["export"]
+    assert handler is sys.modules[handlers].export
+    assert handler is placeholder.resolve()
+    assert func.registry[int] is sys.modules[handlers].number
+
+
+def test__register_lazy__literal_annotation(handlers):
+    """Check each value of a Literal is registered."""
+    # arrange
+    func = _make_dispatcher()
+
+    # act
+    func.register_lazy(typing.Literal["a", "b"], f"{handlers}:Commands.undo")
+
+    # assert
+    assert [func("a"), func("b"), func("c")] == ["undo", "undo", "default"]
+
+
+def test__register_lazy__validates_on_first_dispatch(handlers):
+    """Check handlers are validated when imported, not registered."""
+    # arrange
+    func = _make_dispatcher()
+    func.register_lazy("bad", f"{handlers}:invalid")
+
+    # act / assert
+    with pytest.raises(TypeError, match="positional"):
+        func("bad")
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__register_lazy__deferred_in_order(handlers, compiled):
+    """Check deferred lazy registrations replace earlier ones, in order."""
+    # arrange
+    func = _make_dispatcher(compiled=compiled, deferred=True)
+    func.register("export", lambda a: "eager")
+    func.register_lazy("export", f"{handlers}:export")
+    func.register_lazy("undo", f"{handlers}:Commands.undo")
+    func.register("undo", lambda a: "eager undo")
+
+    # act
+    imported_before = handlers in sys.modules
+    results = [func("export"), func("undo")]
+
+    # assert
+    assert not imported_before
+    assert results == ["export export", "eager undo"]
+
+
+def test__register_lazy__frozen(handlers):
+    """Check placeholders still import their handler once frozen."""
+    # arrange
+    func = _make_dispatcher()
+    func.register_lazy("export", f"{handlers}:export")
+    frozen = func.freeze()
+
+    # act
+    result = frozen("export")
+
+    # assert
+    assert result == "export export"
+    with pytest.raises(TypeError, match="frozen"):
+        func.register_lazy("other", f"{handlers}:export")
+
+
+@pytest.mark.parametrize(
+    "reference", ["module", "module:", ":handler", "module:a..b"]
+)
+def test__lazy_handler__invalid_reference(reference):
+    """Check references are checked when registered."""
+    # act / assert
+    with pytest.raises(ValueError, match="package.module:handler"):
+        _make_dispatcher().register_lazy("x", reference)
+
+
+def test__lazy_handler__resolves_once(handlers):
+    """Check the handler is only registered once."""
+    # arrange
+    registered = []
+    placeholder = mod.LazyHandler(f"{handlers}:export", registered.append)
+
+    # act
+    results = [placeholder(1), placeholder(2)]
+
+    # assert
+    assert results == ["export 1", "export 2"]
+    assert registered == [sys.modules[handlers].export]
+    assert repr(placeholder) == f"LazyHandler('{handlers}:export')"
@@ -0,0 +1,631 @@
+import collections.abc
+import numbers
+import re
+import sys
+import typing
+
+import pytest
+
+import partialdispatch.matchers as mod
+from partialdispatch import (singledispatch_literal,
+                             singledispatchmethod_literal)
+
+
+def _index(*intervals: mod.Interval) -> mod.IntervalIndex:
+    index = mod.IntervalIndex()
+    for interval in intervals:
+        index.add(interval, interval)
+
+    return index
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (-1, mod.Interval(None, 0)),
+        (0, mod.Interval(0, 10)),
+        (9.5, mod.Interval(0, 10)),
+        (10, None),
+        (10.5, mod.Interval(10, 20, "right")),
+        (20, mod.Interval(10, 20, "right")),
+        (21, None),
+        (22, None),
+        (30, mod.Interval(30, None)),
+        (10**9, mod.Interval(30, None)),
+    ],
+)
+def test__interval_index__match(value, expected):
+    """Check values are matched to the interval containing them."""
+    # arrange
+    index = _index(
+        mod.Interval(30, None),
+        mod.Interval(10, 20, "right"),
+        mod.Interval(None, 0),
+        mod.Interval(0, 10),
+        mod.Interval(22, 30, "neither"),
+    )
+
+    # act
+    matched = index.match(value)
+
+    # assert
+    assert matched == expected
+    assert len(index) == 5
+
+
+def test__interval_index__lower_open_after_closed_upper():
+    """Check a shared bound goes to the interval that includes it."""
+    # arrange
+    index = _index(
+        mod.Interval(0, 10, "both"),
+        mod.Interval(10, 20, "neither"),
+    )
+
+    # act / assert
+    assert index.match(10) == mod.Interval(0, 10, "both")
+    assert index.match(10.5) == mod.Interval(10, 20, "neither")
+
+
+@pytest.mark.parametrize(
+    "interval",
+    [
+        mod.Interval(5, 15),
+        mod.Interval(None, 1),
+        mod.Interval(9, 10, "right"),
+    ],
+)
+def test__interval_index__rejects_overlaps(interval):
+    """Check overlapping intervals can't be registered."""
+    # arrange
+    index = _index(mod.Interval(0, 10))
+
+    # act / assert
+    with pytest.raises(ValueError, match="overlaps"):
+        index.add(interval, print)
+
+
+def test__interval_index__replaces_equal_interval():
+    """Check registering the same interval again replaces its impl."""
+    # arrange
+    index = _index(mod.Interval(0, 10))
+
+    # act
+    index.add(mod.Interval(0, 10), print)
+
+    # assert
+    assert index.match(5) is print
+    assert len(index) == 1
+
+
+@pytest.mark.parametrize(
+    ("args", "kwargs"),
+    [
+        ((), {}),
+        ((1, 0), {}),
+        ((0, 1), {"closed": "open"}),
+    ],
+)
+def test__interval__invalid(args, kwargs):
+    """Check invalid intervals are rejected."""
+    # act / assert
+    with pytest.raises(ValueError):
+        mod.Interval(*args, **kwargs)
+
+
+def test__get_matcher__interval_classes():
+    """Check numeric intervals cover ints and floats, others their type."""
+    # act / assert
+    assert mod.get_matcher(mod.Interval(0, 1))[0] == (int, float)
+    assert mod.get_matcher(mod.Interval("a", "b"))[0] == (str,)
+    assert mod.get_matcher(int) is None
+
+
+@pytest.mark.skipif(sys.version_info < (3, 9), reason="no typing.Annotated")
+def test__get_matcher__annotated():
+    """Check matchers are found in typing.Annotated metadata."""
+    # arrange
+    interval = mod.Interval(0, 1)
+
+    # act / assert
+    assert mod.get_matcher(typing.Annotated[int, "doc", interval]) == (
+        (int,),
+        interval,
+    )
+    assert mod.get_matcher(typing.Annotated[int, "doc"]) is None
+    with pytest.raises(TypeError, match="only one matcher"):
+        mod.get_matcher(typing.Annotated[int, interval, interval])
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__dispatches_on_interval(compiled):
+    """Check literals win over intervals, which win over types."""
+
+    # arrange
+    @singledispatch_literal(compiled=compiled)
+    def grade(score):
+        return "default"
+
+    def passed(score):
+        return "pass"
+
+    grade.register(mod.Interval(50, 70), passed)
+
+    def full_marks(score: typing.Literal[100]):
+        return "full marks"
+
+    grade.register(full_marks)
+    grade.register(mod.Interval(70, None), lambda score: "distinction")
+
+    def numbers(score: int):
+        return "fail"
+
+    grade.register(numbers)
+
+    # act / assert
+    assert grade(10) == "fail"
+    assert grade(50) == "pass"
+    assert grade(69.5) == "pass"
+    assert grade(70) == "distinction"
+    assert grade(100) == "full marks"
+    assert grade("50") == "default"
+    assert grade.dispatch(55, literal=True) is passed
+    assert set(grade.matcher_registry) == {int, float}
+
+
+@pytest.mark.skipif(sys.version_info < (3, 9), reason="no typing.Annotated")
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__annotated_interval(compiled):
+    """Check intervals annotated on the argument apply to that class."""
+
+    # arrange
+    @singledispatch_literal(compiled=compiled)
+    def size(n):
+        return "default"
+
+    def small(n: typing.Annotated[int, mod.Interval(0, 10)]):
+        return "small"
+
+    def documented(n: typing.Annotated[str, "some docs"]):
+        return "str"
+
+    size.register(small)
+    size.register(documented)
+
+    # act / assert
+    assert size(5) == "small"
+    assert size(5.0) == "default"
+    assert size(50) == "default"
+    assert size("x") == "str"
+    assert list(size.matcher_registry) == [int]
+
+
+def test__singledispatch_literal__interval_overlap_error():
+    """Check overlapping registrations raise when registered."""
+
+    # arrange
+    @singledispatch_literal
+    def func(a):
+        return "default"
+
+    func.register(mod.Interval(0, 10), lambda a: "first")
+
+    # act / assert
+    with pytest.raises(ValueError, match="overlaps"):
+        func.register(mod.Interval(5, 15), lambda a: "second")
+
+
+def test__singledispatchmethod_literal__interval():
+    """Check intervals work for methods."""
+
+    # arrange
+    class A:
+        @singledispatchmethod_literal
+        def func(self, a):
+            return "default"
+
+        @func.register(mod.Interval(0, 10))
+        def _(self, a):
+            return "small"
+
+    # act / assert
+    assert A().func(1) == "small"
+    assert A().func(11) == "default"
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("/api/v2/users", "/api/v2/"),
+        ("/api/v1/users", "/api/"),
+        ("/api/", "/api/"),
+        ("/ap", ""),
+        ("", ""),
+    ],
+)
+def test__prefix_index__longest_match(value, expected):
+    """Check the longest registered prefix wins."""
+    # arrange
+    index = mod.PrefixIndex()
+    for prefix in ("/api/", "", "/api/v2/"):
+        index.add(mod.Prefix(prefix), prefix)
+
+    # act
+    matched = index.match(value)
+
+    # assert
+    assert matched == expected
+
+
+def test__prefix_index__no_match():
+    """Check None is returned when no prefix matches."""
+    # arrange
+    index = mod.PrefixIndex()
+    index.add(mod.Prefix(b"GET "), "get")
+
+    # act / assert
+    assert index.match(b"GET /") == "get"
+    assert index.match(b"POST /") is None
+
+
+def test__regex_index__combines_patterns():
+    """Check patterns without groups are combined into one alternation."""
+    # arrange
+    index = mod.RegexIndex()
+    index.add(mod.Regex(r"ERROR\b"), "error")
+    index.add(mod.Regex(r"WARN(ING)?\b"), "warning")
+    index.add(mod.Regex(r"\w+:"), "tagged")
+    index.add(mod.Regex(r"INFO|DEBUG"), "info")
+
+    # act / assert
+    assert index.match("ERROR: disk full") == "error"
+    assert index.match("WARNING: disk nearly full") == "warning"
+    assert index.match("WARN disk nearly full") == "warning"
+    assert index.match("DEBUG: disk usage") == "tagged"
+    assert index.match("DEBUG disk usage") == "info"
+    assert index.match("disk usage") is None
+    # the pattern with a group splits the others into two runs
+    assert [impls is not None for _, impls, _ in index._segments] == [
+        False,
+        False,
+        True,
+    ]
+
+
+def test__regex_index__inline_flags_not_combined():
+    """Check patterns which can't be combined are matched on their own."""
+    # arrange
+    index = mod.RegexIndex()
+    index.add(mod.Regex("a"), "a")
+    index.add(mod.Regex("(?i)b"), "b")
+    index.add(mod.Regex("c", re.IGNORECASE), "c")
+
+    # act / assert
+    assert index.match("B") == "b"
+    assert index.match("C") == "c"
+    assert index.match("A") is None
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__dispatches_on_strings(compiled):
+    """Check literals win over prefixes, which win over patterns."""
+
+    # arrange
+    @singledispatch_literal(compiled=compiled)
+    def route(line):
+        return "default"
+
+    route.register(mod.Prefix("GET "), lambda line: "get")
+    route.register(mod.Prefix("GET /admin"), lambda line: "admin")
+    route.register(mod.Regex(r"[A-Z]+ /"), lambda line: "other method")
+    route.register("GET /", lambda line: "index", literal=True)
+
+    # act / assert
+    assert route("GET /") == "index"
+    assert route("GET /users") == "get"
+    assert route("GET /admin/users") == "admin"
+    assert route("POST /users") == "other method"
+    assert route("post /users") == "default"
+    assert route(b"GET /") == "default"
+
+
+def test__guard_index__orders_by_cost():
+    """Check cheaper guards are tried first."""
+    # arrange
+    calls = []
+
+    def is_even(a):
+        calls.append("even")
+        return a % 2 == 0
+
+    def is_big(a):
+        calls.append("big")
+        return a > 100
+
+    index = mod.GuardIndex()
+    index.add(mod.Guard(is_big, cost=10), "big")
+    index.add(mod.Guard(is_even, cost=1), "even")
+
+    # act
+    matched = index.match(101)
+
+    # assert
+    assert matched == "big"
+    assert calls == ["even", "big"]
+
+
+def test__guard_index__adapts_to_hit_rate(monkeypatch):
+    """Check guards which often accept move ahead of equally costly ones."""
+    # arrange
+    monkeypatch.setattr(mod, "_REORDER_INTERVAL", 10)
+    index = mod.GuardIndex()
+    index.add(mod.Guard(lambda a: a < 0), "negative")
+    index.add(mod.Guard(lambda a: a > 0), "positive")
+
+    # act
+    for _ in range(10):
+        index.match(1)
+
+    # assert
+    assert [entry.impl for entry in index._entries] == [
+        "positive",
+        "negative",
+    ]
+
+
+def test__guard_index__negative_cache():
+    """Check rejected hashable values don't call the predicate again."""
+    # arrange
+    calls = []
+
+    def is_short(a):
+        calls.append(a)
+        return len(a) < 3
+
+    index = mod.GuardIndex()
+    index.add(mod.Guard(is_short, cache=True), "short")
+
+    # act
+    results = [index.match(v) for v in ("long", "long", ["a"], ["a"])]
+
+    # assert
+    assert results == [None, None, "short", "short"]
+    assert calls == ["long", ["a"], ["a"]]
+
+
+@pytest.mark.parametrize(
+    ("args", "error"), [((1,), TypeError), ((len, 0), ValueError)]
+)
+def test__guard__invalid(args, error):
+    """Check guards need a callable and positive cost."""
+    # act / assert
+    with pytest.raises(error):
+        mod.Guard(*args)
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__dispatches_on_guard(compiled):
+    """Check guards run after literals, for the registered classes only."""
+
+    # arrange
+    @singledispatch_literal(compiled=compiled)
+    def describe(a):
+        return "default"
+
+    @describe.register(when=lambda a: a < 0)
+    def _(a: int):
+        return "negative"
+
+    def empty(a):
+        return "empty"
+
+    describe.register(typing.Union[str, list], empty, when=lambda a: not a)
+    describe.register(0, lambda a: "zero", literal=True)
+
+    # act / assert
+    assert describe(-1) == "negative"
+    assert describe(0) == "zero"
+    assert describe(1) == "default"
+    assert describe(-1.0) == "default"
+    assert describe("") == "empty"
+    assert describe([]) == "empty"
+    assert describe("a") == "default"
+    assert set(describe.matcher_registry) == {int, str, list}
+
+
+@pytest.mark.parametrize(
+    ("compiled", "stats"), [(False, False), (True, False), (False, True)]
+)
+def test__singledispatch_literal__guard_on_abc(compiled, stats):
+    """Check guards registered for an ABC run for the classes it covers."""
+
+    # arrange
+    @singledispatch_literal(compiled=compiled, stats=stats)
+    def describe(a):
+        return "default"
+
+    describe.register(
+        collections.abc.Mapping,
+        lambda a: "empty mapping",
+        when=lambda a: not a,
+    )
+    describe.register(
+        numbers.Number, lambda a: "negative", when=lambda a: a < 0
+    )
+    describe.register(int, lambda a: "big", when=lambda a: a > 100)
+
+    class Registered:
+        pass
+
+    before = describe(Registered())
+    numbers.Number.register(Registered)
+    Registered.__lt__ = lambda self, other: True
+
+    # act / assert
+    assert describe({}) == "empty mapping"
+    assert describe({1: 2}) == "default"
+    assert describe(-1) == "negative"
+    assert describe(-1.5) == "negative"
+    assert describe(1000) == "big"
+    assert describe(1) == "default"
+    assert before == "default"
+    assert describe(Registered()) == "negative"
+
+
+def test__singledispatch_literal__guard_needs_class():
+    """Check guards can't be registered without a class."""
+
+    # arrange
+    @singledispatch_literal
+    def func(a):
+        return "default"
+
+    def unannotated(a):
+        return "guarded"
+
+    # act / assert
+    with pytest.raises(TypeError, match="must be annotated"):
+        func.register(unannotated, when=callable)
+
+    with pytest.raises(TypeError, match="not a class"):
+        func.register(typing.Literal[1], unannotated, when=callable)
+
+
+def test__singledispatchmethod_literal__guard():
+    """Check guards work for methods."""
+
+    # arrange
+    class A:
+        @singledispatchmethod_literal
+        def func(self, a):
+            return "default"
+
+        @func.register(int, when=lambda a: a > 10)
+        def _(self, a):
+            return "big"
+
+    # act / assert
+    assert A().func(11) == "big"
+    assert A().func(1) == "default"
+
+
+def test__structural_key__equal_for_equal_values():
+    """Check keys are equal for equal values, and tagged by class."""
+    # act
+    keys = [
+        mod.structural_key({"a": [1, {2}], "b": None}),
+        mod.structural_key({"b": None, "a": [1, {2}]}),
+        mod.structural_key({"a": [1, {3}], "b": None}),
+        mod.structural_key({"a": (1, {2}), "b": None}),
+    ]
+
+    # assert
+    assert all(hash(key) is not None for key in keys)
+    assert keys[0] == keys[1]
+    assert keys[0] != keys[2]
+    assert keys[0] != keys[3]
+    assert mod.structural_key("a") == "a"
+
+
+def test__structural__invalid():
+    """Check values holding other unhashable values are rejected."""
+
+    # arrange
+    class Mutable:
+        __hash__ = None
+
+    # act / assert
+    with pytest.raises(TypeError, match="unhashable"):
+        mod.Structural([1, Mutable()])
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__dispatches_on_structural(compiled):
+    """Check lists and dicts are dispatched on by their contents."""
+
+    # arrange
+    @singledispatch_literal(compiled=compiled)
+    def handle(a):
+        return "default"
+
+    handle.register(mod.Structural({"type": "ping"}), lambda a: "ping")
+    handle.register(mod.Structural([1, [2]]), lambda a: "nested")
+    handle.register(list, lambda a: "list")
+
+    # act / assert
+    assert handle({"type": "ping"}) == "ping"
+    assert handle({"type": "pong"}) == "default"
+    assert handle([1, [2]]) == "nested"
+    assert handle([1, (2,)]) == "list"
+    assert handle([1, [object()]]) == "list"
+    assert handle((1, [2])) == "default"
+
+
+@pytest.mark.skipif(sys.version_info < (3, 9), reason="no typing.Annotated")
+def test__singledispatch_literal__annotated_structural():
+    """Check structural values can be given as annotation metadata."""
+
+    # arrange
+    @singledispatch_literal
+    def handle(a):
+        return "default"
+
+    @handle.register
+    def _(a: typing.Annotated[dict, mod.Structural({"op": "add"})]):
+        return "add"
+
+    # act / assert
+    assert handle({"op": "add"}) == "add"
+    assert handle({"op": "sub"}) == "default"
+
+
+def test__guard_index__negative_cache_skips_unhashable_classes():
+    """Check values of unhashable classes aren't looked up in the cache."""
+
+    # arrange
+    probed = []
+
+    class Misses(set):
+        def __contains__(self, value):
+            probed.append(value)
+            return super().__contains__(value)
+
+    index = mod.GuardIndex()
+    index.add(mod.Guard(lambda a: False, cache=True), "never")
+    (entry,) = index._entries
+    entry.misses = Misses()
+
+    # act
+    results = [index.match(v) for v in ([1], {"a": 1}, "a", "a")]
+
+    # assert
+    assert results == [None, None, None, None]
+    assert probed == ["a", "a"]
+
+
+def test__discriminator_index__matches_by_exact_class():
+    """Check the field's value is matched within its exact class."""
+    # arrange
+    index = mod.DiscriminatorIndex()
+    index.add(mod.Discriminator("type", ["a", "b"]), "ab")
+    index.add(mod.Discriminator("type", [1]), "one")
+    copy = index.copy()
+    copy.add(mod.Discriminator("type", ["c"]), "c")
+
+    # act
+    results = [
+        index.match(v)
+        for v in (
+            {"type": "a"},
+            {"type": "b"},
+            {"type": 1},
+            {"type": True},
+            {"type": "c"},
+            {"type": ["a"]},
+            {},
+        )
+    ]
+
+    # assert
+    assert results == ["ab", "ab", "one", None, None, None, None]
+    assert copy.match({"type": "c"}) == "c"
+    assert index.fields() == ("type",)
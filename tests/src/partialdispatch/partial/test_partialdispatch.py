@@ -0,0 +1,160 @@
+import abc
+import typing
+from unittest import mock
+
+import pytest
+
+import partialdispatch.partial as mod
+
+
+@pytest.fixture
+def handle():
+    """A dispatcher on positions 0 and 2, with a few registrations."""
+
+    @mod.partialdispatch(0, 2)
+    def handle(kind, payload, version):
+        return "default"
+
+    @handle.register(typing.Literal["user"], int)
+    def _(kind, payload, version):
+        return "user, int"
+
+    @handle.register
+    def _(kind: str, payload, version: typing.Literal[2, 3]):
+        return "str, 2 or 3"
+
+    @handle.register(str, bool)
+    def _(kind, payload, version):
+        return "str, bool"
+
+    @handle.register(typing.Literal["user"], typing.Literal[3])
+    def _(kind, payload, version):
+        return "user, 3"
+
+    return handle
+
+
+@pytest.mark.parametrize(
+    ("args", "expected"),
+    [
+        (("user", None, 1), "user, int"),
+        (("group", None, 2), "str, 2 or 3"),
+        (("group", None, 1), "default"),
+        (("group", None, True), "str, bool"),
+        (("user", None, 3), "user, 3"),
+        ((1, None, 2), "default"),
+        ((["user"], None, 1), "default"),
+    ],
+)
+def test__partialdispatch__dispatches_on_positions(handle, args, expected):
+    """Check literals and types are combined across positions."""
+    # assert
+    assert handle(*args) == expected
+
+
+def test__partialdispatch__literals_distinct_across_types(handle):
+    """Check True is not dispatched as the literal 1, or vice versa."""
+
+    # arrange
+    @handle.register(str, typing.Literal[1])
+    def _(kind, payload, version):
+        return "str, 1"
+
+    # act
+    results = [handle("group", None, 1), handle("group", None, True)]
+
+    # assert
+    assert results == ["str, 1", "str, bool"]
+
+
+def test__partialdispatch__ambiguous_raises(handle):
+    """Check no registration is picked when none is most specific."""
+    # act
+    with pytest.raises(TypeError) as e:
+        handle("user", None, 2)
+
+    # assert
+    assert "Ambiguous dispatch for handle" in str(e.value)
+
+
+def test__partialdispatch__resolves_once_per_key(handle):
+    """Check the most specific registration is found once per key."""
+    # arrange
+    handle._clear_cache()
+
+    # act
+    with mock.patch.object(
+        mod.functools, "_compose_mro", wraps=mod.functools._compose_mro
+    ) as compose_mro:
+        for _ in range(3):
+            handle("group", None, 2)
+
+    # assert
+    assert compose_mro.call_count == 2  # once per position
+
+
+def test__partialdispatch__dispatch_returns_impl(handle):
+    """Check dispatch() takes one value per position."""
+    # act
+    impl = handle.dispatch("user", 1)
+
+    # assert
+    assert impl("user", None, 1) == "user, int"
+    with pytest.raises(TypeError):
+        handle.dispatch("user")
+
+
+def test__partialdispatch__abc_registered_later():
+    """Check virtual subclasses registered after a call are picked up."""
+
+    # arrange
+    class Base(abc.ABC):
+        pass
+
+    class Thing:
+        pass
+
+    @mod.partialdispatch(1)
+    def func(a, b):
+        return "default"
+
+    @func.register(Base)
+    def _(a, b):
+        return "base"
+
+    before = func(None, Thing())
+
+    # act
+    Base.register(Thing)
+
+    # assert
+    assert before == "default"
+    assert func(None, Thing()) == "base"
+
+
+def test__partialdispatch__too_few_positional_args(handle):
+    """Check an informative error when a dispatched position is missing."""
+    # act
+    with pytest.raises(TypeError) as e:
+        handle("user", None, version=1)
+
+    # assert
+    assert "requires at least 3 positional argument(s)" in str(e.value)
+
+
+@pytest.mark.parametrize(("positions",), [((),), ((0, 0),), ((-1,),)])
+def test__partialdispatch__invalid_positions(positions):
+    """Check positions are validated when the decorator is created."""
+    # act / assert
+    with pytest.raises(TypeError):
+        mod.partialdispatch(*positions)
+
+
+def test__partialdispatch__register_wrong_number_of_values(handle):
+    """Check register takes one value per dispatched position."""
+    # act
+    with pytest.raises(TypeError) as e:
+        handle.register(str, int, int)
+
+    # assert
+    assert "takes one value per dispatched position (0, 2)" in str(e.value)
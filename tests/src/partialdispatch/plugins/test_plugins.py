@@ -0,0 +1,255 @@
+import json
+import sys
+import textwrap
+
+import pytest
+
+import partialdispatch.plugins as mod
+from partialdispatch import singledispatch_literal
+
+
+@pytest.fixture
+def plugin(tmp_path, monkeypatch):
+    """An installed distribution with handlers as entry points."""
+    name = f"plugin_handlers_{abs(hash(tmp_path))}"
+    group = f"{name}.commands"
+    site = tmp_path / "site"
+    site.mkdir()
+    (site / f"{name}.py").write_text(
+        textwrap.dedent(
+            """
+            import decimal
+            import typing
+
+            def export(a: typing.Literal["export", "save"]):
+                return f"export {a}"
+
+            def money(a: decimal.Decimal):
+                return f"money {a}"
+
+            def _make_local():
+                class Local:
+                    pass
+
+                def local(a: Local):
+                    return "local"
+
+                return Local, local
+
+            Local, local = _make_local()
+            """
+        )
+    )
+    dist_info = site / f"{name}-1.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text(
+        f"Metadata-Version: 2.1\nName: {name}\nVersion: 1.0\n"
+    )
+    (dist_info / "entry_points.txt").write_text(
+        f"[{group}]\n"
+        f"export = {name}:export\n"
+        f"money = {name}:money\n"
+        f"local = {name}:local\n"
+    )
+    monkeypatch.syspath_prepend(str(site))
+    yield name, group
+    sys.modules.pop(name, None)
+
+
+def _make_dispatcher(**kwargs):
+    @singledispatch_literal(**kwargs)
+    def func(a):
+        return "default"
+
+    return func
+
+
+def test__records__describes_entry_points(plugin, tmp_path):
+    """Check each entry point is recorded with its values or type."""
+    # arrange
+    name, group = plugin
+
+    # act
+    records = mod.records(group, None, tmp_path / "manifest.json")
+
+    # assert
+    by_name = {record["name"]: record for record in records}
+    assert by_name["export"] == {
+        "name": "export",
+        "reference": f"{name}:export",
+        "values": ["export", "save"],
+    }
+    assert by_name["money"] == {
+        "name": "money",
+        "reference": f"{name}:money",
+        "type": "decimal:Decimal",
+    }
+    # a type which isn't found by reference isn't recorded
+    assert by_name["local"] == {"name": "local", "reference": f"{name}:local"}
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__load_entry_points__registers_handlers(plugin, tmp_path, compiled):
+    """Check the handlers are registered, and the manifest written."""
+    # arrange
+    name, group = plugin
+    manifest = tmp_path / "manifest.json"
+    func = _make_dispatcher(compiled=compiled)
+
+    # act
+    loaded = func.load_entry_points(group, manifest=manifest)
+
+    # assert
+    assert loaded == 3
+    assert manifest.exists()
+    assert json.loads(manifest.read_text())["group"] == group
+    assert func("export") == "export export"
+    assert func("save") == "export save"
+    assert func(sys.modules["decimal"].Decimal(2)) == "money 2"
+    assert func(sys.modules[name].Local()) == "local"
+    assert func("other") == "default"
+
+
+def test__load_entry_points__lazy_from_manifest(plugin, tmp_path):
+    """Check handlers in the manifest are only imported when dispatched."""
+    # arrange
+    name, group = plugin
+    manifest = tmp_path / "manifest.json"
+    records = mod.records(group, None, manifest)
+    # drop the handler without a record, which is always imported
+    stamp = mod.fingerprint()
+    mod.write_manifest(
+        manifest,
+        group,
+        stamp,
+        [record for record in records if record["name"] != "local"],
+    )
+    sys.modules.pop(name)
+    func = _make_dispatcher()
+
+    # act
+    loaded = func.load_entry_points(group, manifest=manifest)
+    imported_before = name in sys.modules
+    unrelated = func("other")
+    imported_unrelated = name in sys.modules
+    result = func("save")
+
+    # assert
+    assert loaded == 2
+    assert not imported_before
+    assert unrelated == "default"
+    assert not imported_unrelated
+    assert result == "export save"
+    assert func.literal_registry[str]["save"] is sys.modules[name].export
+
+
+def test__load_entry_points__deferred_in_order(plugin, tmp_path):
+    """Check deferred entry points replace earlier registrations."""
+    # arrange
+    name, group = plugin
+    manifest = tmp_path / "manifest.json"
+    func = _make_dispatcher(deferred=True)
+    func.register("save", lambda a: "eager")
+
+    # act
+    func.load_entry_points(group, manifest=manifest)
+    result = func("save")
+
+    # assert
+    assert result == "export save"
+
+
+def test__load_entry_points__rebuilds_stale_manifest(plugin, tmp_path):
+    """Check the manifest is rebuilt once the installed set changes."""
+    # arrange
+    name, group = plugin
+    manifest = tmp_path / "manifest.json"
+    mod.write_manifest(manifest, group, mod.fingerprint(), [])
+    metadata = tmp_path / "site" / f"{name}-1.0.dist-info" / "METADATA"
+    # as when the distribution is upgraded
+    metadata.write_text(metadata.read_text().replace("1.0", "1.1"))
+    func = _make_dispatcher()
+
+    # act
+    loaded = func.load_entry_points(group, manifest=manifest)
+
+    # assert
+    assert loaded == 3
+    assert len(json.loads(manifest.read_text())["records"]) == 3
+    assert func("export") == "export export"
+
+
+def test__fingerprint__ignores_other_files(plugin, tmp_path, monkeypatch):
+    """Check files written next to distributions, or running from another
+    directory, don't change the fingerprint."""
+    # arrange
+    before = mod.fingerprint()
+    (tmp_path / "site" / "app.log").write_text("started")
+    monkeypatch.chdir(tmp_path)
+
+    # act
+    after = mod.fingerprint()
+
+    # assert
+    assert after == before
+
+
+def test__load_entry_points__without_manifest(plugin, tmp_path, monkeypatch):
+    """Check nothing is cached when manifest is None."""
+    # arrange
+    name, group = plugin
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    func = _make_dispatcher()
+
+    # act
+    loaded = func.load_entry_points(group, manifest=None)
+
+    # assert
+    assert loaded == 3
+    assert not (tmp_path / "cache").exists()
+    assert func("save") == "export save"
+
+
+def test__read_manifest__ignores_other_manifests(tmp_path):
+    """Check manifests for another group, dispatched parameter or
+    fingerprint aren't used."""
+    # arrange
+    path = tmp_path / "manifest.json"
+    mod.write_manifest(path, "group", "stamp", [{"name": "a"}])
+    keyed = tmp_path / "keyed.json"
+    mod.write_manifest(keyed, "group", "stamp", [{"name": "b"}], "kind")
+    corrupt = tmp_path / "corrupt.json"
+    corrupt.write_text("{")
+
+    # act
+    results = [
+        mod.read_manifest(path, "group", "stamp"),
+        mod.read_manifest(keyed, "group", "stamp", "kind"),
+        mod.read_manifest(path, "other", "stamp"),
+        mod.read_manifest(path, "group", "changed"),
+        mod.read_manifest(path, "group", "stamp", "kind"),
+        mod.read_manifest(keyed, "group", "stamp"),
+        mod.read_manifest(tmp_path / "missing.json", "group", "stamp"),
+        mod.read_manifest(corrupt, "group", "stamp"),
+    ]
+
+    # assert
+    assert results == [[{"name": "a"}], [{"name": "b"}]] + [None] * 6
+
+
+def test__default_manifest__in_cache_dir(tmp_path, monkeypatch):
+    """Check the default manifest is in the cache directory, per group and
+    dispatched parameter."""
+    # arrange
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+    # act
+    paths = [
+        mod.default_manifest("a"),
+        mod.default_manifest("b"),
+        mod.default_manifest("a", "kind"),
+    ]
+
+    # assert
+    assert all(path.parent == tmp_path / "partialdispatch" for path in paths)
+    assert len(set(paths)) == 3
@@ -1,3 +1,8 @@
+import dataclasses
+import enum
+import operator
+import sys
+import threading
 import typing
 from unittest import mock
 
@@ -300,3 +305,1000 @@ def test__singledispatch_literal__raises_warning_on_lambda(target_val):
     # assert
     target.assert_called_once_with("hit target", b)
     not_target.assert_called_once_with("a", b)
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__no_collisions_across_types(compiled):
+    """Check values which compare equal but differ in type are distinct."""
+
+    # arrange
+    class Flag(enum.IntEnum):
+        ON = 1
+
+    @mod.singledispatch_literal(compiled=compiled)
+    def func(a):
+        return "default"
+
+    for value in (1, True, 1.0, Flag.ON):
+        func.register(value, lambda a, value=value: repr(value))
+
+    # act
+    results = [func(v) for v in (1, True, 1.0, Flag.ON, 2, False)]
+
+    # assert
+    assert results == ["1", "True", "1.0", repr(Flag.ON), "default", "default"]
+    assert set(func.literal_registry) == {int, bool, float, Flag}
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__skips_hash_for_unregistered_types(compiled):
+    """Check arguments of types with no literals registered aren't hashed."""
+    # arrange
+    hashed = mock.Mock(return_value=0)
+
+    class Payload:
+        __hash__ = hashed
+
+    @mod.singledispatch_literal(compiled=compiled)
+    def func(a):
+        return "default"
+
+    @func.register
+    def _(a: typing.Literal[1, 2]):
+        return "literal"
+
+    # act
+    results = [func(Payload()), func(1), func([1])]
+
+    # assert
+    assert results == ["default", "literal", "default"]
+    hashed.assert_not_called()
+
+
+def test__singledispatch_literal__dispatch_uses_exact_type():
+    """Check dispatch() looks literals up by the exact type of the value."""
+
+    # arrange
+    @mod.singledispatch_literal
+    def func(a):
+        return "default"
+
+    def _true(a):
+        return "true"
+
+    func.register(True, _true, literal=True)
+
+    # act
+    hit = func.dispatch(True, literal=True, passthru=False)
+    miss = func.dispatch(1, literal=True, passthru=False)
+
+    # assert
+    assert hit is _true
+    assert miss is None
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__dispatch_on_keyword(compiled):
+    """Check the named argument is dispatched on, however it is passed."""
+
+    # arrange
+    @mod.singledispatch_literal(compiled=compiled, dispatch_on="kind")
+    def func(payload, kind=None):
+        return "default"
+
+    @func.register
+    def _(payload, kind: typing.Literal["user"]):
+        return "user"
+
+    @func.register
+    def _(payload, kind: int):
+        return "int"
+
+    # act
+    results = [
+        func({}, "user"),
+        func({}, kind="user"),
+        func(payload={}, kind="user"),
+        func({}, kind=1),
+        func({}, "group"),
+    ]
+
+    # assert
+    assert results == ["user", "user", "user", "int", "default"]
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__dispatch_on_keyword_only(compiled):
+    """Check keyword-only parameters can be dispatched on."""
+
+    # arrange
+    @mod.singledispatch_literal(compiled=compiled, dispatch_on="kind")
+    def func(*, kind):
+        return "default"
+
+    @func.register("user")
+    def _(*, kind):
+        return "user"
+
+    # act
+    results = [func(kind="user"), func(kind="group")]
+
+    # assert
+    assert results == ["user", "default"]
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__dispatch_on_missing_arg(compiled):
+    """Check an informative error when the dispatched arg is missing."""
+
+    # arrange
+    @mod.singledispatch_literal(compiled=compiled, dispatch_on="kind")
+    def func(payload, kind):
+        return "default"
+
+    # act
+    with pytest.raises(TypeError) as e:
+        func({})
+
+    # assert
+    assert "func dispatches on its 'kind' argument" in str(e.value)
+
+
+@pytest.mark.parametrize(
+    ("compiled", "stats"), [(False, False), (True, False), (False, True)]
+)
+def test__singledispatch_literal__dispatch_on_default(compiled, stats):
+    """Check the parameter's default is dispatched on, if it isn't passed."""
+
+    # arrange
+    @mod.singledispatch_literal(
+        compiled=compiled, stats=stats, dispatch_on="kind"
+    )
+    def func(payload, kind="json"):
+        return "default"
+
+    @mod.singledispatch_literal(
+        compiled=compiled, stats=stats, dispatch_on="kind", key=str.upper
+    )
+    def keyed(payload, *, kind="json"):
+        return "default"
+
+    func.register("json", lambda payload, kind="json": "json")
+    keyed.register("JSON", lambda payload, *, kind="json": "json")
+
+    # act
+    results = [func(1), func(1, "xml"), keyed(1), keyed(1, kind="xml")]
+
+    # assert
+    assert results == ["json", "default", "json", "default"]
+
+
+def test__singledispatch_literal__dispatch_on_unknown_param():
+    """Check the dispatched parameter must exist on the function."""
+
+    # act
+    with pytest.raises(TypeError) as e:
+
+        @mod.singledispatch_literal(dispatch_on="kind")
+        def func(payload):
+            return "default"
+
+    # assert
+    assert "has no parameter named 'kind'" in str(e.value)
+
+
+def test__singledispatch_literal__dispatch_on_does_not_bind_signature():
+    """Check the signature is not bound on each call."""
+
+    # arrange
+    @mod.singledispatch_literal(dispatch_on="kind")
+    def func(payload, kind):
+        return "default"
+
+    # act
+    with mock.patch.object(mod.inspect.Signature, "bind") as bind:
+        func({}, kind="user")
+
+    # assert
+    bind.assert_not_called()
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__map_batched(compiled):
+    """Check batch implementations are called once, in input order."""
+    # arrange
+    calls = []
+
+    @mod.singledispatch_literal(compiled=compiled)
+    def load(value, table):
+        calls.append(("default", value))
+        return f"{table}: {value}"
+
+    def load_ints(values, table):
+        calls.append(("ints", values))
+        return [f"{table}: int {v}" for v in values]
+
+    load.register(int, load_ints, batch=True)
+
+    # act
+    results = load.map_batched([1, "a", 2, typing.Literal, 3], "t")
+
+    # assert
+    assert results == [
+        "t: int 1",
+        "t: a",
+        "t: int 2",
+        f"t: {typing.Literal}",
+        "t: int 3",
+    ]
+    assert calls == [
+        ("ints", [1, 2, 3]),
+        ("default", "a"),
+        ("default", typing.Literal),
+    ]
+
+
+def test__singledispatch_literal__batch_called_directly():
+    """Check batch implementations work for single calls, and literals."""
+
+    # arrange
+    @mod.singledispatch_literal
+    def double(value):
+        return "default"
+
+    @double.register(batch=True)
+    def _(values: typing.Literal["a", "b"]):
+        return [v * 2 for v in values]
+
+    # act / assert
+    assert double("a") == "aa"
+    assert double.map_batched(["b", "c", "a"]) == ["bb", "default", "aa"]
+
+
+def test__singledispatch_literal__map_batched_wrong_length():
+    """Check an error is raised if a batch returns the wrong length."""
+
+    # arrange
+    @mod.singledispatch_literal
+    def func(value):
+        return "default"
+
+    func.register(int, lambda values: values[:1], batch=True)
+
+    # act / assert
+    with pytest.raises(ValueError, match="returned 1 results for 2 values"):
+        func.map_batched([1, 2])
+
+
+def test__singledispatch_literal__map_batched_dispatch_on():
+    """Check map_batched refuses dispatchers on a later argument."""
+
+    # arrange
+    @mod.singledispatch_literal(dispatch_on="b")
+    def func(a, b):
+        return "default"
+
+    # act / assert
+    with pytest.raises(TypeError, match="dispatches on 'b'"):
+        func.map_batched([1, 2])
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__transaction_publishes_once(compiled):
+    """Check registrations in a transaction are published together."""
+
+    # arrange
+    @mod.singledispatch_literal(compiled=compiled)
+    def func(a):
+        return "default"
+
+    listener = mock.Mock()
+    func._add_listener(listener)
+
+    # act
+    with func.transaction():
+        for i in range(10):
+            func.register(i, lambda a: "literal")
+        func.register("a", lambda a: "a")
+        during = func(1), func("a")
+
+    # assert
+    assert during == ("default", "default")
+    assert (func(1), func("a")) == ("literal", "a")
+    listener.assert_called_once_with()
+
+
+def test__singledispatch_literal__transaction_keeps_earlier_registrations():
+    """Check an exception in a transaction still publishes what was made."""
+
+    # arrange
+    @mod.singledispatch_literal
+    def func(a):
+        return "default"
+
+    # act
+    with pytest.raises(RuntimeError):
+        with func.transaction():
+            func.register(1, lambda a: "one")
+            raise RuntimeError
+
+    # assert
+    assert func(1) == "one"
+
+
+def test__singledispatch_literal__registries_copied_on_write():
+    """Check published tables are replaced, rather than changed."""
+
+    # arrange
+    @mod.singledispatch_literal
+    def func(a):
+        return "default"
+
+    func.register(1, lambda a: "one")
+    registry = func.literal_registry
+    values = registry[int]
+
+    # act
+    func.register(2, lambda a: "two")
+
+    # assert
+    assert list(values) == [1]
+    assert list(registry) == [int]
+    assert func.literal_registry[int] is not values
+    assert list(func.literal_registry[int]) == [1, 2]
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__register_while_dispatching(compiled):
+    """Check dispatching threads always see a consistent registry."""
+
+    # arrange
+    @mod.singledispatch_literal(compiled=compiled)
+    def func(a):
+        return -1
+
+    stop = threading.Event()
+    errors = []
+
+    def dispatch():
+        while not stop.is_set():
+            try:
+                for i in range(0, 200, 7):
+                    # either not registered yet, or registered
+                    assert func(i) in (-1, i)
+            except Exception as e:  # pragma: no cover
+                errors.append(e)
+                return
+
+    threads = [threading.Thread(target=dispatch) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+
+    # act
+    try:
+        for i in range(200):
+            func.register(i, lambda a, i=i: i)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    # assert
+    assert errors == []
+    assert [func(i) for i in range(200)] == list(range(200))
+
+
+# compiled call paths are rebuilt on each register, so fewer are made
+@pytest.mark.parametrize(
+    ("compiled", "stats", "count"),
+    [(False, False, 3000), (True, False, 300), (False, True, 300)],
+)
+def test__singledispatch_literal__register_types_while_dispatching(
+    compiled, stats, count
+):
+    """Check types are resolved while other threads register types."""
+
+    # arrange
+    class Base:
+        pass
+
+    class Sub(Base):
+        pass
+
+    @mod.singledispatch_literal(compiled=compiled, stats=stats)
+    def func(a):
+        return "default"
+
+    func.register(Base, lambda a: "base")
+    stop = threading.Event()
+    errors = []
+    # switch threads often, so registrations land mid-lookup
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    def dispatch():
+        while not stop.is_set():
+            try:
+                assert func(Sub()) == "base"
+                assert func.dispatch(Sub)(None) == "base"
+            except Exception as e:  # pragma: no cover
+                errors.append(e)
+                return
+
+    threads = [threading.Thread(target=dispatch) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+
+    # act
+    try:
+        for i in range(count):
+            func.register(type(f"C{i}", (), {}), lambda a: "other")
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+        sys.setswitchinterval(interval)
+
+    # assert
+    assert errors == []
+    assert func(Sub()) == "base"
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__freeze(compiled):
+    """Check a frozen dispatcher dispatches the same, and can't change."""
+
+    # arrange
+    @mod.singledispatch_literal(compiled=compiled)
+    def func(a):
+        return "default"
+
+    def one(a: typing.Literal[1]):
+        return "one"
+
+    def number(a: int):
+        return "int"
+
+    def small(a):
+        return "small"
+
+    func.register(one)
+    func.register(number)
+    func.register(mod._matchers.Interval(0, 10), small)
+    values = [1, 2, 5, 20, True, "1", None]
+    expected = [func(v) for v in values]
+
+    # act
+    frozen = func.freeze()
+
+    # assert
+    assert (frozen is func) == compiled
+    assert [frozen(v) for v in values] == expected
+    assert frozen.literal_registry == func.literal_registry
+    for dispatcher in (func, frozen):
+        with pytest.raises(TypeError, match="frozen"):
+            dispatcher.register(2, lambda a: "two")
+        with pytest.raises(TypeError, match="frozen"):
+            with dispatcher.transaction():
+                pass  # pragma: no cover
+
+
+def test__singledispatch_literal__freeze_resolves_up_front():
+    """Check registered classes are resolved when frozen, not when called."""
+
+    # arrange
+    @mod.singledispatch_literal
+    def func(a):
+        return "default"
+
+    def number(a: int):
+        return "int"
+
+    func.register(1, lambda a: "one")
+    func.register(number)
+
+    # act
+    frozen = func.freeze()
+
+    # assert
+    plans = frozen.__globals__["_plans"]
+    assert plans.keys() == {int, object}
+    assert plans[int][1] is number
+    assert frozen(1) == "one"
+    assert frozen(2) == "int"
+
+
+def test__singledispatch_literal__freeze_during_transaction():
+    """Check a dispatcher can't be frozen part way through a transaction."""
+
+    # arrange
+    @mod.singledispatch_literal
+    def func(a):
+        return "default"
+
+    # act / assert
+    with func.transaction():
+        with pytest.raises(TypeError, match="transaction"):
+            func.freeze()
+
+    func.register(1, lambda a: "one")
+    assert func(1) == "one"
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__enum_members(compiled):
+    """Check enum members dispatch by name, including aliases and flags."""
+
+    # arrange
+    class Pet(enum.Enum):
+        CAT = 1
+        KITTEN = 1
+        DOG = 2
+
+    class Perm(enum.Flag):
+        R = 1
+        W = 2
+
+    @mod.singledispatch_literal(compiled=compiled)
+    def func(a):
+        return "default"
+
+    func.register(Pet.CAT, lambda a: "cat")
+    func.register(Perm.R | Perm.W, lambda a: "rw")
+
+    # act
+    results = [func(v) for v in (Pet.KITTEN, Pet.DOG, Perm.R, Perm(3))]
+
+    # assert
+    assert results == ["cat", "default", "default", "rw"]
+
+
+def test__singledispatch_literal__check_exhaustive():
+    """Check members with no literal implementation are reported."""
+
+    # arrange
+    class State(enum.Enum):
+        IDLE = 1
+        RUNNING = 2
+        DONE = 3
+
+    @mod.singledispatch_literal
+    def func(a):
+        return "default"
+
+    func.register(State.IDLE, lambda a: "idle")
+
+    # act / assert
+    with pytest.raises(ValueError, match="State.RUNNING, State.DONE"):
+        func.check_exhaustive(State)
+
+    func.register(typing.Literal[State.RUNNING, State.DONE], lambda a: "on")
+    func.check_exhaustive(State)
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__deferred(compiled, monkeypatch):
+    """Check registrations are only inspected once a call is dispatched."""
+    # arrange
+    get_signature = mock.Mock(wraps=mod._get_signature)
+    monkeypatch.setattr(mod, "_get_signature", get_signature)
+
+    @mod.singledispatch_literal(compiled=compiled, deferred=True)
+    def func(a):
+        return "default"
+
+    get_signature.reset_mock()
+
+    @func.register
+    def _(a: typing.Literal["a"]):
+        return "a"
+
+    @func.register(int)
+    def _(a):
+        return "int"
+
+    func.register(None, lambda a: "none", literal=True)
+
+    # act
+    inspected_before = get_signature.called
+    results = [func(v) for v in ("a", 1, None, "b")]
+
+    # assert
+    assert not inspected_before
+    assert get_signature.called
+    assert results == ["a", "int", "none", "default"]
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__deferred_first_calls_wait(
+    compiled, monkeypatch
+):
+    """Check a first call waits for another's registrations to publish."""
+    # arrange
+    replaying = threading.Event()
+    release = threading.Event()
+
+    def get_signature(func):
+        if func.__name__ == "last":
+            replaying.set()
+            release.wait(5)
+
+        return signature(func)
+
+    signature = mod._get_signature
+    monkeypatch.setattr(mod, "_get_signature", get_signature)
+
+    @mod.singledispatch_literal(compiled=compiled, deferred=True)
+    def func(a):
+        return "default"
+
+    def one(a: typing.Literal[1]):
+        return "one"
+
+    def last(a: typing.Literal["last"]):
+        return "last"
+
+    func.register(one)
+    func.register(last)
+    results = {}
+
+    def call(name):
+        results[name] = func(1)
+
+    first = threading.Thread(target=call, args=("first",))
+    racing = threading.Thread(target=call, args=("racing",))
+
+    # act
+    first.start()
+    replaying.wait(5)
+    racing.start()
+    racing.join(0.1)
+    release.set()
+    first.join()
+    racing.join()
+
+    # assert
+    assert results == {"first": "one", "racing": "one"}
+
+
+def test__singledispatch_literal__deferred_compiled_first_calls():
+    """Check calls still running the validating code work once replaced."""
+
+    # arrange
+    @mod.singledispatch_literal(compiled=True, deferred=True)
+    def func(a):
+        return "default"
+
+    func.register(1, lambda a: "one", literal=True)
+    validating = func.__code__
+
+    # act
+    first = func(1)
+    func.__code__ = validating
+    result = func(1)
+
+    # assert
+    assert (first, result) == ("one", "one")
+
+
+def test__singledispatch_literal__deferred_forward_reference(monkeypatch):
+    """Check annotations are resolved when validated, not registered."""
+
+    # arrange
+    @mod.singledispatch_literal(deferred=True)
+    def func(a):
+        return "default"
+
+    def later(a: "_Later"):  # noqa: F821
+        return "later"
+
+    func.register(later)
+    monkeypatch.setitem(globals(), "_Later", typing.Literal["later"])
+
+    # act
+    func.validate()
+
+    # assert
+    assert func.literal_registry == {str: {"later": later}}
+    assert func("later") == "later"
+
+
+def test__singledispatch_literal__deferred_errors_on_validate():
+    """Check invalid registrations are reported by validate."""
+
+    # arrange
+    @mod.singledispatch_literal(deferred=True)
+    def func(a):
+        return "default"
+
+    def no_annotation(a):
+        return "invalid"
+
+    func.register(no_annotation)
+
+    # act / assert
+    with pytest.raises(TypeError):
+        func.validate()
+
+    assert func("a") == "default"
+
+
+def test__singledispatch_literal__deferred_from_env(monkeypatch):
+    """Check registration is deferred when the environment variable is set."""
+    # arrange
+    monkeypatch.setenv(mod.DEFERRED_ENV_VAR, "1")
+
+    @mod.singledispatch_literal
+    def func(a):
+        return "default"
+
+    # act
+    func.register(1, lambda a: "one")
+
+    # assert
+    assert func.literal_registry == {}
+    assert func.dispatch(1, literal=True)(1) == "one"
+
+
+@pytest.mark.skipif(sys.version_info < (3, 12), reason="type statements")
+def test__singledispatch_literal__type_alias():
+    """Check aliases made by type statements are registered by value."""
+    # arrange
+    namespace = {"typing": typing}
+    exec('type Kind = typing.Literal["a", "b"]', namespace)
+
+    @mod.singledispatch_literal
+    def func(a):
+        return "default"
+
+    # act
+    func.register(namespace["Kind"], lambda a: "kind")
+
+    # assert
+    assert [func("a"), func("b"), func("c")] == ["kind", "kind", "default"]
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__key(compiled):
+    """Check calls dispatch on the key, passing the original arguments."""
+
+    # arrange
+    @mod.singledispatch_literal(compiled=compiled, key=operator.itemgetter(0))
+    def func(a, b):
+        return ("default", a, b)
+
+    @func.register("ping", literal=True)
+    def ping(a, b):
+        return ("ping", a, b)
+
+    @func.register(int)
+    def number(a, b):
+        return ("number", a, b)
+
+    # act / assert
+    assert func(("ping", 1), "x") == ("ping", ("ping", 1), "x")
+    assert func((2,), "x") == ("number", (2,), "x")
+    assert func(("pong",), "x") == ("default", ("pong",), "x")
+    assert func.map_batched([("ping",), (2,)], "x") == [
+        ("ping", ("ping",), "x"),
+        ("number", (2,), "x"),
+    ]
+    with pytest.raises(IndexError):
+        func((), "x")
+
+
+@pytest.mark.parametrize(
+    ("key", "message"),
+    [
+        ("[type]", {"type": "ping"}),
+        ("[0]", ["ping"]),
+        ("kind", mock.Mock(kind="ping")),
+        ("header.kind", mock.Mock(header=mock.Mock(kind="ping"))),
+    ],
+)
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__key_string(key, message, compiled):
+    """Check string keys are made into item and attribute getters."""
+
+    # arrange
+    @mod.singledispatch_literal(compiled=compiled, key=key)
+    def func(message):
+        return "default"
+
+    func.register("ping", lambda message: message, literal=True)
+
+    # act / assert
+    assert func(message) is message
+    assert func.freeze()(message) is message
+
+
+@pytest.mark.parametrize(
+    ("key", "error"), [(1, TypeError), ("kind!", ValueError)]
+)
+def test__singledispatch_literal__key_invalid(key, error):
+    """Check keys must be callables, items or attributes."""
+    # act / assert
+    with pytest.raises(error, match="Invalid key"):
+
+        @mod.singledispatch_literal(key=key)
+        def func(a):
+            return "default"
+
+
+@pytest.mark.parametrize(("stats",), [(False,), (True,)])
+def test__singledispatch_literal__key_dispatch_on(stats):
+    """Check the key is extracted from a named argument, however passed."""
+
+    # arrange
+    @mod.singledispatch_literal(dispatch_on="b", key="[type]", stats=stats)
+    def func(a, b):
+        return "default"
+
+    func.register("ping", lambda a, b: "ping", literal=True)
+
+    # act / assert
+    assert func(1, {"type": "ping"}) == "ping"
+    assert func(1, b={"type": "ping"}) == "ping"
+    assert func(1, b={"type": "pong"}) == "default"
+    with pytest.raises(TypeError, match="'b' argument"):
+        func(1)
+
+
+class _Ping(typing.TypedDict):
+    type: typing.Literal["ping"]
+    id: int
+
+
+class _Data(typing.TypedDict):
+    type: typing.Literal["data", "blob"]
+    version: typing.Literal[1]
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__typed_dict(compiled):
+    """Check dicts are dispatched on the discriminator of a TypedDict."""
+
+    # arrange
+    @mod.singledispatch_literal(compiled=compiled)
+    def func(a):
+        return "default"
+
+    @func.register
+    def ping(a: _Ping):
+        return "ping"
+
+    # the field already in use is taken, of the two Literal fields
+    func.register(_Data, lambda a: "data")
+
+    @func.register("ping", literal=True)
+    def literal(a):
+        return "literal"
+
+    # act / assert
+    assert func({"type": "ping", "id": 1}) == "ping"
+    assert func({"type": "blob"}) == "data"
+    assert func({"type": "other"}) == "default"
+    assert func({"version": 1}) == "default"
+    assert func("ping") == "literal"
+
+
+def test__singledispatch_literal__typed_dict_without_discriminator():
+    """Check a TypedDict needs exactly one Literal field to dispatch on."""
+
+    # arrange
+    @mod.singledispatch_literal
+    def func(a):
+        return "default"
+
+    class Untagged(typing.TypedDict):
+        id: int
+
+    # act / assert
+    with pytest.raises(TypeError, match="it has none"):
+        func.register(Untagged, lambda a: "untagged")
+
+    with pytest.raises(TypeError, match="it has 'type', 'version'"):
+        func.register(_Data, lambda a: "data")
+
+
+def test__singledispatch_literal__dataclass_by_class():
+    """Check dataclasses with a Literal field are still dispatched by class."""
+
+    # arrange
+    @dataclasses.dataclass
+    class Ping:
+        type: typing.Literal["ping"] = "ping"
+
+    @mod.singledispatch_literal
+    def func(a):
+        return "default"
+
+    @func.register
+    def ping(a: Ping):
+        return "ping"
+
+    # act / assert
+    assert func(Ping()) == "ping"
+    assert func({"type": "ping"}) == "default"
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__register_many(compiled):
+    """Check many values are registered, checking each handler once."""
+
+    # arrange
+    @mod.singledispatch_literal(compiled=compiled)
+    def func(a):
+        return "default"
+
+    def sterling(a):
+        return "sterling"
+
+    def euro(a):
+        return "euro"
+
+    published = []
+    func._add_listener(lambda: published.append(True))
+
+    # act
+    with mock.patch.object(
+        mod, "_get_signature", wraps=mod._get_signature
+    ) as get_signature:
+        func.register_many({"GBP": sterling, "EUR": euro, "DEM": euro})
+        handler = func.register_many(range(1000), euro)
+
+        @func.register_many([True, None])
+        def other(a):
+            return "other"
+
+    # assert
+    # once per handler, per call, not per value
+    assert get_signature.call_count == 4
+    assert len(published) == 3
+    assert handler is euro
+    assert [func("GBP"), func("DEM"), func(999), func(1.0)] == [
+        "sterling",
+        "euro",
+        "euro",
+        "default",
+    ]
+    assert [func(True), func(1), func(None)] == ["other", "euro", "other"]
+
+
+def test__singledispatch_literal__register_many_invalid():
+    """Check handlers are checked as by register."""
+
+    # arrange
+    @mod.singledispatch_literal
+    def func(a):
+        return "default"
+
+    def keyword_only(*, a):
+        return "keyword only"
+
+    # act / assert
+    with pytest.raises(TypeError, match="positional"):
+        func.register_many(["a", "b"], keyword_only)
+
+    with pytest.raises(TypeError, match="expected a callable"):
+        func.register_many({"a": "not callable"})
+
+    assert func.literal_registry == {}
+
+
+def test__singledispatch_literal__register_many_deferred():
+    """Check bulk registrations are deferred, and made on the first call."""
+
+    # arrange
+    @mod.singledispatch_literal(deferred=True)
+    def func(a):
+        return "default"
+
+    # act
+    func.register_many(["a", "b"], lambda a: "ab")
+    registered_before = dict(func.literal_registry)
+    results = [func("a"), func("b"), func("c")]
+
+    # assert
+    assert registered_before == {}
+    assert results == ["ab", "ab", "default"]
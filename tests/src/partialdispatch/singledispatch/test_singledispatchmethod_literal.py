@@ -0,0 +1,163 @@
+import gc
+import typing
+import weakref
+from unittest import mock
+
+import pytest
+
+import partialdispatch.singledispatch as mod
+
+
+def test__singledispatchmethod_literal__get__caches_dispatchers():
+    """Check the dispatching functions are built once, and once per class."""
+
+    # arrange
+    class A:
+        @mod.singledispatchmethod_literal
+        def t(self, arg):
+            return "base"
+
+    descriptor = A.__dict__["t"]
+    make_bound = mock.Mock(wraps=descriptor._make_bound_method)
+    make = mock.Mock(wraps=descriptor._make_method)
+
+    # act
+    with mock.patch.multiple(
+        descriptor, _make_bound_method=make_bound, _make_method=make
+    ):
+        first, second = A(), A()
+        results = [first.t(1), second.t(1), A.t(None, 1), A.t(None, 1)]
+
+    # assert
+    make_bound.assert_called_once_with()
+    make.assert_called_once_with(A)
+    assert results == ["base", "base", "base", "base"]
+    assert first.t.__func__ is second.t.__func__
+    assert first.t.__self__ is first
+
+
+def test__singledispatchmethod_literal__get__does_not_keep_alive():
+    """Check cached dispatchers hold neither instances nor classes."""
+
+    # arrange
+    class A:
+        @mod.singledispatchmethod_literal
+        def t(self, arg):
+            return "base"
+
+    class B(A):
+        pass
+
+    descriptor = A.__dict__["t"]
+    instance = B()
+    instance.t(1)
+    B.t(instance, 1)
+    instance_ref, cls_ref = weakref.ref(instance), weakref.ref(B)
+
+    # act
+    del instance, B
+    gc.collect()
+
+    # assert
+    assert instance_ref() is None
+    assert cls_ref() is None
+    assert list(descriptor._methods) == []
+
+
+def test__singledispatchmethod_literal__register_clears_cache():
+    """Check registrations made after first access are dispatched to."""
+
+    # arrange
+    class A:
+        @mod.singledispatchmethod_literal
+        def t(self, arg):
+            return "base"
+
+    a = A()
+    before = a.t("x")
+
+    # act
+    @A.t.register
+    def _(self, arg: typing.Literal["x"]):
+        return "x"
+
+    # assert
+    assert before == "base"
+    assert a.t("x") == "x"
+    assert list(A.t.literal_registry[str]) == ["x"]
+
+
+@pytest.mark.parametrize(("via_instance",), [(True,), (False,)])
+def test__singledispatchmethod_literal__binds_each_kind(via_instance):
+    """Check instance, class and static implementations are bound."""
+
+    # arrange
+    class A:
+        @mod.singledispatchmethod_literal
+        def t(self, arg):
+            return ("base", self, arg)
+
+        @t.register(1)
+        @classmethod
+        def _(cls, arg):
+            return ("class", cls, arg)
+
+        @t.register(2)
+        @staticmethod
+        def _(arg):
+            return ("static", arg)
+
+    a = A()
+
+    # act
+    results = (
+        [a.t(1), a.t(2), a.t(3)]
+        if via_instance
+        else [A.t(1), A.t(2), A.t(a, 3)]
+    )
+
+    # assert
+    assert results == [("class", A, 1), ("static", 2), ("base", a, 3)]
+
+
+def test__singledispatchmethod_literal__error_when_called_without_args():
+    """Check a TypeError naming the dispatch argument is raised."""
+
+    # arrange
+    class A:
+        @mod.singledispatchmethod_literal
+        def t(self, arg):
+            return "base"
+
+    # act
+    with pytest.raises(TypeError) as e:
+        A().t(arg=1)
+
+    # assert
+    assert "t requires at least 1 positional argument" in str(e.value)
+    assert "t(arg=1)" in str(e.value)
+
+
+def test__singledispatchmethod_literal__get__accepts_assignment():
+    """Check attributes set on a bound dispatcher don't leak to others."""
+
+    # arrange
+    class A:
+        @mod.singledispatchmethod_literal
+        def t(self, arg):
+            "Docs."
+            return "base"
+
+    first, second = A(), A()
+    bound = first.t
+
+    # act
+    bound.attr = 1
+
+    # assert
+    assert bound.attr == 1
+    assert not hasattr(second.t, "attr")
+    assert not hasattr(first.t, "attr")
+    assert bound.__doc__ == "Docs."
+    assert bound.__name__ == "t"
+    assert bound(1) == "base"
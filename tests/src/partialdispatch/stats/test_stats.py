@@ -0,0 +1,253 @@
+import typing
+
+import pytest
+
+import partialdispatch.stats as mod
+from partialdispatch import Interval, singledispatch_literal
+
+
+def _make_dispatcher(**kwargs):
+    @singledispatch_literal(**kwargs)
+    def func(a):
+        return "default"
+
+    def one(a: typing.Literal[1]):
+        return "one"
+
+    def number(a: int):
+        return "int"
+
+    def small(a):
+        return "small"
+
+    func.register(one)
+    func.register(number)
+    func.register(Interval(0.0, 1.0), small)
+    func.register((1,), lambda a: "tuple", literal=True)
+
+    return func
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__stats_counts_calls(compiled):
+    """Check each call is counted by how it was resolved."""
+    # arrange
+    func = _make_dispatcher(compiled=compiled, stats=True)
+
+    # act
+    results = [func(v) for v in (1, 1, True, 2, 0.5, 2.0, "a", [1], (1,))]
+    stats = func.stats()
+
+    # assert
+    assert results == [
+        "one",
+        "one",
+        "int",
+        "int",
+        "small",
+        "default",
+        "default",
+        "default",
+        "tuple",
+    ]
+    assert stats == {
+        "literal": {int: {1: 2}, tuple: {(1,): 1}},
+        "matched": {float: 1},
+        "type": {bool: 1, int: 1},
+        "default": {float: 1, str: 1, list: 1},
+        "unhashable": {},
+        "cache_clears": 1,
+    }
+
+
+def test__singledispatch_literal__stats_unhashable():
+    """Check unhashable arguments of a class with literals are counted."""
+    # arrange
+    func = _make_dispatcher(stats=True)
+
+    # act
+    result = func(([],))
+
+    # assert
+    assert result == "default"
+    assert func.stats()["unhashable"] == {tuple: 1}
+
+
+def test__singledispatch_literal__stats_reset():
+    """Check the counts can be reset, and snapshots don't change."""
+    # arrange
+    func = _make_dispatcher(stats=True)
+    func(1)
+
+    # act
+    before = func.stats(reset=True)
+    func(2)
+    after = func.stats()
+
+    # assert
+    assert before["literal"] == {int: {1: 1}}
+    assert before["type"] == {}
+    assert after["literal"] == {}
+    assert after["type"] == {int: 1}
+    assert after["cache_clears"] == 0
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__stats_off(compiled):
+    """Check dispatchers without stats have no counting in the call path."""
+    # arrange
+    func = _make_dispatcher(compiled=compiled)
+
+    # act / assert
+    with pytest.raises(TypeError, match="stats=True"):
+        func.stats()
+
+    assert "_hooked" not in func.__code__.co_names
+
+
+def test__singledispatch_literal__stats_frozen():
+    """Check frozen dispatchers carry on counting."""
+    # arrange
+    func = _make_dispatcher(stats=True).freeze()
+
+    # act
+    func(1)
+
+    # assert
+    assert func.stats()["literal"] == {int: {1: 1}}
+
+
+def test__stats__snapshot():
+    """Check snapshots are plain dictionaries."""
+    # arrange
+    stats = mod.Stats()
+    stats.literal[int][1] += 1
+    stats.default[str] += 2
+
+    # act
+    snapshot = stats.snapshot()
+
+    # assert
+    assert type(snapshot["literal"][int]) is dict
+    assert snapshot["default"] == {str: 2}
+
+
+@pytest.mark.parametrize(
+    ("compiled", "stats"), [(False, False), (True, False), (False, True)]
+)
+def test__singledispatch_literal__add_timer(compiled, stats):
+    """Check hooks are passed each call's implementation, path and time."""
+    # arrange
+    func = _make_dispatcher(compiled=compiled, stats=stats)
+    code = func.__code__
+    calls = []
+
+    # act
+    func.add_timer(lambda *args: calls.append(args))
+    results = [func(v) for v in (1, 2, 0.5, "a")]
+
+    # assert
+    assert results == ["one", "int", "small", "default"]
+    assert [(d, path) for d, _, path, _ in calls] == [
+        (func, "literal"),
+        (func, "type"),
+        (func, "matched"),
+        (func, "default"),
+    ]
+    assert [impl.__name__ for _, impl, _, _ in calls] == [
+        "one",
+        "number",
+        "small",
+        "func",
+    ]
+    assert all(isinstance(ns, int) and ns >= 0 for *_, ns in calls)
+    assert (func.__code__ is code) == (not (compiled or stats))
+
+
+def test__singledispatch_literal__add_timer_samples():
+    """Check hooks are called for one in every `every` calls."""
+    # arrange
+    func = _make_dispatcher()
+    every_call, every_third = [], []
+    func.add_timer(lambda *args: every_call.append(args))
+    func.add_timer(lambda *args: every_third.append(args), every=3)
+
+    # act
+    for i in range(10):
+        func(i)
+
+    # assert
+    assert len(every_call) == 10
+    assert len(every_third) == 4
+
+
+@pytest.mark.parametrize(("compiled",), [(False,), (True,)])
+def test__singledispatch_literal__remove_timer(compiled):
+    """Check the call path is restored when the last hook is removed."""
+    # arrange
+    func = _make_dispatcher(compiled=compiled)
+    code = func.__code__
+    calls = []
+
+    def hook(*args):
+        calls.append(args)
+
+    func.add_timer(hook)
+
+    # act
+    func.remove_timer(hook)
+    result = func(1)
+
+    # assert
+    assert result == "one"
+    assert calls == []
+    assert func.__code__.co_names == code.co_names
+    with pytest.raises(ValueError, match="isn't a timer"):
+        func.remove_timer(hook)
+
+
+def test__singledispatch_literal__remove_timer_while_calling():
+    """Check calls still running the timed code work once it's replaced."""
+    # arrange
+    func = _make_dispatcher(compiled=True)
+    calls = []
+
+    def hook(*args):
+        calls.append(args)
+
+    func.add_timer(hook)
+    timed = func.__code__
+
+    # act
+    func.remove_timer(hook)
+    func.__code__ = timed
+    result = func(1)
+
+    # assert
+    assert result == "one"
+    assert len(calls) == 1
+
+
+def test__singledispatch_literal__add_timer_frozen():
+    """Check timers can be added to a frozen dispatcher."""
+    # arrange
+    func = _make_dispatcher().freeze()
+    calls = []
+
+    # act
+    func.add_timer(lambda *args: calls.append(args))
+    result = func(1)
+
+    # assert
+    assert result == "one"
+    assert [path for _, _, path, _ in calls] == ["literal"]
+
+
+def test__singledispatch_literal__add_timer_invalid_every():
+    """Check hooks must be called at least every so often."""
+    # arrange
+    func = _make_dispatcher()
+
+    # act / assert
+    with pytest.raises(ValueError, match="at least 1"):
+        func.add_timer(print, every=0)
@@ -39,6 +39,24 @@ class TestSingleDispatchLiteralAgainstStdLib(_TestSingleDispatch):
     ...
 
 
+# The same again, for dispatchers using the compiled call path.
+patched_singledispatch_compiled = mock.patch.object(
+    functools,
+    "singledispatch",
+    functools.singledispatch,
+)(functools.partial(partialdispatch.singledispatch_literal, compiled=True))
+
+
+@mock.patch.object(
+    functools, "singledispatch", patched_singledispatch_compiled
+)
+@mock.patch.object(
+    functools, "singledispatchmethod", patched_singledispatchmethod
+)
+class TestCompiledSingleDispatchLiteralAgainstStdLib(_TestSingleDispatch):
+    ...
+
+
 xfail_strict = pytest.mark.xfail(strict=True)
 filter_deprecation_warning_not_none_test_case = pytest.mark.filterwarnings(
     "ignore:It is deprecated to return a value that is not "
@@ -67,23 +85,52 @@ VERSION_TEST_MARKS_MAP = {
         "test_staticmethod_type_ann_register": [
             filter_deprecation_warning_not_none_test_case
         ],
-    }
+    },
+    # the compiled call path memoises implementations itself, rather than
+    # in the stdlib's dispatch_cache which this test traces
+    ((3, 8), (3, 14), "compiled"): {
+        "test_cache_invalidation": [
+            pytest.mark.skip(reason="Compiled wrapper has its own cache.")
+        ],
+    },
     # use this space to temporarily turn off some tests when developing features
 }
 
-# get relevant sets of marks (each a dict)
+# get relevant sets of marks (each a dict), with the test classes they cover
 test_marks = [
-    test_marks_map
-    for (lower_v, upper_v), test_marks_map in VERSION_TEST_MARKS_MAP.items()
+    (
+        (TestCompiledSingleDispatchLiteralAgainstStdLib,)
+        if only
+        else (
+            TestSingleDispatchLiteralAgainstStdLib,
+            TestCompiledSingleDispatchLiteralAgainstStdLib,
+        ),
+        test_marks_map,
+    )
+    for (
+        lower_v,
+        upper_v,
+        *only,
+    ), test_marks_map in VERSION_TEST_MARKS_MAP.items()
     if sys.version_info >= lower_v and sys.version_info <= upper_v
 ]
 
+
+def _mark_tests(test_classes, markset):
+    """Apply a set of marks to tests on each of the test classes."""
+    for test_class in test_classes:
+        for test, marks in markset.items():
+            method = getattr(test_class, test)
+            for mark in marks:
+                method = mark(method)
+            setattr(test_class, test, method)
+
+
 # call them on relevant tests
-for markset in test_marks:
-    for test, marks in markset.items():
-        method = getattr(TestSingleDispatchLiteralAgainstStdLib, test)
-        for mark in marks:
-            method = mark(method)
-        setattr(TestSingleDispatchLiteralAgainstStdLib, test, method)
-
-__all__ = ["TestSingleDispatchLiteralAgainstStdLib"]
+for marked_classes, markset in test_marks:
+    _mark_tests(marked_classes, markset)
+
+__all__ = [
+    "TestSingleDispatchLiteralAgainstStdLib",
+    "TestCompiledSingleDispatchLiteralAgainstStdLib",
+]
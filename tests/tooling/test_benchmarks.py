@@ -0,0 +1,68 @@
+import importlib.util
+import json
+import pathlib
+
+import pytest
+
+_PATH = pathlib.Path(__file__).parents[2] / "benchmarks" / "dispatch.py"
+
+
+@pytest.fixture
+def benchmarks():
+    spec = importlib.util.spec_from_file_location("dispatch", _PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return module
+
+
+@pytest.mark.parametrize(
+    "scenario",
+    [
+        "literal_hit",
+        "type_fallback",
+        "default",
+        "unhashable",
+        "enum",
+        "large_registry",
+    ],
+)
+def test__benchmarks__strategies_agree(benchmarks, scenario):
+    """Check every strategy returns the expected results for a scenario."""
+    # arrange
+    (found,) = [s for s in benchmarks._scenarios() if s.name == scenario]
+
+    # act
+    for build in benchmarks.STRATEGIES.values():
+        handler = build(found)
+        results = [handler(arg) for arg in found.args]
+
+        # assert
+        assert results == [
+            benchmarks._expected(found, arg) for arg in found.args
+        ]
+
+
+def test__benchmarks__json_output(benchmarks, tmp_path):
+    """Check results are written as JSON."""
+    # arrange
+    output = tmp_path / "results" / "bench.json"
+
+    # act
+    benchmarks.main(
+        [
+            "--scenario=literal_hit",
+            "--strategy=dict",
+            "--repeat=1",
+            "--json",
+            f"--output={output}",
+        ]
+    )
+
+    # assert
+    report = json.loads(output.read_text())
+    assert set(report) == {"python", "implementation", "results"}
+    (result,) = report["results"]
+    assert result["scenario"] == "literal_hit"
+    assert result["strategy"] == "dict"
+    assert result["ns_per_call"] > 0